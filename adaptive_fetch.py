@@ -0,0 +1,110 @@
+"""
+Demand-driven pagination across job sources.
+
+Every search fetches the first page of JOBS_PER_SOURCE jobs from each
+source. Each page is scored with the first-stage scorer (no LLM calls) as
+it arrives; while fewer than the target number of distinct jobs look
+relevant, the sources with the best relevant yield so far fetch their next
+page, up to max_pages per source and only within SEARCH_LATENCY_BUDGET.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from config import MAX_PAGES, PAGINATION_SOURCES_PER_ROUND, SEARCH_LATENCY_BUDGET, TARGET_RESULTS
+from dedup import dedupe_jobs
+from fingerprint import normalize_url
+from relevance_analyzer import RELEVANCE_THRESHOLD, analysis_executor, job_id, provisional_relevance_async
+
+logger = logging.getLogger(__name__)
+
+PageFetcher = Callable[[str, Any, int], Awaitable[List[Dict[str, Any]]]]
+PageResult = Tuple[str, int, Union[List[Dict[str, Any]], Exception], List[Optional[float]]]
+
+class SourceYield:
+    """Pages fetched from one source and how many of their jobs looked relevant"""
+    def __init__(self):
+        self.pages = 0
+        self.jobs = 0
+        self.relevant = 0
+        self.exhausted = False  # Failed, or returned an empty page
+
+    def rate(self) -> float:
+        # Smoothed, so that one unlucky page does not rule a source out
+        return (self.relevant + 1) / (self.jobs + 2)
+
+def _relevant_key(job: Dict[str, Any]) -> str:
+    return normalize_url(job.get("apply_link")) or job_id(job)
+
+def next_sources(yields: Dict[str, SourceYield], max_pages: int) -> List[str]:
+    """Sources that fetch another page this round, best relevant yield first"""
+    candidates = [source for source, state in yields.items() if not state.exhausted and state.pages < max_pages]
+    candidates.sort(key=lambda source: yields[source].rate(), reverse=True)
+    return candidates[:PAGINATION_SOURCES_PER_ROUND]
+
+async def fetch_pages(fetch: PageFetcher, sources: List[str], criteria) -> AsyncIterator[PageResult]:
+    """
+    Yields (source, page, jobs or the exception raised, provisional scores)
+    for every page as it arrives. Jobs are deduplicated within the page and
+    scores are None for a failed page.
+    """
+    target = TARGET_RESULTS if criteria.target_results is None else criteria.target_results
+    max_pages = MAX_PAGES if criteria.max_pages is None else criteria.max_pages
+    deadline = time.monotonic() + SEARCH_LATENCY_BUDGET
+    loop = asyncio.get_running_loop()
+    yields = {source: SourceYield() for source in sources}
+    relevant = set()
+
+    round_sources = list(sources)
+    first_round = True
+    while round_sources:
+        tasks = {}
+        for source in round_sources:
+            page = yields[source].pages
+            yields[source].pages += 1
+            tasks[asyncio.ensure_future(fetch(source, criteria, page))] = (source, page)
+        pending = set(tasks)
+        try:
+            while pending:
+                # The first pages are always awaited; later ones only within the budget
+                timeout = None if first_round else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source, page = tasks[task]
+                    state = yields[source]
+                    if task.exception() is not None:
+                        state.exhausted = True
+                        yield source, page, task.exception(), []
+                        continue
+                    jobs, _ = await loop.run_in_executor(analysis_executor, dedupe_jobs, task.result())
+                    scores = await provisional_relevance_async(jobs, criteria) if jobs else []
+                    state.exhausted = not jobs
+                    state.jobs += len(jobs)
+                    for job, score in zip(jobs, scores):
+                        if score is not None and score >= RELEVANCE_THRESHOLD:
+                            state.relevant += 1
+                            relevant.add(_relevant_key(job))
+                    yield source, page, jobs, scores
+        finally:
+            # Pages still loading past the budget, or when the caller stops early
+            for task in pending:
+                task.cancel()
+        if pending:
+            logger.info(f"Latency budget of {SEARCH_LATENCY_BUDGET}s spent, {len(pending)} pages abandoned")
+            break
+
+        first_round = False
+        if len(relevant) >= target:
+            break
+        if deadline - time.monotonic() <= 0:
+            logger.info(f"Latency budget of {SEARCH_LATENCY_BUDGET}s spent with {len(relevant)} of {target} relevant jobs")
+            break
+        round_sources = next_sources(yields, max_pages)
+        if round_sources:
+            logger.info(f"{len(relevant)} of {target} relevant jobs, fetching more from {', '.join(round_sources)}")
+
+    summary = ", ".join(f"{source} {state.relevant}/{state.jobs} in {state.pages} pages" for source, state in yields.items())
+    logger.info(f"Pagination: {len(relevant)} relevant jobs for a target of {target} ({summary})")
@@ -0,0 +1,169 @@
+"""
+Columnar version of relevance_analyzer.calculate_basic_relevance.
+
+The criteria are compiled once (lowercased position, location token,
+experience years, and one regex over every skill and alias) and every job
+is then scored in one pass over pandas string columns, with the arithmetic
+done in NumPy. Each description is scanned once, whatever the number of
+skills. Without alias expansion the scores are identical to
+calculate_basic_relevance.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Spellings that refer to the same skill
+SKILL_ALIASES = [
+    {"javascript", "js"},
+    {"typescript", "ts"},
+    {"node.js", "nodejs", "node"},
+    {"react", "react.js", "reactjs"},
+    {"vue", "vue.js", "vuejs"},
+    {"next.js", "nextjs"},
+    {"postgresql", "postgres"},
+    {"kubernetes", "k8s"},
+    {"c#", "csharp"},
+    {"machine learning", "ml"},
+    {"amazon web services", "aws"},
+]
+
+_ALIAS_INDEX = {alias: group for group in SKILL_ALIASES for alias in group}
+_FIRST_NUMBER = re.compile(r"(\d+)")
+_TOKEN_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789")
+
+# Weights, in the order calculate_basic_relevance adds them
+TITLE_WEIGHT = 0.3
+LOCATION_WEIGHT = 0.1
+JOB_NATURE_WEIGHT = 0.1
+EXPERIENCE_WEIGHT = 0.1
+SKILL_WEIGHT = 0.05
+MAX_SKILL_SCORE = 0.4
+
+COMPONENTS = ("title", "location", "job_nature", "experience", "skills")
+
+class CompiledCriteria:
+    """Search criteria preprocessed once for scoring many jobs"""
+
+    def __init__(self, criteria, expand_aliases: bool = True):
+        self.position = criteria.position.lower()
+        self.location = criteria.location.lower().split(',')[0].strip()
+        self.job_nature = criteria.jobNature.lower()
+        years = _FIRST_NUMBER.search(criteria.experience.lower())
+        self.experience_years = int(years.group(1)) if years else None
+
+        self.skills = sorted({skill.strip().lower() for skill in criteria.skills.split(',')})
+        self.empty_skill = "" in self.skills  # A substring of every description
+
+        # Each skill is matched as a substring (as before); its aliases are
+        # matched as whole tokens so short forms like "js" do not hit "json"
+        aliases: Dict[str, set] = {}
+        if expand_aliases:
+            for i, skill in enumerate(self.skills):
+                for alias in _ALIAS_INDEX.get(skill, set()) - {skill}:
+                    aliases.setdefault(alias, set()).add(i)
+
+        # One scan per description: at every position the pattern captures the
+        # longest skill or alias starting there. Shorter terms starting at the
+        # same position are its prefixes, so each term maps to every skill it
+        # proves.
+        terms = sorted({skill for skill in self.skills if skill} | set(aliases), key=len, reverse=True)
+        alternation = "|".join(map(re.escape, terms))
+        self.term_pattern = re.compile(f"(?=({alternation}))") if terms else None
+        self.term_skills = {term: {i for i, skill in enumerate(self.skills) if skill and term.startswith(skill)}
+                            for term in terms}
+        self.term_aliases = {term: [(len(alias), indices) for alias, indices in aliases.items()
+                                    if term.startswith(alias)]
+                             for term in terms}
+        self.alias_terms = frozenset(term for term in terms if self.term_aliases[term])
+        # Descriptions containing an alias are scanned again for the terms
+        # starting a token, with the character that follows each
+        self.token_pattern = re.compile(f"(?<![a-z0-9])(?=({alternation})(.?))", re.DOTALL) if aliases else None
+
+    def count_skills(self, text: str, terms) -> int:
+        """Distinct skills proven by the term_pattern matches `terms` of `text`"""
+        found = set().union(*(self.term_skills[term] for term in terms))
+        if not self.alias_terms.isdisjoint(terms):
+            for term, following in self.token_pattern.findall(text):
+                for length, indices in self.term_aliases[term]:
+                    after = term[length] if length < len(term) else following
+                    if after not in _TOKEN_CHARS:
+                        found |= indices
+        return len(found) + self.empty_skill
+
+def _text_column(jobs: List[Dict[str, Any]], key: str) -> pd.Series:
+    return pd.Series([value if isinstance(value, str) else "" for value in (job.get(key) for job in jobs)], dtype=object)
+
+def jobs_to_frame(jobs: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Columnar, lowercased view of the fields the basic scorer reads"""
+    description = _text_column(jobs, "description")
+    full_details = _text_column(jobs, "full_details")
+    description = description.where(description != "", full_details)
+    return pd.DataFrame({
+        "title": _text_column(jobs, "job_title").str.lower(),
+        "location": _text_column(jobs, "location").str.lower(),
+        "job_nature": _text_column(jobs, "jobNature").str.lower(),
+        "experience": _text_column(jobs, "experience").str.lower(),
+        "description": description.str.lower(),
+    })
+
+def _contains_factorized(column: pd.Series, needle: str) -> np.ndarray:
+    """Substring test on the distinct values of a low-cardinality column"""
+    codes, uniques = pd.factorize(column)
+    return np.array([needle in value for value in uniques], dtype=bool)[codes]
+
+def _skill_counts(descriptions: pd.Series, compiled: CompiledCriteria) -> np.ndarray:
+    """Matched skills per row, from one regex scan of each description"""
+    if compiled.term_pattern is None:
+        return np.full(len(descriptions), int(compiled.empty_skill), dtype=np.int64)
+    counts = {}  # Without aliases, descriptions mentioning the same terms have the same count
+    findall = compiled.term_pattern.findall
+    result = np.empty(len(descriptions), dtype=np.int64)
+    for row, text in enumerate(descriptions):
+        terms = tuple(findall(text))
+        count = counts.get(terms)
+        if count is None:
+            count = compiled.count_skills(text, terms)
+            if compiled.alias_terms.isdisjoint(terms):
+                counts[terms] = count
+        result[row] = count
+    return result
+
+def score_components(frame: pd.DataFrame, compiled: CompiledCriteria) -> Dict[str, np.ndarray]:
+    """Per-component scores for every row of `frame`"""
+    n = len(frame)
+    components = {
+        "title": np.where(_contains_factorized(frame["title"], compiled.position), TITLE_WEIGHT, 0.0),
+        "location": np.where(_contains_factorized(frame["location"], compiled.location), LOCATION_WEIGHT, 0.0),
+        "job_nature": np.where(_contains_factorized(frame["job_nature"], compiled.job_nature), JOB_NATURE_WEIGHT, 0.0),
+    }
+
+    if compiled.experience_years is not None and n:
+        codes, uniques = pd.factorize(frame["experience"])
+        unique_years = np.array([
+            float(match.group(1)) if match else np.nan
+            for match in (_FIRST_NUMBER.search(value) for value in uniques)
+        ])
+        job_years = unique_years[codes] if len(uniques) else np.full(n, np.nan)
+        with np.errstate(invalid="ignore"):
+            experience_match = np.abs(job_years - compiled.experience_years) <= 1
+        components["experience"] = np.where(experience_match, EXPERIENCE_WEIGHT, 0.0)
+    else:
+        components["experience"] = np.zeros(n)
+
+    skill_matches = _skill_counts(frame["description"], compiled)
+    components["skills"] = np.minimum(MAX_SKILL_SCORE, skill_matches * SKILL_WEIGHT)
+    return components
+
+def combine_components(components: Dict[str, np.ndarray]) -> np.ndarray:
+    """Sum the components in the same order as the per-job scorer and cap at 1.0"""
+    score = np.zeros(len(components["title"]))
+    for name in COMPONENTS:
+        score = score + components[name]
+    return np.minimum(1.0, score)
+
+def score_jobs(jobs: List[Dict[str, Any]], criteria, compiled: Optional[CompiledCriteria] = None) -> np.ndarray:
+    """Basic relevance for every job in one columnar pass"""
+    compiled = compiled or CompiledCriteria(criteria)
+    return combine_components(score_components(jobs_to_frame(jobs), compiled))
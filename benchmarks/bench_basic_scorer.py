@@ -0,0 +1,42 @@
+"""
+Columnar basic relevance scoring vs the per-job calculate_basic_relevance.
+
+    python benchmarks/bench_basic_scorer.py [--jobs 100000]
+
+The columnar scorer is expected to score 100k jobs in under a second.
+"""
+import argparse
+import logging
+import time
+
+from common import criteria, make_jobs, report
+
+import relevance_analyzer
+from basic_scorer import score_jobs
+
+TARGET_SECONDS = 1.0
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=100_000)
+    args = parser.parse_args()
+    logging.disable(logging.DEBUG)  # The per-job scorer logs every match
+
+    jobs, search = make_jobs(args.jobs), criteria()
+    columnar, columnar_time = timed(score_jobs, jobs, search)
+    per_job, per_job_time = timed(relevance_analyzer._basic_scores_per_job, jobs, search)
+
+    report(f"Basic relevance of {args.jobs} jobs", [
+        ("per-job", f"{per_job_time:6.2f}s"),
+        ("columnar", f"{columnar_time:6.2f}s  ({per_job_time / columnar_time:.1f}x, "
+                     f"{'within' if columnar_time < TARGET_SECONDS else 'over'} the {TARGET_SECONDS:.0f}s target)"),
+        ("max score diff", f"{max(abs(a - b) for a, b in zip(columnar, per_job)):.3f}  (skill aliases only)"),
+    ])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Batched vs per-job LLM relevance scoring against a stubbed Gemini.
+
+Reports Gemini calls and wall time for scoring the same candidates one job
+per call and with LLM_BATCH_SIZE jobs per call.
+
+    python benchmarks/bench_batch_scoring.py [--jobs 40] [--latency 0.5] [--quota 0]
+
+--quota applies a calls-per-minute limit like GEMINI_API_LIMIT_PER_MINUTE;
+the default 0 measures latency without it.
+"""
+import argparse
+import asyncio
+import time
+
+from common import criteria, install_stub_gemini, make_jobs, report
+
+import relevance_analyzer
+
+async def per_job(jobs, search):
+    return await asyncio.gather(*(relevance_analyzer.analyze_with_llm_async(job, search) for job in jobs))
+
+async def batched(jobs, search):
+    return await relevance_analyzer.analyze_batch_with_llm_async(jobs, search)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per stubbed Gemini call")
+    parser.add_argument("--quota", type=int, default=0, help="Gemini calls per minute, 0 for unlimited")
+    args = parser.parse_args()
+
+    jobs, search = make_jobs(args.jobs), criteria()
+    rows = []
+    for label, score in (("per-job", per_job), ("batched", batched)):
+        stub = install_stub_gemini(args.latency, args.quota)
+        started = time.perf_counter()
+        scores = asyncio.run(score(jobs, search))
+        elapsed = time.perf_counter() - started
+        scored = sum(score is not None for score in scores)
+        rows.append((label, f"{stub.calls:4d} calls  {elapsed:7.2f}s  {scored}/{len(jobs)} scored"))
+    report(f"LLM scoring of {args.jobs} candidates, {args.latency}s per call", rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Read and write latency of each cache backend for a scored search response.
+
+    python benchmarks/bench_cache_backends.py [--jobs 50] [--ops 2000] [--redis-url URL]
+
+The redis backend runs against fakeredis (in-process) unless --redis-url
+names a real server.
+"""
+import argparse
+import time
+
+from common import make_jobs, report
+
+from bounded_cache import BoundedCache
+from cache_backends import RedisCache, SQLiteCache
+from main import JobListing, JobSearchResponse
+
+def response(count: int) -> JobSearchResponse:
+    listings = [JobListing(**{key: value for key, value in job.items() if key != "description"}, relevance_score=0.7)
+                for job in make_jobs(count)]
+    return JobSearchResponse(relevant_jobs=listings, total_jobs_found=count, search_timestamp="2026-01-01T00:00:00")
+
+def backends(redis_url):
+    options = dict(compress=True, model=JobSearchResponse)
+    yield "memory", BoundedCache("bench", 3600, 10 ** 6, 1 << 34, **options)
+    yield "sqlite", SQLiteCache("bench", 3600, 10 ** 6, 1 << 34, path="bench_cache.sqlite3", **options)
+    if redis_url:
+        yield "redis", RedisCache("bench", 3600, url=redis_url, **options)
+        return
+    try:
+        import fakeredis
+    except ImportError:
+        return
+    yield "redis (fakeredis)", RedisCache("bench", 3600, client=fakeredis.FakeRedis(), **options)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=50, help="listings per cached response")
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--redis-url")
+    args = parser.parse_args()
+
+    value = response(args.jobs)
+    rows = []
+    for label, cache in backends(args.redis_url):
+        started = time.perf_counter()
+        for i in range(args.ops):
+            cache.set(f"search:{i % 100}", value)
+        write = (time.perf_counter() - started) / args.ops
+        started = time.perf_counter()
+        for i in range(args.ops):
+            cache.get(f"search:{i % 100}")
+        read = (time.perf_counter() - started) / args.ops
+        rows.append((label, f"set {write * 1e6:7.0f} us  get {read * 1e6:7.0f} us"))
+    report(f"Cache round trips for a {args.jobs}-listing response", rows)
+
+if __name__ == "__main__":
+    main()
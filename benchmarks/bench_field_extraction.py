@@ -0,0 +1,58 @@
+"""
+LLM field-fill calls saved by the deterministic field extractor.
+
+Runs the recorded description corpus (tests/fixtures/field_extraction.jsonl)
+as jobs whose experience, jobNature and salary are all unspecified, and
+reports how many jobs and fields would still go to the LLM fill prompt,
+plus the extractor's cost per job.
+
+    python benchmarks/bench_field_extraction.py [--repeat 500]
+"""
+import argparse
+import json
+import os
+import time
+
+from common import ROOT, make_jobs, report
+
+from enrichment import resolve_fields
+
+CORPUS_PATH = os.path.join(ROOT, "tests", "fixtures", "field_extraction.jsonl")
+EXTRACTED_FIELDS = ("experience", "jobNature", "salary")
+
+def corpus_jobs() -> list:
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    jobs = []
+    for job, case in zip(make_jobs(len(cases)), cases):
+        job.update({field: "Not specified" for field in EXTRACTED_FIELDS}, description="")
+        job.update(case["job"])
+        jobs.append(job)
+    return jobs
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=500, help="passes over the corpus for the timing")
+    args = parser.parse_args()
+
+    jobs = corpus_jobs()
+    missing = [resolve_fields(job)[1] for job in jobs]
+    jobs_for_llm = sum(bool(fields) for fields in missing)
+    fields_for_llm = sum(len(fields) for fields in missing)
+    fields_total = len(jobs) * len(EXTRACTED_FIELDS)
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for job in jobs:
+            resolve_fields(job)
+    per_job = (time.perf_counter() - started) / (args.repeat * len(jobs))
+
+    report(f"Field extraction over {len(jobs)} corpus jobs", [
+        ("fill calls without", f"{len(jobs)}"),
+        ("fill calls with", f"{jobs_for_llm}  ({1 - jobs_for_llm / len(jobs):.0%} fewer)"),
+        ("fields left for LLM", f"{fields_for_llm}/{fields_total}  ({1 - fields_for_llm / fields_total:.0%} extracted)"),
+        ("extractor cost", f"{per_job * 1e6:.1f} us/job"),
+    ])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Conversion of a jobspy results frame into job records: the previous
+per-row iterrows loop of the Indeed source vs the column-wise
+jobspy_normalizer, including the raw log dump each one writes.
+
+    python benchmarks/bench_jobspy_normalizer.py [--rows 10000] [--runs 3]
+
+The frame is synthetic but has jobspy's columns, with missing salaries,
+job types and experience phrases mixed in.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import criteria, report
+
+from field_extractor import extract_experience
+from job_sources.indeed import INDEED_FIELDS
+from job_sources.jobspy_normalizer import normalize_jobs, raw_json
+
+DESCRIPTIONS = [
+    "We need a Python developer with 3-5 years of Django experience.",
+    "At least two years building REST APIs in Python.",
+    "Fresh graduates welcome; training provided.",
+    "Senior role, 7+ years with distributed systems.",
+    "Build data pipelines in SQL and Airflow.",
+]
+
+def jobspy_frame(rows: int) -> pd.DataFrame:
+    i = np.arange(rows)
+    has_salary = i % 3 != 0
+    return pd.DataFrame({
+        "id": [f"in-{n}" for n in i],
+        "site": "indeed",
+        "job_url": [f"https://www.indeed.com/viewjob?jk={n:08x}" for n in i],
+        "title": np.array(["Python Developer", "Backend Engineer", "Data Engineer", "Django Developer"])[i % 4],
+        "company": [f"Company {n % 500}" for n in i],
+        "location": np.where(i % 5 == 0, None, "Lahore, Punjab, PK"),
+        "date_posted": pd.Timestamp("2026-10-01") - pd.to_timedelta(i % 30, unit="D"),
+        "job_type": np.array(["fulltime", "contract", None, "parttime"], dtype=object)[i % 4],
+        "interval": np.where(has_salary, "yearly", None),
+        "min_amount": np.where(has_salary, 60000 + (i % 40) * 1000, np.nan),
+        "max_amount": np.where(has_salary, 90000 + (i % 40) * 1000, np.nan),
+        "currency": np.where(has_salary, "USD", None),
+        "is_remote": i % 2 == 0,
+        "description": np.array(DESCRIPTIONS)[i % len(DESCRIPTIONS)],
+        "company_industry": "Software",
+        "company_description": "A software company.",
+        "company_rating": np.where(i % 4 == 0, np.nan, 4.1),
+        "company_reviews_count": np.where(i % 4 == 0, np.nan, 120.0),
+    })
+
+def per_row(frame: pd.DataFrame, search) -> list:
+    """The Indeed source's conversion before jobspy_normalizer"""
+    json.dumps(frame.to_dict(orient="records"), indent=2, default=str)  # Raw log
+    jobs_list = []
+    for _, job in frame.iterrows():
+        salary = "Not specified"
+        if job.get('min_amount') is not None and job.get('max_amount') is not None:
+            min_amount = job.get('min_amount')
+            max_amount = job.get('max_amount')
+            interval = job.get('interval', 'yearly')
+            currency = job.get('currency', 'USD')
+            if min_amount == max_amount:
+                salary = f"{currency} {min_amount:,} per {interval}"
+            else:
+                salary = f"{currency} {min_amount:,} - {max_amount:,} per {interval}"
+        job_nature = job.get('job_type', search.jobNature)
+        if job_nature and str(job_nature) != 'nan':
+            job_nature = str(job_nature).title()
+        jobs_list.append({
+            "job_title": job.get('title', 'Unknown Title'),
+            "company": job.get('company', 'Unknown Company'),
+            "experience": extract_experience(job.get('description', '')),
+            "jobNature": job_nature,
+            "location": job.get('location', search.location),
+            "salary": salary,
+            "apply_link": job.get('job_url', ''),
+            "source": "Indeed",
+            "description": job.get('description', 'No description available'),
+            "company_industry": job.get('company_industry', ''),
+            "company_description": job.get('company_description', ''),
+            "company_rating": job.get('company_rating', ''),
+            "company_reviews": job.get('company_reviews_count', ''),
+            "date_posted": job.get('date_posted', ''),
+        })
+    return jobs_list
+
+def columnar(frame: pd.DataFrame, search) -> list:
+    raw_json(frame)  # Raw log
+    return normalize_jobs(frame, "Indeed", search, INDEED_FIELDS)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    frame, search = jobspy_frame(args.rows), criteria()
+    rows = []
+    for label, convert in (("per-row", per_row), ("columnar", columnar)):
+        times = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            jobs = convert(frame, search)
+            times.append(time.perf_counter() - started)
+        rows.append((label, f"{min(times):6.3f}s  ({args.rows / min(times):,.0f} rows/s, {len(jobs)} jobs)"))
+    same = [job["experience"] for job in per_row(frame, search)] == [job["experience"] for job in columnar(frame, search)]
+    rows.append(("same experience", "yes" if same else "NO, the conversions extracted different values"))
+    report(f"jobspy frame of {args.rows} rows to job records, raw log included (best of {args.runs})", rows)
+
+if __name__ == "__main__":
+    main()
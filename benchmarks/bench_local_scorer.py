@@ -0,0 +1,52 @@
+"""
+Throughput of the offline TF-IDF scorer, and how well it ranks jobs the way
+Gemini does.
+
+    python benchmarks/bench_local_scorer.py [--jobs 10000] [--samples PATH]
+
+Rank agreement needs real Gemini scores: --samples points at a distillation
+sample log (DISTILL_SAMPLES_PATH, written by the service while scoring with
+the LLM), whose rows carry each logged Gemini score next to the local
+similarity of the same (job, criteria) pair. Without one only throughput is
+reported.
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from common import INVOKED_FROM, criteria, make_jobs, report
+
+from distill import FEATURE_NAMES, SampleLog
+from local_scorer import local_scores
+
+def rank_correlation(path: str):
+    """Spearman correlation between logged Gemini scores and local similarity"""
+    _, features, scores = SampleLog(path).load(max_samples=10 ** 9)
+    if len(scores) < 2:
+        return None, len(scores)
+    similarity = pd.Series(features[:, FEATURE_NAMES.index("local_similarity")])
+    # Pearson on ranks; pandas' method="spearman" would need SciPy
+    return similarity.rank().corr(pd.Series(scores).rank()), len(scores)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=10_000)
+    parser.add_argument("--samples", help="distillation sample log with logged Gemini scores")
+    args = parser.parse_args()
+
+    jobs, search = make_jobs(args.jobs), criteria(scorer="local")
+    started = time.perf_counter()
+    local_scores(jobs, search)
+    elapsed = time.perf_counter() - started
+    rows = [("throughput", f"{args.jobs / elapsed:,.0f} jobs/s  ({elapsed:.2f}s for {args.jobs})")]
+
+    if args.samples:
+        correlation, count = rank_correlation(os.path.join(INVOKED_FROM, args.samples))
+        rows.append(("spearman vs Gemini", f"{correlation:.3f} over {count} samples" if correlation is not None
+                     else f"not enough samples ({count})"))
+    report("Local TF-IDF scorer", rows)
+
+if __name__ == "__main__":
+    main()
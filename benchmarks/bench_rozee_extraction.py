@@ -0,0 +1,169 @@
+"""
+Per-card extraction time of the Rozee.pk Selenium scraper: "elements"
+(one WebDriver lookup per field) vs "snapshot" (one page_source, parsed in
+Python).
+
+The recorded pages in tests/fixtures/rozee are served by a stub driver that
+charges a round trip per WebDriver command and, like Chrome, the implicit
+wait for every lookup that finds nothing. Charged time is simulated, so the
+benchmark is fast and deterministic; parsing time is measured for real.
+
+    python benchmarks/bench_rozee_extraction.py [--rtt 0.005] [--implicit-wait 5]
+
+The implicit waits are those _create_driver sets for each mode.
+"""
+import argparse
+import os
+import re
+import time
+from types import SimpleNamespace
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from common import report
+
+from job_sources import rozee
+from job_sources.rozee_parser import CARD_SELECTOR, DETAIL_CONTAINER_ID, HTML_PARSER, parse_detail, parse_listing
+from testkit import FIXTURES as ALL_FIXTURES
+
+FIXTURES = os.path.join(ALL_FIXTURES, "rozee")
+CRITERIA = SimpleNamespace(position="Python Developer", location="Lahore, Pakistan")
+
+# The only XPath shape the scraper uses: a heading with exact text, then the div after it
+_SECTION_XPATH = re.compile(r"\.//(\w+)\[text\(\)='([^']+)'\]/following-sibling::div\[1\]")
+
+class StubDriver:
+    def __init__(self, html: str, rtt: float, implicit_wait: float):
+        self.html = html
+        self.root = StubElement(BeautifulSoup(html, HTML_PARSER), self)
+        self.rtt = rtt
+        self.implicit_wait = implicit_wait
+        self.charged = 0.0
+        self.commands = 0
+        self.current_url = "https://www.rozee.pk/job/jsearch/q/Python%20Developer"
+
+    def command(self):
+        self.commands += 1
+        self.charged += self.rtt
+
+    @property
+    def page_source(self) -> str:
+        self.command()
+        return self.html
+
+    def find_element(self, by, value):
+        return self.root.find_element(by, value)
+
+    def find_elements(self, by, value):
+        return self.root.find_elements(by, value)
+
+class StubElement:
+    def __init__(self, node, driver: StubDriver):
+        self.node = node
+        self.driver = driver
+
+    def _select(self, by, value):
+        if by == By.CSS_SELECTOR:
+            return self.node.select(value)
+        if by == By.TAG_NAME:
+            return self.node.find_all(value)
+        if by == By.ID:
+            found = self.node.find(id=value)
+            return [found] if found is not None else []
+        if by == By.XPATH:
+            tag, text = _SECTION_XPATH.fullmatch(value).groups()
+            heading = next((node for node in self.node.find_all(tag) if node.get_text() == text), None)
+            sibling = heading.find_next_sibling("div") if heading is not None else None
+            return [sibling] if sibling is not None else []
+        raise ValueError(by)
+
+    def find_elements(self, by, value):
+        self.driver.command()
+        found = [StubElement(node, self.driver) for node in self._select(by, value)]
+        if not found:
+            self.driver.charged += self.driver.implicit_wait
+        return found
+
+    def find_element(self, by, value):
+        self.driver.command()
+        found = self._select(by, value)
+        if not found:
+            self.driver.charged += self.driver.implicit_wait
+            raise NoSuchElementException(value)
+        return StubElement(found[0], self.driver)
+
+    @property
+    def text(self) -> str:
+        self.driver.command()
+        return self.node.get_text("\n", strip=True)
+
+    @property
+    def tag_name(self) -> str:
+        self.driver.command()
+        return self.node.name
+
+    def get_attribute(self, name):
+        self.driver.command()
+        value = self.node.get(name)
+        # Like Selenium, links come back absolute
+        return urljoin(self.driver.current_url, value) if name == "href" and value else value
+
+    def is_displayed(self) -> bool:
+        self.driver.command()
+        return True
+
+def extract_listing(driver, mode):
+    if mode == "snapshot":
+        return parse_listing(driver.page_source, driver.current_url, CRITERIA.location)
+    return [rozee.read_job_card(card, CRITERIA) for card in driver.find_elements(By.CSS_SELECTOR, CARD_SELECTOR)]
+
+def extract_detail(driver, mode):
+    container = driver.find_element(By.ID, DETAIL_CONTAINER_ID)  # The scraper's visibility wait
+    if mode == "snapshot":
+        return parse_detail(driver.page_source)
+    return rozee.read_job_details(driver, container)
+
+def measure(pages, extract, mode, rtt, implicit_wait):
+    """(seconds per page including charged time, WebDriver commands per page)"""
+    total, commands = 0.0, 0
+    for html in pages:
+        driver = StubDriver(html, rtt, implicit_wait)
+        started = time.perf_counter()
+        extract(driver, mode)
+        total += time.perf_counter() - started + driver.charged
+        commands += driver.commands
+    return total / len(pages), commands / len(pages)
+
+def read(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rtt", type=float, default=0.005, help="seconds per WebDriver command")
+    parser.add_argument("--implicit-wait", type=float, default=5.0, help="implicit wait of the elements mode")
+    args = parser.parse_args()
+
+    listing = read("listing.html")
+    cards = len(parse_listing(listing, "https://www.rozee.pk/", CRITERIA.location))
+    details = [read(name) for name in sorted(os.listdir(FIXTURES)) if name.startswith("job-")]
+
+    same = all(
+        extract(StubDriver(html, 0, 0), "elements") == extract(StubDriver(html, 0, 0), "snapshot")
+        for extract, pages in ((extract_listing, [listing]), (extract_detail, details)) for html in pages
+    )
+    rows = []
+    for mode, implicit_wait in (("elements", args.implicit_wait), ("snapshot", 0.0)):
+        listing_time, listing_commands = measure([listing], extract_listing, mode, args.rtt, implicit_wait)
+        detail_time, detail_commands = measure(details, extract_detail, mode, args.rtt, implicit_wait)
+        rows.append((mode, f"listing {listing_time / cards * 1000:8.1f} ms/card ({listing_commands / cards:4.1f} cmds)  "
+                           f"detail {detail_time * 1000:8.1f} ms/card ({detail_commands:5.1f} cmds)"))
+    rows.append(("same fields", "yes" if same else "NO, the modes extracted different values"))
+    report(f"Rozee.pk extraction, {args.rtt * 1000:g} ms per WebDriver command, "
+           f"{args.implicit_wait:g}s implicit wait in elements mode", rows)
+
+if __name__ == "__main__":
+    main()
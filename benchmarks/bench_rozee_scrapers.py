@@ -0,0 +1,89 @@
+"""
+Latency and memory of the Rozee.pk scrapers: browserless HTTP vs Selenium.
+
+Both run against the recorded pages in tests/fixtures/rozee, served on
+localhost with a fixed delay per response standing in for Rozee's latency.
+
+    python benchmarks/bench_rozee_scrapers.py [--delay 0.2] [--runs 5] [--selenium]
+
+--selenium also runs the Chrome scraper; it needs Chrome and chromedriver.
+Memory is the Python heap peak for the HTTP scraper, and the Chrome process
+tree's resident memory for Selenium.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from common import report
+
+from bounded_cache import BoundedCache
+from config import ROZEE_LISTING_CACHE_TTL
+from testkit import ROZEE_ROUTES, FixtureSite
+from job_sources import rozee_http, rozee_parser
+
+CRITERIA = SimpleNamespace(position="Python Developer", location="Lahore, Pakistan")
+
+def fresh_listing_cache(module):
+    """Every run loads its listing pages, like a new search"""
+    module.listing_cache = BoundedCache("rozee_listing", ROZEE_LISTING_CACHE_TTL, 256, 8 << 20)
+
+def bench_http(runs: int):
+    async def run():
+        try:
+            return await rozee_http.fetch_rozee_jobs_http(CRITERIA)
+        finally:
+            await rozee_http.close_client()
+
+    rozee_http.LAZY_DETAILS = False
+    times = []
+    tracemalloc.start()
+    for _ in range(runs):
+        fresh_listing_cache(rozee_http)
+        started = time.perf_counter()
+        jobs = asyncio.run(run())
+        times.append(time.perf_counter() - started)
+    peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return times, len(jobs), f"{peak_mb:.1f} MB Python heap peak"
+
+def bench_selenium(runs: int):
+    from job_sources import rozee
+    rozee.LAZY_DETAILS = False
+    pooled = rozee.driver_pool.acquire()
+    try:
+        times = []
+        for _ in range(runs):
+            fresh_listing_cache(rozee)
+            started = time.perf_counter()
+            jobs = rozee._scrape_rozee(pooled.driver, CRITERIA)
+            times.append(time.perf_counter() - started)
+        return times, len(jobs), f"{pooled.rss_mb():.0f} MB Chrome resident"
+    finally:
+        rozee.driver_pool.release(pooled)
+        rozee.driver_pool.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.2, help="seconds per response from the fixture server")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--selenium", action="store_true", help="also run the Chrome scraper")
+    args = parser.parse_args()
+
+    site = FixtureSite(ROZEE_ROUTES, delay=args.delay)
+    rozee_parser.SEARCH_URL = site.url + "/job/jsearch/q/{query}"
+    scrapers = [("http", bench_http)] + ([("selenium", bench_selenium)] if args.selenium else [])
+    rows = []
+    try:
+        for label, bench in scrapers:
+            times, count, memory = bench(args.runs)
+            rows.append((label, f"median {statistics.median(times):6.2f}s  max {max(times):6.2f}s  "
+                                f"{count} jobs  {memory}"))
+    finally:
+        site.close()
+    report(f"Rozee.pk search with details, {args.delay}s per response, {args.runs} runs", rows)
+
+if __name__ == "__main__":
+    main()
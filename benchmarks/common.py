@@ -0,0 +1,52 @@
+"""
+Shared setup for the benchmark scripts.
+
+Benchmarks run from a fresh temporary working directory, so the SQLite
+stores, model files and logs the modules create do not touch the checkout,
+and Gemini is replaced by a stub with a fixed latency.
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from testkit import StubGemini, enter_temp_workdir, make_job  # noqa: E402
+
+# Before any benchmark imports the modules that open their stores and logs
+INVOKED_FROM = enter_temp_workdir("job-finder-bench-")  # Relative paths given on the command line resolve against this
+
+def criteria(**overrides) -> SimpleNamespace:
+    fields = dict(position="Python Developer", experience="2 years", salary="100,000 PKR", jobNature="Remote",
+                  location="Lahore, Pakistan", skills="python, django, rest, sql, docker", scorer="llm",
+                  max_llm_calls=None, llm_top_k=None)
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+def make_jobs(count: int, description: str = "") -> list:
+    """Synthetic jobs with every standardized field set"""
+    titles = ["Python Developer", "Senior Python Engineer", "Django Developer", "Data Engineer", "Accountant"]
+    return [make_job(
+        i,
+        job_title=titles[i % len(titles)],
+        experience=f"{1 + i % 6} years",
+        jobNature="Remote" if i % 2 else "Onsite",
+        location="Lahore, Pakistan" if i % 3 else "Karachi, Pakistan",
+        description=description or f"We need python, django and sql. Posting {i}.",
+    ) for i in range(count)]
+
+def install_stub_gemini(latency: float, rate_per_minute: int = 0) -> StubGemini:
+    """Route every Gemini call to a StubGemini; rate_per_minute 0 lifts the shared quota"""
+    import llm_scheduler
+    stub = StubGemini(latency)
+    llm_scheduler._generate_blocking = stub
+    llm_scheduler.rate_limiter = llm_scheduler.TokenBucket(rate_per_minute or 10 ** 6)
+    return stub
+
+def report(title: str, rows: list):
+    """Print rows of (label, value) pairs as an aligned table"""
+    print(title)
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {label.ljust(width)}  {value}")
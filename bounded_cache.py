@@ -0,0 +1,111 @@
+"""
+Bounded in-memory cache with LRU eviction and memory accounting.
+
+Values are stored JSON-encoded (optionally zlib-compressed), so every entry
+has a known size and every read returns an independent copy. The cache is
+bounded by both entry count and total payload bytes; the least recently
+used entries are evicted first. Expired entries are dropped when read and
+by a periodic sweep, rather than by one timer per key.
+
+With a grace period, expired entries are kept that much longer so callers
+can serve them as stale while a fresh value is computed.
+
+This is the "memory" cache backend; see cache_backends for the shared ones.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from cache_backends import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+class _Entry:
+    __slots__ = ("payload", "size", "expires_at")
+
+    def __init__(self, payload: bytes, expires_at: float):
+        self.payload = payload
+        self.size = len(payload)
+        self.expires_at = expires_at
+
+class BoundedCache(CacheBackend):
+    blocking = False
+
+    def __init__(self, name: str, ttl: float, max_entries: int, max_bytes: int, compress: bool = False,
+                 grace: float = 0, model: Optional[Type[BaseModel]] = None):
+        super().__init__(name, ttl, compress, grace, model)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _remove(self, key: Hashable) -> _Entry:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        return entry
+
+    def _read(self, key: Hashable) -> Optional[Tuple[bytes, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry.payload, entry.expires_at
+
+    def _write(self, key: Hashable, payload: bytes, expires_at: float):
+        if len(payload) > self.max_bytes:
+            logger.warning(f"{self.name} cache: value for {key} is larger than the cache, not stored")
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(payload, expires_at)
+            self._bytes += len(payload)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._count("evictions")
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sweep(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry.expires_at + self.grace <= now]
+            for key in expired:
+                self._remove(key)
+        self._count("expirations", len(expired))
+        return len(expired)
+
+    def _storage_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+async def sweep_periodically(caches, interval: float):
+    """One sweeper task for all caches"""
+    while True:
+        await asyncio.sleep(interval)
+        for cache in caches:
+            try:
+                removed = await cache.sweep_async()
+                if removed:
+                    logger.info(f"Swept {removed} expired entries from the {cache.name} cache")
+            except Exception as e:
+                logger.error(f"Error sweeping the {cache.name} cache: {str(e)}")
@@ -0,0 +1,395 @@
+"""
+Cache backends shared by the search, source and LLM score caches.
+
+CacheBackend holds what every backend does the same way: JSON encoding (and
+optional zlib compression) of values, TTLs, the stale grace period and
+hit/miss accounting. Subclasses only store opaque payloads:
+
+- memory: bounded_cache.BoundedCache, private to one process
+- sqlite: SQLiteCache, a WAL-mode file shared by every worker on a host
+- redis:  RedisCache, shared by every worker on every host
+
+CACHE_BACKEND selects the backend used by create_cache.
+
+Values are plain JSON data, or instances of the pydantic model a cache is
+created with, so entries written by one process can never run code in
+another. Backends that block on I/O are called from the event loop through
+the *_async methods, which run them in cache_executor.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from config import CACHE_BACKEND, CACHE_IO_WORKERS, CACHE_SQLITE_PATH, CACHE_SQLITE_RECOUNT_EVERY, REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+# SQLite and Redis calls from the event loop, kept apart from the scrapers on the default executor
+cache_executor = ThreadPoolExecutor(max_workers=CACHE_IO_WORKERS, thread_name_prefix="cache-io")
+
+class CacheBackend:
+    # Whether reads and writes wait on disk or network; False runs the *_async methods inline
+    blocking = True
+
+    def __init__(self, name: str, ttl: float, compress: bool = False, grace: float = 0,
+                 model: Optional[Type[BaseModel]] = None):
+        self.name = name
+        self.ttl = ttl
+        self.compress = compress
+        self.grace = grace
+        self.model = model
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._counter_lock = threading.Lock()
+
+    # Storage, implemented by each backend
+
+    def _read(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """(payload, expires_at) for `key`, marking it recently used"""
+        raise NotImplementedError
+
+    def _read_many(self, keys: List[str]) -> List[Optional[Tuple[bytes, float]]]:
+        return [self._read(key) for key in keys]
+
+    def _write(self, key: str, payload: bytes, expires_at: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def sweep(self) -> int:
+        """Drop entries past their TTL and grace period; returns how many were removed"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def _storage_stats(self) -> Dict[str, Any]:
+        return {}
+
+    # Shared behaviour
+
+    def _encode(self, value: Any) -> bytes:
+        if isinstance(value, BaseModel):
+            payload = value.model_dump_json().encode("utf-8")
+        else:
+            payload = json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+        return zlib.compress(payload) if self.compress else payload
+
+    def _decode(self, payload: bytes) -> Any:
+        payload = zlib.decompress(payload) if self.compress else payload
+        return self.model.model_validate_json(payload) if self.model is not None else json.loads(payload)
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _resolve(self, key: str, found: Optional[Tuple[bytes, float]], max_stale: float) -> Optional[Tuple[Any, bool]]:
+        now = time.time()
+        if found is not None and found[1] + self.grace <= now:
+            self.delete(key)
+            self._count("expirations")
+            found = None
+        if found is None or found[1] + max_stale <= now:
+            self._count("misses")
+            return None
+        payload, expires_at = found
+        try:
+            value = self._decode(payload)
+        except (ValueError, zlib.error) as e:
+            # Written in another format, e.g. by an older version
+            logger.warning(f"Dropping undecodable entry from the {self.name} cache: {str(e)}")
+            self.delete(key)
+            self._count("misses")
+            return None
+        stale = expires_at <= now
+        self._count("stale_hits" if stale else "hits")
+        return value, stale
+
+    def _lookup(self, key: str, max_stale: float) -> Optional[Tuple[Any, bool]]:
+        return self._resolve(key, self._read(key), max_stale)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Copy of the cached value, or None if it is missing or expired"""
+        found = self._lookup(key, max_stale=0)
+        return found[0] if found else None
+
+    def get_entry(self, key: str, max_stale: Optional[float] = None) -> Optional[Tuple[Any, bool]]:
+        """
+        (copy of the value, whether it is stale), including entries that
+        expired less than `max_stale` seconds ago (default: the grace period)
+        """
+        return self._lookup(key, self.grace if max_stale is None else min(max_stale, self.grace))
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Fresh cached values for whichever of `keys` have one"""
+        keys = list(keys)
+        found = {}
+        for key, entry in zip(keys, self._read_many(keys)):
+            resolved = self._resolve(key, entry, max_stale=0)
+            if resolved:
+                found[key] = resolved[0]
+        return found
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._write(key, self._encode(value), time.time() + (self.ttl if ttl is None else ttl))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            counters = {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+        return {"backend": type(self).__name__, **self._storage_stats(), **counters}
+
+    # Event loop entry points
+
+    async def _call(self, func, *args):
+        if not self.blocking:
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(cache_executor, func, *args)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        return await self._call(self.get, key)
+
+    async def get_entry_async(self, key: str, max_stale: Optional[float] = None) -> Optional[Tuple[Any, bool]]:
+        return await self._call(self.get_entry, key, max_stale)
+
+    async def set_async(self, key: str, value: Any, ttl: Optional[float] = None):
+        await self._call(self.set, key, value, ttl)
+
+    async def sweep_async(self) -> int:
+        return await self._call(self.sweep)
+
+    async def stats_async(self) -> Dict[str, Any]:
+        return await self._call(self.stats)
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache table in a SQLite file, shared by all worker processes on a host.
+    Each instance keeps running totals of the entries and bytes it has seen,
+    so a write only counts the table when the totals cross a bound or every
+    CACHE_SQLITE_RECOUNT_EVERY writes, to take in the other workers' writes.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int, max_bytes: int, compress: bool = False,
+                 grace: float = 0, model: Optional[Type[BaseModel]] = None, path: str = CACHE_SQLITE_PATH):
+        super().__init__(name, ttl, compress, grace, model)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.table = f"cache_{name}"
+        self._local = threading.local()
+        self._size: Optional[int] = None  # Running totals; None until the table is counted
+        self._bytes = 0
+        self._writes = 0  # Writes since the last count
+        self._connection().execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._connection().execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _read(self, key: str) -> Optional[Tuple[bytes, float]]:
+        conn = self._connection()
+        try:
+            row = conn.execute(f"SELECT payload, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            logger.error(f"Error reading the {self.name} cache: {str(e)}")
+            return None
+        return (bytes(row[0]), row[1]) if row else None
+
+    def _write(self, key: str, payload: bytes, expires_at: float):
+        conn = self._connection()
+        try:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, payload, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, time.time())
+            )
+            self._evict(conn, len(payload))
+        except sqlite3.Error as e:
+            logger.error(f"Error writing the {self.name} cache: {str(e)}")
+
+    def _recount_due(self, payload_size: int) -> bool:
+        """Add a write to the running totals; True if the table needs an exact count"""
+        with self._counter_lock:
+            self._writes += 1
+            if self._size is None:
+                return True
+            # A replaced entry is counted again, which only brings the next count forward
+            self._size += 1
+            self._bytes += payload_size
+            return (self._size > self.max_entries or self._bytes > self.max_bytes
+                    or self._writes >= CACHE_SQLITE_RECOUNT_EVERY)
+
+    def _evict(self, conn: sqlite3.Connection, payload_size: int):
+        """Least recently used entries go first until both bounds hold"""
+        if not self._recount_due(payload_size):
+            return
+        size, total = conn.execute(f"SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM {self.table}").fetchone()
+        while size > self.max_entries or total > self.max_bytes:
+            row = conn.execute(
+                f"SELECT key, LENGTH(payload) FROM {self.table} ORDER BY accessed_at ASC LIMIT 1"
+            ).fetchone()
+            if not row:
+                break
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (row[0],))
+            size, total = size - 1, total - row[1]
+            self._count("evictions")
+        with self._counter_lock:
+            self._size, self._bytes, self._writes = size, total, 0
+
+    def delete(self, key: str):
+        try:
+            self._connection().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.error(f"Error deleting from the {self.name} cache: {str(e)}")
+
+    def sweep(self) -> int:
+        try:
+            removed = self._connection().execute(
+                f"DELETE FROM {self.table} WHERE expires_at < ?", (time.time() - self.grace,)
+            ).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Error sweeping the {self.name} cache: {str(e)}")
+            return 0
+        if removed:
+            with self._counter_lock:
+                self._size = None  # The bytes removed are not known; the next write counts the table
+        self._count("expirations", removed)
+        return removed
+
+    def __len__(self) -> int:
+        return self._connection().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def _storage_stats(self) -> Dict[str, Any]:
+        try:
+            size, total = self._connection().execute(
+                f"SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM {self.table}"
+            ).fetchone()
+        except sqlite3.Error:
+            size, total = None, None
+        return {"size": size, "bytes": total, "max_entries": self.max_entries, "max_bytes": self.max_bytes}
+
+_EXPIRY = struct.Struct("<d")
+
+class RedisCache(CacheBackend):
+    """
+    Cache in Redis (or anything speaking its protocol), shared by every
+    worker on every host. Redis drops entries itself once their TTL and
+    grace period are over; memory bounds are the server's maxmemory policy.
+    `client` is any redis-py compatible client, e.g. fakeredis in tests.
+
+    Counting one cache's keys takes a SCAN of the whole keyspace, so stats
+    report the database's DBSIZE (every cache together) instead.
+    """
+
+    def __init__(self, name: str, ttl: float, compress: bool = False, grace: float = 0,
+                 model: Optional[Type[BaseModel]] = None, url: str = REDIS_URL, client=None):
+        super().__init__(name, ttl, compress, grace, model)
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("CACHE_BACKEND is 'redis' but the redis package is not installed")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = f"jobfinder:{name}:"
+
+    def _read(self, key: str) -> Optional[Tuple[bytes, float]]:
+        try:
+            value = self.client.get(self.prefix + key)
+        except Exception as e:
+            logger.error(f"Error reading the {self.name} cache: {str(e)}")
+            return None
+        return self._unpack(value)
+
+    def _read_many(self, keys: List[str]) -> List[Optional[Tuple[bytes, float]]]:
+        if not keys:
+            return []
+        try:
+            values = self.client.mget([self.prefix + key for key in keys])
+        except Exception as e:
+            logger.error(f"Error reading the {self.name} cache: {str(e)}")
+            return [None] * len(keys)
+        return [self._unpack(value) for value in values]
+
+    @staticmethod
+    def _unpack(value: Optional[bytes]) -> Optional[Tuple[bytes, float]]:
+        if value is None:
+            return None
+        return value[_EXPIRY.size:], _EXPIRY.unpack_from(value)[0]
+
+    def _write(self, key: str, payload: bytes, expires_at: float):
+        retain_ms = max(1, int((expires_at + self.grace - time.time()) * 1000))
+        try:
+            self.client.set(self.prefix + key, _EXPIRY.pack(expires_at) + payload, px=retain_ms)
+        except Exception as e:
+            logger.error(f"Error writing the {self.name} cache: {str(e)}")
+
+    def delete(self, key: str):
+        try:
+            self.client.delete(self.prefix + key)
+        except Exception as e:
+            logger.error(f"Error deleting from the {self.name} cache: {str(e)}")
+
+    def sweep(self) -> int:
+        # Redis expires keys on its own
+        return 0
+
+    def __len__(self) -> int:
+        """Keys of this cache; walks the whole keyspace, so not for hot paths"""
+        return sum(1 for _ in self.client.scan_iter(match=self.prefix + "*", count=1000))
+
+    def _storage_stats(self) -> Dict[str, Any]:
+        try:
+            db_size = self.client.dbsize()
+        except Exception as e:
+            logger.error(f"Error reading {self.name} cache stats: {str(e)}")
+            db_size = None
+        return {"size": None, "db_size": db_size}
+
+def create_cache(name: str, ttl: float, max_entries: int, max_bytes: int, compress: bool = False,
+                 grace: float = 0, model: Optional[Type[BaseModel]] = None,
+                 backend: str = CACHE_BACKEND) -> CacheBackend:
+    """Cache of the configured backend type; `model` is the pydantic type of the values, if any"""
+    if backend == "sqlite":
+        return SQLiteCache(name, ttl, max_entries, max_bytes, compress, grace, model)
+    if backend == "redis":
+        return RedisCache(name, ttl, compress, grace, model)
+    if backend != "memory":
+        raise ValueError(f"Unknown cache backend: {backend}")
+    from bounded_cache import BoundedCache
+    return BoundedCache(name, ttl, max_entries, max_bytes, compress, grace, model)
@@ -13,11 +13,65 @@ GEMINI_API_KEY = None  # Set via environment variable
 # Scraping Settings
 SELENIUM_WAIT_TIME = 20
 SELENIUM_IMPLICIT_WAIT = 10
+DRIVER_POOL_MIN_SIZE = 1  # Rozee browsers kept warm per process (with ROZEE_SCRAPER "selenium"; none with "http")
+DRIVER_POOL_MAX_SIZE = 3  # Concurrent Rozee browsers per process; further searches wait in line
+DRIVER_POOL_ACQUIRE_TIMEOUT = 60  # Seconds a search waits for a free browser before skipping Rozee
+DRIVER_MAX_USES = 50  # A browser is restarted after this many searches
+DRIVER_MAX_AGE = 3600  # ...or after this many seconds
+DRIVER_MAX_MEMORY_MB = 1024  # ...or when its processes use more memory than this
+DRIVER_LEASE_TIMEOUT = 300  # A browser checked out longer than this is considered stuck and killed
+DRIVER_WATCHDOG_INTERVAL = 30  # Seconds between pool health checks
+ROZEE_SCRAPER = "http"  # "http" (no browser; falls back to Selenium if the pages do not parse) or "selenium"
+ROZEE_HTTP_TIMEOUT = 15  # Seconds per Rozee HTTP request
+ROZEE_HTTP_MAX_CONNECTIONS = 10  # Concurrent connections to Rozee per process
+ROZEE_DETAIL_CONCURRENCY = 8  # Rozee detail pages loaded at once (browser tabs) per search
+ROZEE_DETAIL_TIMEOUT = 15  # Seconds a single detail page may take; slower ones keep only listing fields
+ROZEE_PAGE_LOAD_STRATEGY = "eager"  # "eager" returns once the DOM is ready; waits target the job list instead of the load event
+ROZEE_ALLOWED_DOMAINS = ["rozee.pk"]  # The browser only resolves these domains and their subdomains; empty allows all
+ROZEE_ALLOWED_RESOURCE_TYPES = ["document", "script", "xhr", "fetch"]  # Images, stylesheets, fonts and media are blocked unless listed
+ROZEE_LISTING_PAGE_SIZE = 20  # Job cards on one Rozee.pk search results page
+ROZEE_MAX_LISTING_PAGES = 10  # Listing pages one search reads to fill a page of jobs in the requested city
+ROZEE_LISTING_CACHE_TTL = 600  # Seconds a parsed listing page is reused by the following pages of a search
+ROZEE_EXTRACTION = "snapshot"  # Selenium extraction: "snapshot" (parse one page_source per page) or "elements" (WebDriver lookup per field)
 MAX_RETRIES = 3
 REQUEST_TIMEOUT = 30
 
 # Cache Settings
 CACHE_EXPIRY = 3600  # Cache expiry in seconds (1 hour)
+SOURCE_CACHE_TTL = {  # Expiry of raw per-source results, in seconds
+    "Indeed": 3600,
+    "LinkedIn": 3600,
+    "Rozee": 1800,
+}
+JOB_CACHE_MAX_ENTRIES = 1000  # Scored responses kept in memory
+JOB_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Memory bound for scored responses
+SOURCE_CACHE_MAX_ENTRIES = 1000  # Raw per-source results kept in memory
+SOURCE_CACHE_MAX_BYTES = 128 * 1024 * 1024  # Memory bound for raw source results
+CACHE_COMPRESS = True  # zlib-compress cached payloads
+CACHE_SWEEP_INTERVAL = 60  # Seconds between sweeps for expired entries
+CACHE_STALE_GRACE = 6 * 3600  # Expired search results are served as stale (and refreshed) for this long; 0 disables
+CACHE_STALE_IF_ERROR = 24 * 3600  # Expired search results are kept this long to answer searches whose sources all fail
+CACHE_BACKEND = "memory"  # "memory" (per process), "sqlite" (shared by workers on a host) or "redis" (shared by all hosts)
+CACHE_SQLITE_PATH = "job_cache.sqlite3"  # Cache file for the sqlite backend
+CACHE_SQLITE_RECOUNT_EVERY = 100  # Writes between exact size counts of a sqlite cache (other workers write too)
+REDIS_URL = "redis://localhost:6379/0"  # Server for the redis backend (needs the redis package)
+CACHE_IO_WORKERS = 4  # Threads for blocking sqlite/redis cache calls made from the event loop
+REFRESH_WORKERS = 2  # Concurrent background refreshes of stale searches
+REFRESH_JITTER = 10.0  # Maximum random delay in seconds before a refresh starts
+REFRESH_QUEUE_MAX = 100  # Refreshes beyond this are dropped until the queue drains
+
+# Two-phase scraping: listing fields for every job, details only for the promising ones
+LAZY_DETAILS = True  # Sources return listing fields; descriptions and detail pages are fetched afterwards
+DETAIL_TOP_K = 10  # Jobs with the best listing-only score that get their details fetched
+DETAIL_MIN_SCORE = 0.3  # Jobs scoring at least this on listing fields alone also get their details
+LINKEDIN_DETAIL_CONCURRENCY = 3  # Concurrent LinkedIn job page requests per search
+LINKEDIN_DETAIL_TIMEOUT = 15  # Seconds per LinkedIn job page request
+
+# Adaptive pagination: further pages of JOBS_PER_SOURCE jobs until a search has enough relevant ones
+TARGET_RESULTS = 10  # Relevant-looking jobs a search tries to collect (per-request target_results)
+MAX_PAGES = 3  # Pages fetched per source at most (per-request max_pages)
+SEARCH_LATENCY_BUDGET = 30  # Seconds after which no further pages are started or awaited
+PAGINATION_SOURCES_PER_ROUND = 2  # Sources with the best relevant yield that fetch another page each round
 
 # Relevance Analysis Settings
 MIN_RELEVANCE_SCORE = 0.4
@@ -36,5 +90,57 @@ TEST_SEARCH_CRITERIA = {
 }
 
 # API and rate limiting configuration
-GEMINI_API_LIMIT_PER_MINUTE = 15  # Free tier limit for gemini-2.0-flash
-JOBS_PER_SOURCE = 5  # Distribute jobs evenly across sources (15 total / 3 sources) 
\ No newline at end of file
+GEMINI_MODEL = "gemini-2.0-flash"
+GEMINI_API_LIMIT_PER_MINUTE = 15  # Free tier limit for gemini-2.0-flash, shared by all requests in a process
+JOBS_PER_SOURCE = 5  # Distribute jobs evenly across sources (15 total / 3 sources) 
+
+# Batched LLM relevance scoring
+LLM_BATCH_SCORING = True  # Score several jobs per Gemini call instead of one call per job
+LLM_BATCH_SIZE = 8  # Maximum number of jobs packed into one prompt
+LLM_BATCH_TOKEN_BUDGET = 6000  # Approximate prompt token budget for one batch
+
+# Concurrent LLM scoring
+LLM_MAX_CONCURRENCY = 8  # Maximum Gemini calls in flight per process
+LLM_MAX_RETRIES = 3  # Retries for 429 / quota errors
+LLM_RETRY_BASE_DELAY = 2.0  # Backoff in seconds when the API gives no retry delay (doubled per retry)
+ANALYSIS_EXECUTOR_WORKERS = 2  # Threads for the synchronous parts of relevance analysis
+
+# Persistent LLM score cache (SQLite, shared by all workers on a host)
+SCORE_CACHE_PATH = "llm_score_cache.sqlite3"
+SCORE_CACHE_TTL = 7 * 24 * 3600  # Seconds before a cached score is re-requested
+SCORE_CACHE_MAX_ENTRIES = 100000  # Least recently used scores are evicted beyond this
+SCORE_CACHE_EVICT_EVERY = 100  # Writes between expiry passes while the cache is below SCORE_CACHE_MAX_ENTRIES
+
+# Job enrichment (criteria-independent fields filled once per posting)
+ENRICHMENT_STORE_PATH = "job_enrichment.sqlite3"
+ENRICHMENT_TTL = 30 * 24 * 3600  # Seconds before a posting is enriched again
+ENRICHMENT_CONCURRENCY = 4  # Concurrent enrichment calls per process
+ENRICHMENT_BACKGROUND_RESERVE = 10  # Rate limiter tokens background enrichment leaves for requests
+
+# Deterministic field extraction ahead of the LLM fallback
+FIELD_EXTRACTOR_MIN_CONFIDENCE = 0.75  # Lower-confidence extractions are left for the LLM
+
+# Scoring cascade: only the most promising jobs are sent to the LLM
+LLM_TOP_K = 15  # Top jobs by basic score that get an LLM score (overridable per request)
+LLM_UNCERTAINTY_BAND = 0.05  # Jobs this close to the relevance threshold also get an LLM score
+MAX_LLM_CALLS_PER_REQUEST = 10  # Default per-request budget of LLM scoring calls (None for unlimited)
+
+# Local (offline) relevance scorer
+DEFAULT_SCORER = "llm"  # "llm", "local" (no Gemini calls) or "hybrid" (local first stage, then LLM); overridable per request
+LOCAL_FEATURE_BITS = 18  # Hashed n-gram feature space of 2**bits dimensions
+LOCAL_SIMILARITY_SCALE = 2.5  # Cosine similarities rarely exceed ~0.4; rescaled so they span 0-1
+LOCAL_SCORE_WEIGHT = 0.7  # Weight of the local similarity when blended with the basic score
+
+# Distillation of LLM scores into an on-CPU model
+DISTILL_ENABLED = True  # Use the distilled model in place of the LLM where it is confident
+DISTILL_SAMPLES_PATH = "distill_samples.jsonl"  # (features, LLM score) training samples
+DISTILL_MODEL_DIR = "distilled_models"  # Versioned model files; the newest is hot-reloaded
+DISTILL_KEEP_VERSIONS = 5  # Older model versions are deleted
+DISTILL_MAX_SAMPLES = 50000  # Most recent samples used for fitting; the sample log is trimmed to this
+DISTILL_MIN_SAMPLES = 200  # No model is fitted on fewer samples
+DISTILL_HOLDOUT_FRACTION = 0.2  # Share of postings held out for evaluation
+DISTILL_LABEL_THRESHOLD = 0.5  # LLM scores at or above this count as relevant
+DISTILL_MIN_CONFIDENCE = 0.9  # Distilled scores are used only at this confidence
+DISTILL_MIN_AGREEMENT = 0.9  # Held-out agreement needed to publish a model
+DISTILL_REFIT_INTERVAL = 3600  # Seconds between refit checks
+DISTILL_MIN_NEW_SAMPLES = 100  # New samples needed to trigger a refit
@@ -0,0 +1,44 @@
+"""
+Test setup: the repository root is importable, and the tests run from a
+fresh temporary working directory, since the modules keep their SQLite
+stores, model files and logs in the working directory. The stubs and the
+fixture site live in testkit.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from testkit import ROZEE_ROUTES, FixtureSite, StubGemini, enter_temp_workdir  # noqa: E402
+
+_original_workdir = None
+
+def pytest_configure(config):
+    # Before collection, which imports the modules that open their stores and logs
+    global _original_workdir
+    _original_workdir = enter_temp_workdir("job-finder-tests-")
+
+def pytest_unconfigure(config):
+    if _original_workdir is not None:
+        os.chdir(_original_workdir)
+
+@pytest.fixture
+def stub_gemini(monkeypatch):
+    """Every Gemini call goes to a StubGemini, without the shared per-minute quota"""
+    import llm_scheduler
+    stub = StubGemini()
+    monkeypatch.setattr(llm_scheduler, "_generate_blocking", stub)
+    monkeypatch.setattr(llm_scheduler, "rate_limiter", llm_scheduler.TokenBucket(10 ** 6))
+    return stub
+
+@pytest.fixture
+def rozee_site(monkeypatch):
+    """Rozee.pk scrapers pointed at the recorded pages on a local server"""
+    from job_sources import rozee_parser
+    site = FixtureSite(ROZEE_ROUTES)
+    monkeypatch.setattr(rozee_parser, "SEARCH_URL", site.url + "/job/jsearch/q/{query}")
+    yield site
+    site.close()
@@ -0,0 +1,166 @@
+"""
+Cross-source deduplication of job postings ahead of relevance analysis.
+
+Two postings are treated as the same job when they share a canonical apply
+link, when two sources each list the same company, normalized title and
+city exactly once, or when the same company's descriptions are
+near-duplicates by SimHash. Near-duplicate lookup uses banded SimHash buckets, so the work
+grows linearly with the number of jobs. Duplicates are merged into one
+record that keeps the richest value of each field and the list of sources.
+"""
+import hashlib
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from field_extractor import is_missing
+from fingerprint import normalize_url
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4  # Hamming distance < SIMHASH_BANDS guarantees a shared band
+SIMHASH_MAX_DISTANCE = 3
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 20  # Descriptions shorter than this are too generic to compare
+
+COMPANY_SUFFIXES = re.compile(
+    r"\b(?:pvt|private|ltd|limited|inc|incorporated|llc|llp|plc|co|corp|corporation|company|gmbh|smc)\b\.?"
+)
+TITLE_NOISE = re.compile(r"\([^)]*\)|\[[^\]]*\]|\b(?:urgent(?:ly)?|hiring|required|needed|wanted|job)\b")
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+def normalize_company(company: Any) -> str:
+    company = str(company or "").lower()
+    company = COMPANY_SUFFIXES.sub(" ", company)
+    return _NON_WORD.sub(" ", company).strip()
+
+def normalize_title(title: Any) -> str:
+    title = TITLE_NOISE.sub(" ", str(title or "").lower())
+    title = title.replace("sr.", "senior").replace("jr.", "junior")
+    return _NON_WORD.sub(" ", title).strip()
+
+def _city(location: Any) -> str:
+    return _NON_WORD.sub(" ", str(location or "").lower().split(",")[0]).strip()
+
+def _description(job: Dict[str, Any]) -> str:
+    for key in ("description", "full_details", "description_snippet"):
+        value = job.get(key)
+        if isinstance(value, str) and value.strip():
+            return value
+    return ""
+
+# Odd 64-bit constants for combining word hashes into shingle hashes
+_SHINGLE_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64)
+
+@lru_cache(maxsize=1 << 16)
+def _word_hash(word: str) -> int:
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word shingles; 0 when the text is too short"""
+    words = _WORD.findall(text.lower())
+    count = len(words) - SHINGLE_SIZE + 1
+    if count < MIN_SHINGLES:
+        return 0
+    word_hashes = np.fromiter((_word_hash(word) for word in words), dtype=np.uint64, count=len(words))
+    shingles = np.zeros(count, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        shingles += word_hashes[offset:offset + count] * _SHINGLE_MULTIPLIERS[offset]
+    shingles ^= shingles >> np.uint64(31)
+    shingles = np.unique(shingles)
+    if len(shingles) < MIN_SHINGLES:
+        return 0
+    bits = np.unpackbits(shingles.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    majority = bits.sum(axis=0, dtype=np.int64) * 2 > len(shingles)
+    return int(np.packbits(majority, bitorder="little").view("<u8")[0])
+
+def _bands(value: int) -> List[int]:
+    width = SIMHASH_BITS // SIMHASH_BANDS
+    return [(value >> (band * width)) & ((1 << width) - 1) for band in range(SIMHASH_BANDS)]
+
+class _DisjointSet:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+def _richness(job: Dict[str, Any]) -> Tuple[int, int]:
+    """Filled fields first, then description length"""
+    return sum(not is_missing(value) for value in job.values()), len(_description(job))
+
+def merge_jobs(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One record per duplicate group: the richest non-missing value of each field"""
+    ranked = sorted(group, key=_richness, reverse=True)
+    merged = dict(ranked[0])
+    for job in ranked[1:]:
+        for key, value in job.items():
+            if is_missing(merged.get(key)) and not is_missing(value):
+                merged[key] = value
+    # Longest text wins for the free-text fields
+    for key in ("description", "full_details"):
+        texts = [job[key] for job in group if isinstance(job.get(key), str)]
+        if texts:
+            merged[key] = max(texts, key=len)
+    sources = []
+    for job in ranked:
+        for source in job.get("sources") or [job.get("source")]:
+            if source and source not in sources:
+                sources.append(source)
+    merged["sources"] = sources
+    return merged
+
+def _title_key(job: Dict[str, Any]) -> Optional[Tuple[str, str, str]]:
+    company = normalize_company(job.get("company"))
+    title = normalize_title(job.get("job_title"))
+    return (company, title, _city(job.get("location"))) if company and title else None
+
+def dedupe_jobs(jobs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """Merge duplicate postings; returns (unique jobs in first-seen order, duplicates removed)"""
+    groups = _DisjointSet(len(jobs))
+    exact = {}
+    buckets = defaultdict(list)
+    # A source listing the same title twice at one company and city has two
+    # different openings, so the title key only links sources that list it once
+    title_keys = [_title_key(job) for job in jobs]
+    listings = Counter((key, job.get("source")) for key, job in zip(title_keys, jobs) if key)
+    for index, job in enumerate(jobs):
+        company = normalize_company(job.get("company"))
+        keys = []
+        url = normalize_url(job.get("apply_link"))
+        if url:
+            keys.append(("url", url))
+        title_key = title_keys[index]
+        if title_key and listings[(title_key, job.get("source"))] == 1:
+            keys.append(("title",) + title_key)
+        for key in keys:
+            if key in exact:
+                groups.union(exact[key], index)
+            else:
+                exact[key] = index
+
+        fingerprint = simhash(_description(job))
+        if fingerprint:
+            for band, value in enumerate(_bands(fingerprint)):
+                bucket = buckets[(company, band, value)]
+                for other, other_fingerprint in bucket:
+                    if bin(fingerprint ^ other_fingerprint).count("1") <= SIMHASH_MAX_DISTANCE:
+                        groups.union(other, index)
+                bucket.append((index, fingerprint))
+
+    members = defaultdict(list)
+    for index in range(len(jobs)):
+        members[groups.find(index)].append(jobs[index])
+    unique = [merge_jobs(group) for group in members.values()]
+    return unique, len(jobs) - len(unique)
@@ -0,0 +1,419 @@
+"""
+Distillation of Gemini relevance scores into a small on-CPU model.
+
+Every fresh LLM score is logged with the (job, criteria) features it was
+given for. A ridge regression learns to reproduce the score and a logistic
+regression learns whether the LLM found the job relevant; for jobs where
+the logistic model is confident, the regression score is used in place of
+a Gemini call.
+
+Models are written as numbered JSON files in DISTILL_MODEL_DIR and the
+newest one is picked up by running processes without a restart. Removing
+the newest file rolls back to the previous version. When several workers
+share the files, one of them refits at a time.
+
+Run `python distill.py` to fit on the logged samples and print the held-out
+evaluation; add `--save` to also publish the model.
+"""
+import asyncio
+import collections
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from basic_scorer import COMPONENTS, CompiledCriteria, jobs_to_frame, score_components
+from config import (
+    DISTILL_ENABLED, DISTILL_SAMPLES_PATH, DISTILL_MODEL_DIR, DISTILL_MAX_SAMPLES, DISTILL_MIN_SAMPLES,
+    DISTILL_HOLDOUT_FRACTION, DISTILL_LABEL_THRESHOLD, DISTILL_MIN_CONFIDENCE, DISTILL_MIN_AGREEMENT,
+    DISTILL_KEEP_VERSIONS
+)
+from local_scorer import similarity_scores
+
+logger = logging.getLogger(__name__)
+
+FEATURE_NAMES = COMPONENTS + ("tf_similarity", "description_length")
+# Bumped whenever a feature changes meaning; samples logged for another set are ignored
+FEATURE_SET = 2
+
+RIDGE_L2 = 1.0
+LOGISTIC_L2 = 0.1
+LOGISTIC_STEPS = 500
+LOGISTIC_LEARNING_RATE = 0.5
+
+# The sample log is compacted back to max_samples lines once it grows this many times larger
+LOG_COMPACT_FACTOR = 2
+
+def pair_features(jobs: List[Dict[str, Any]], criteria) -> np.ndarray:
+    """One feature row per job, describing how it relates to the criteria"""
+    frame = jobs_to_frame(jobs)
+    components = score_components(frame, CompiledCriteria(criteria))
+    columns = [components[name] for name in COMPONENTS]
+    # Without batch IDF, so a posting gets the same features whichever batch it is scored in
+    columns.append(similarity_scores(jobs, criteria, batch_idf=False))
+    columns.append(np.log1p(frame["description"].str.len().to_numpy(dtype=float)) / 10)
+    return np.column_stack(columns)
+
+class SampleLog:
+    """
+    JSONL log of (features, LLM score) training samples, kept to
+    the most recent max_samples lines by compacting it once it has grown
+    LOG_COMPACT_FACTOR times larger
+    """
+
+    def __init__(self, path: str, max_samples: int = DISTILL_MAX_SAMPLES):
+        self.path = path
+        self.max_samples = max_samples
+        self.appended = 0
+        self._lines = None  # Lines in the file, counted on first append
+        self._lock = threading.Lock()
+
+    def _count_lines(self) -> int:
+        try:
+            with open(self.path, "rb") as f:
+                return sum(1 for _ in f)
+        except FileNotFoundError:
+            return 0
+
+    def _compact(self):
+        """Rewrite the log with only its last max_samples lines"""
+        with open(self.path, encoding="utf-8") as f:
+            recent = collections.deque(f, maxlen=self.max_samples)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            f.writelines(recent)
+        os.replace(self.path + ".tmp", self.path)
+        self._lines = len(recent)
+
+    def append(self, keys: List[Tuple[str, str]], features: np.ndarray, scores: List[float]):
+        lines = [
+            json.dumps({
+                "job_key": job_key,
+                "criteria_key": criteria_key,
+                "feature_set": FEATURE_SET,
+                "features": [round(float(value), 6) for value in row],
+                "score": float(score),
+                "logged_at": time.time(),
+            })
+            for (job_key, criteria_key), row, score in zip(keys, features, scores)
+        ]
+        if not lines:
+            return
+        try:
+            with self._lock:
+                if self._lines is None:
+                    self._lines = self._count_lines()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+                self._lines += len(lines)
+                if self._lines > self.max_samples * LOG_COMPACT_FACTOR:
+                    self._compact()
+            self.appended += len(lines)
+        except OSError as e:
+            logger.error(f"Error logging distillation samples: {str(e)}")
+
+    def load(self, max_samples: int) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        The most recent sample per (job, criteria) pair among the last
+        max_samples lines: (job keys, features, scores)
+        """
+        samples = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in collections.deque(f, maxlen=max_samples):
+                    try:
+                        sample = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if sample.get("feature_set") != FEATURE_SET:
+                        continue  # Logged for an older feature set
+                    if len(sample.get("features", [])) != len(FEATURE_NAMES):
+                        continue
+                    samples[(sample["job_key"], sample["criteria_key"])] = sample
+        except FileNotFoundError:
+            pass
+        recent = list(samples.values())[-max_samples:]
+        keys = [sample["job_key"] for sample in recent]
+        features = np.array([sample["features"] for sample in recent], dtype=float).reshape(-1, len(FEATURE_NAMES))
+        scores = np.array([sample["score"] for sample in recent], dtype=float)
+        return keys, features, scores
+
+def _with_bias(features: np.ndarray) -> np.ndarray:
+    return np.column_stack([features, np.ones(len(features))])
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -30, 30)))
+
+def fit_ridge(features: np.ndarray, targets: np.ndarray, l2: float = RIDGE_L2) -> np.ndarray:
+    X = _with_bias(features)
+    penalty = l2 * np.eye(X.shape[1])
+    penalty[-1, -1] = 0.0  # Bias is not regularized
+    return np.linalg.solve(X.T @ X + penalty, X.T @ targets)
+
+def fit_logistic(features: np.ndarray, labels: np.ndarray, l2: float = LOGISTIC_L2) -> np.ndarray:
+    """Full-batch gradient descent on the regularized log loss"""
+    X = _with_bias(features)
+    weights = np.zeros(X.shape[1])
+    for _ in range(LOGISTIC_STEPS):
+        gradient = X.T @ (_sigmoid(X @ weights) - labels) / len(X)
+        gradient[:-1] += l2 * weights[:-1]
+        weights -= LOGISTIC_LEARNING_RATE * gradient
+    return weights
+
+class DistilledModel:
+    def __init__(self, mean, std, score_weights, label_weights, version: int = 0,
+                 report: Optional[Dict[str, Any]] = None):
+        self.mean = np.asarray(mean, dtype=float)
+        self.std = np.asarray(std, dtype=float)
+        self.score_weights = np.asarray(score_weights, dtype=float)
+        self.label_weights = np.asarray(label_weights, dtype=float)
+        self.version = version
+        self.report = report or {}
+
+    @classmethod
+    def train(cls, features: np.ndarray, scores: np.ndarray) -> "DistilledModel":
+        mean = features.mean(axis=0)
+        std = features.std(axis=0)
+        std[std == 0] = 1.0
+        standardized = (features - mean) / std
+        labels = (scores >= DISTILL_LABEL_THRESHOLD).astype(float)
+        return cls(mean, std, fit_ridge(standardized, scores), fit_logistic(standardized, labels))
+
+    def predict(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(predicted LLM scores, confidence in the relevant / not relevant call)"""
+        X = _with_bias((features - self.mean) / self.std)
+        scores = np.clip(X @ self.score_weights, 0.0, 1.0)
+        probability = _sigmoid(X @ self.label_weights)
+        return scores, np.maximum(probability, 1 - probability)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "features": list(FEATURE_NAMES),
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist(),
+            "score_weights": self.score_weights.tolist(),
+            "label_weights": self.label_weights.tolist(),
+            "report": self.report,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "DistilledModel":
+        if payload.get("features") != list(FEATURE_NAMES):
+            raise ValueError("Model was trained on a different feature set")
+        return cls(payload["mean"], payload["std"], payload["score_weights"], payload["label_weights"],
+                   payload.get("version", 0), payload.get("report"))
+
+def evaluate(model: DistilledModel, features: np.ndarray, scores: np.ndarray) -> Dict[str, Any]:
+    """
+    Agreement with held-out LLM scores on the relevant / not relevant call for
+    the jobs the model is confident about, and the LLM calls it would save
+    """
+    if not len(scores):
+        return {"holdout_samples": 0}
+    predicted, confidence = model.predict(features)
+    confident = confidence >= DISTILL_MIN_CONFIDENCE
+    llm_labels = scores >= DISTILL_LABEL_THRESHOLD
+    model_labels = predicted >= DISTILL_LABEL_THRESHOLD
+    agreement = float((llm_labels == model_labels)[confident].mean()) if confident.any() else 0.0
+    return {
+        "holdout_samples": int(len(scores)),
+        "agreement": round(agreement, 3),
+        "llm_calls_saved": int(confident.sum()),
+        "coverage": round(float(confident.mean()), 3),
+        "mean_absolute_error": round(float(np.abs(predicted - scores).mean()), 3),
+    }
+
+def _in_holdout(job_key: str) -> bool:
+    """Deterministic split by posting, so a job is never on both sides"""
+    bucket = int(hashlib.sha1(job_key.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+    return bucket < DISTILL_HOLDOUT_FRACTION
+
+def fit_from_log(log: "SampleLog") -> Optional[DistilledModel]:
+    """Fit on the logged samples and evaluate on the held-out postings"""
+    keys, features, scores = log.load(DISTILL_MAX_SAMPLES)
+    if len(scores) < DISTILL_MIN_SAMPLES:
+        logger.info(f"Not enough samples to distill a model ({len(scores)}/{DISTILL_MIN_SAMPLES})")
+        return None
+    holdout = np.array([_in_holdout(key) for key in keys])
+    model = DistilledModel.train(features[~holdout], scores[~holdout])
+    model.report = evaluate(model, features[holdout], scores[holdout])
+    model.report["training_samples"] = int((~holdout).sum())
+    return model
+
+class ModelStore:
+    """Versioned models on disk; the newest one is reloaded when the directory changes"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._model = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _versions(self) -> List[int]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            int(name[len("model-v"):-len(".json")])
+            for name in names
+            if name.startswith("model-v") and name.endswith(".json") and name[len("model-v"):-len(".json")].isdigit()
+        )
+
+    def _path(self, version: int) -> str:
+        return os.path.join(self.directory, f"model-v{version:04d}.json")
+
+    def save(self, model: DistilledModel) -> int:
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            versions = self._versions()
+            model.version = (versions[-1] if versions else 0) + 1
+            path = self._path(model.version)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(model.to_dict(), f)
+            os.replace(path + ".tmp", path)
+            for version in (versions + [model.version])[:-DISTILL_KEEP_VERSIONS]:
+                os.remove(self._path(version))
+        logger.info(f"Saved distilled model v{model.version}: {model.report}")
+        return model.version
+
+    def published_at(self) -> Optional[float]:
+        """When the newest model was written, if there is one"""
+        versions = self._versions()
+        try:
+            return os.stat(self._path(versions[-1])).st_mtime if versions else None
+        except FileNotFoundError:
+            return None
+
+    def current(self) -> Optional[DistilledModel]:
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime == self._mtime:
+            return self._model
+        with self._lock:
+            versions = self._versions()
+            model = None
+            if versions:
+                try:
+                    with open(self._path(versions[-1]), encoding="utf-8") as f:
+                        model = DistilledModel.from_dict(json.load(f))
+                    logger.info(f"Loaded distilled model v{model.version}")
+                except (OSError, ValueError, KeyError) as e:
+                    logger.error(f"Error loading distilled model: {str(e)}")
+                    return self._model
+            self._model, self._mtime = model, mtime
+        return self._model
+
+sample_log = SampleLog(DISTILL_SAMPLES_PATH)
+model_store = ModelStore(DISTILL_MODEL_DIR)
+predictions_served = 0
+
+def log_samples(keys: List[Tuple[str, str]], features: np.ndarray, scores: List[Optional[float]]):
+    """Log the fresh LLM scores; failed calls (None) are skipped"""
+    kept = [n for n, score in enumerate(scores) if score is not None]
+    if kept:
+        sample_log.append([keys[n] for n in kept], features[kept], [scores[n] for n in kept])
+
+def confident_scores(features: np.ndarray) -> Dict[int, float]:
+    """Distilled scores for the rows the current model is confident about"""
+    global predictions_served
+    model = model_store.current() if DISTILL_ENABLED else None
+    if model is None or not len(features):
+        return {}
+    scores, confidence = model.predict(features)
+    confident = {int(n): float(scores[n]) for n in np.flatnonzero(confidence >= DISTILL_MIN_CONFIDENCE)}
+    predictions_served += len(confident)
+    return confident
+
+def refit() -> Optional[DistilledModel]:
+    """Fit a new model and publish it if it agrees closely enough with the LLM"""
+    model = fit_from_log(sample_log)
+    if model is None:
+        return None
+    if model.report.get("agreement", 0.0) < DISTILL_MIN_AGREEMENT or not model.report.get("llm_calls_saved"):
+        logger.info(f"Distilled model not published: {model.report}")
+        return None
+    model_store.save(model)
+    return model
+
+@contextlib.contextmanager
+def refit_lock(path: str):
+    """
+    Non-blocking exclusive lock on `path` across processes; yields whether
+    it was acquired. The lock goes away with the file handle, so a crashed
+    worker does not leave it behind.
+    """
+    with open(path, "a+b") as f:
+        try:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            yield False
+            return
+        yield True
+
+def refit_once(min_age: float) -> Optional[DistilledModel]:
+    """
+    Refit unless another worker is refitting or published a model less than
+    min_age seconds ago
+    """
+    with refit_lock(sample_log.path + ".lock") as acquired:
+        if not acquired:
+            logger.info("Distilled model is being refitted by another worker")
+            return None
+        published = model_store.published_at()
+        if published is not None and time.time() - published < min_age:
+            return None
+        return refit()
+
+async def refit_periodically(interval: float, min_new_samples: int):
+    """
+    Refit in the background whenever enough new samples were logged. Every
+    worker runs this; refit_once lets one of them fit per interval.
+    """
+    loop = asyncio.get_running_loop()
+    fitted_at = 0
+    while True:
+        await asyncio.sleep(interval)
+        if sample_log.appended - fitted_at < min_new_samples:
+            continue
+        fitted_at = sample_log.appended
+        try:
+            await loop.run_in_executor(None, refit_once, interval)
+        except Exception as e:
+            logger.error(f"Error refitting distilled model: {str(e)}")
+
+def stats() -> Dict[str, Any]:
+    model = model_store.current()
+    return {
+        "model_version": model.version if model else None,
+        "report": model.report if model else None,
+        "samples_logged": sample_log.appended,
+        "predictions_served": predictions_served,
+    }
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    fitted = fit_from_log(sample_log)
+    if fitted is None:
+        sys.exit(1)
+    print(json.dumps(fitted.report, indent=2))
+    if "--save" in sys.argv:
+        print(f"Saved as version {model_store.save(fitted)}")
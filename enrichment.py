@@ -0,0 +1,202 @@
+"""
+Criteria-independent job enrichment.
+
+Fields recovered from a posting's description (experience, jobNature,
+salary, ...) depend only on the posting, so they are computed once per
+unique job and stored by job fingerprint. Later searches reuse the stored
+result; new postings are enriched in the background, with quota requests
+leave unused, and a request only waits when it needs a job that has not
+been enriched yet.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import ENRICHMENT_CONCURRENCY, ENRICHMENT_STORE_PATH, ENRICHMENT_TTL
+from field_extractor import extract_job_fields, is_missing
+from fingerprint import job_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Standardized fields that enrichment may fill in
+ENRICHABLE_FIELDS = ("job_title", "company", "experience", "jobNature", "location", "salary", "apply_link")
+
+def resolve_fields(job: Dict[str, Any]) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Fill what the deterministic extractor can for the job's empty or
+    unspecified fields. Returns (extracted values, fields still missing).
+    """
+    missing = [field for field in ENRICHABLE_FIELDS if is_missing(job.get(field))]
+    if not missing:
+        return {}, []
+    extracted = {field: value for field, value in extract_job_fields(job).items() if field in missing}
+    return extracted, [field for field in missing if field not in extracted]
+
+def missing_fields_for(job: Dict[str, Any]) -> List[str]:
+    """Enrichable fields that neither the job nor the field extractor can fill"""
+    return resolve_fields(job)[1]
+
+class EnrichmentStore:
+    """SQLite store of enrichment results keyed by job fingerprint"""
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS job_enrichment (
+                job_key TEXT PRIMARY KEY,
+                fields TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, job_key: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = self._connection().execute(
+                "SELECT fields, created_at FROM job_enrichment WHERE job_key = ?", (job_key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading enrichment store: {str(e)}")
+            return None
+        if not row or time.time() - row[1] >= self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def put(self, job_key: str, fields: Dict[str, Any]):
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO job_enrichment (job_key, fields, created_at) VALUES (?, ?, ?)",
+                (job_key, json.dumps(fields, default=str), time.time())
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error writing enrichment store: {str(e)}")
+
+class JobEnricher:
+    """
+    Runs enrichment at most once per posting. `fill_fields(job, missing_fields)`
+    is the coroutine that actually fills the fields; it should raise on failure
+    so that failed attempts are not stored. Background enrichment first waits
+    on `wait_for_capacity()`, so it only spends quota that requests leave
+    unused, unless a request needs the same posting meanwhile. Store reads and
+    writes run on `executor`.
+    """
+
+    def __init__(self, store: EnrichmentStore,
+                 fill_fields: Callable[[Dict[str, Any], List[str]], Awaitable[Dict[str, Any]]],
+                 wait_for_capacity: Optional[Callable[[], Awaitable[None]]] = None,
+                 executor: Optional[Executor] = None):
+        self.store = store
+        self.fill_fields = fill_fields
+        self.wait_for_capacity = wait_for_capacity
+        self.executor = executor
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._promotions: Dict[str, asyncio.Event] = {}
+        self._background = set()
+        self._semaphore = None
+        self.stored_hits = 0
+        self.cold_misses = 0
+        self.promoted = 0
+
+    async def _lookup(self, job_key: str) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.store.get, job_key)
+
+    async def _wait_unless_promoted(self, promoted: asyncio.Event):
+        waits = {asyncio.ensure_future(self.wait_for_capacity()), asyncio.ensure_future(promoted.wait())}
+        try:
+            await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for wait in waits:
+                wait.cancel()
+
+    async def _run(self, job_key: str, job: Dict[str, Any], missing: List[str],
+                   promoted: Optional[asyncio.Event]) -> Dict[str, Any]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(ENRICHMENT_CONCURRENCY)
+        try:
+            if promoted is not None and self.wait_for_capacity is not None:
+                await self._wait_unless_promoted(promoted)
+            try:
+                async with self._semaphore:
+                    filled = await self.fill_fields(job, missing)
+                # Only standardized fields are kept, whatever else the LLM returned
+                filled = {field: value for field, value in filled.items() if field in ENRICHABLE_FIELDS}
+            except Exception as e:
+                logger.error(f"Error enriching job {job.get('job_title', 'Unknown')}: {str(e)}")
+                return {field: "Not specified" for field in missing}
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self.store.put, job_key, filled)
+            return filled
+        finally:
+            self._in_flight.pop(job_key, None)
+            self._promotions.pop(job_key, None)
+
+    def _start(self, job_key: str, job: Dict[str, Any], missing: List[str], background: bool = False) -> asyncio.Task:
+        task = self._in_flight.get(job_key)
+        if task is None:
+            promoted = asyncio.Event() if background else None
+            if promoted is not None:
+                self._promotions[job_key] = promoted
+            task = asyncio.create_task(self._run(job_key, job, missing, promoted))
+            self._in_flight[job_key] = task
+        elif not background and job_key in self._promotions:
+            # A request needs this posting now; stop waiting for spare quota
+            self._promotions.pop(job_key).set()
+            self.promoted += 1
+        return task
+
+    async def enrich(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Enriched fields for a job, computing them now only on a cold miss"""
+        missing = missing_fields_for(job)
+        if not missing:
+            return {}
+        job_key = job_fingerprint(job)
+        stored = await self._lookup(job_key)
+        if stored is None:
+            self.cold_misses += 1
+            # Joins a background enrichment of the same posting if one is running
+            stored = await asyncio.shield(self._start(job_key, job, missing))
+        else:
+            self.stored_hits += 1
+        return {field: value for field, value in stored.items() if field in missing}
+
+    async def _enrich_if_new(self, job: Dict[str, Any]):
+        missing = missing_fields_for(job)
+        if not missing:
+            return
+        job_key = job_fingerprint(job)
+        if job_key in self._in_flight or await self._lookup(job_key) is not None:
+            return
+        await self._start(job_key, job, missing, background=True)
+
+    def schedule(self, jobs: List[Dict[str, Any]]):
+        """Enrich new postings in the background, off the request path"""
+        for job in jobs:
+            task = asyncio.create_task(self._enrich_if_new(job))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "stored_hits": self.stored_hits,
+            "cold_misses": self.cold_misses,
+            "promoted": self.promoted,
+            "in_flight": len(self._in_flight),
+            "waiting_for_quota": len(self._promotions),
+        }
+
+enrichment_store = EnrichmentStore(ENRICHMENT_STORE_PATH, ENRICHMENT_TTL)
@@ -0,0 +1,187 @@
+"""
+Deterministic extraction of experience, job nature and salary from job text.
+
+All patterns are compiled into a single alternation, so a description is
+scanned once. Each hit carries a confidence; only values at or above
+FIELD_EXTRACTOR_MIN_CONFIDENCE are used, and the remaining fields are left
+for the LLM.
+"""
+import math
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from config import FIELD_EXTRACTOR_MIN_CONFIDENCE
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10
+}
+_NUM = r"\d{1,2}|" + "|".join(NUMBER_WORDS)
+_YEARS = r"(?:years?|yrs?)"
+_CURRENCY = r"pkr|rs\.?|usd|us\$|\$|aed|gbp|£|eur|€"
+_AMOUNT = r"\d[\d,]*(?:\.\d+)?"
+_INTERVAL = r"(?:\s*(?:/|per|a|an)\s*(?P<sal_interval>month|mo|annum|year|yr|week|wk|day|hour|hr)\b)?"
+
+_EXPERIENCE_PATTERNS = [
+    # Experience: "2-5 years", "2 to 5 yrs"
+    rf"\b(?P<exp_min>\d{{1,2}})\s*(?:-|–|to)\s*(?P<exp_max>\d{{1,2}})\s*\+?\s*{_YEARS}\b",
+    # Experience: "3+ years"
+    rf"\b(?P<exp_plus>{_NUM})\s*\+\s*{_YEARS}\b",
+    # Experience: "minimum 3 years", "at least two years"
+    rf"\b(?:minimum|at least|min\.?)\s*(?:of\s*)?(?P<exp_least>{_NUM})\s*{_YEARS}\b",
+    # Experience: "3 years of relevant experience", "1 year of hands-on experience"
+    rf"\b(?P<exp_years>{_NUM})\s*{_YEARS}(?:\s+of)?(?:\s+[a-z][a-z-]*){{0,2}}?\s+experience\b",
+    # Experience: fresh graduates / entry level
+    r"\b(?P<exp_fresh>fresh(?:ers?|\s+graduates?)?|entry[\s-]level)\b",
+]
+
+# The experience alternatives alone, for column-wise extraction (job_sources.jobspy_normalizer)
+EXPERIENCE_PATTERN = re.compile("|".join(_EXPERIENCE_PATTERNS), re.IGNORECASE)
+EXPERIENCE_CONFIDENCE = {"exp_min": 0.9, "exp_plus": 0.9, "exp_least": 0.85, "exp_years": 0.85, "exp_fresh": 0.75}
+
+FIELD_PATTERN = re.compile(
+    "|".join(_EXPERIENCE_PATTERNS + [
+        # Job nature
+        r"\b(?P<nature_remote>fully remote|100% remote|remote|work from home|wfh)\b",
+        r"\b(?P<nature_hybrid>hybrid)\b",
+        r"\b(?P<nature_onsite>on[\s-]?site|in[\s-]office|work from office)\b",
+        # Salary: "PKR 100,000 - 150,000 per month", "$80k-100k/year"
+        rf"(?<![a-z])(?P<sal_cur>{_CURRENCY})\s*(?P<sal_min>{_AMOUNT})\s*(?P<sal_min_k>k\b)?"
+        rf"(?:\s*(?:-|–|to)\s*(?:{_CURRENCY})?\s*(?P<sal_max>{_AMOUNT})\s*(?P<sal_max_k>k\b)?)?{_INTERVAL}",
+        # Salary: "100,000 - 150,000 PKR"
+        rf"\b(?P<sal2_min>{_AMOUNT})\s*(?:-|–|to)\s*(?P<sal2_max>{_AMOUNT})\s*(?P<sal2_cur>pkr|rs|usd)\b",
+    ]),
+    re.IGNORECASE
+)
+
+CURRENCY_NAMES = {
+    "pkr": "PKR", "rs": "PKR", "rs.": "PKR", "usd": "USD", "us$": "USD", "$": "USD",
+    "aed": "AED", "gbp": "GBP", "£": "GBP", "eur": "EUR", "€": "EUR"
+}
+INTERVAL_NAMES = {
+    "month": "month", "mo": "month", "annum": "year", "year": "year", "yr": "year",
+    "week": "week", "wk": "week", "day": "day", "hour": "hour", "hr": "hour"
+}
+NATURE_NAMES = {"nature_remote": "Remote", "nature_hybrid": "Hybrid", "nature_onsite": "Onsite"}
+
+# Placeholders that mean a field has no value, compared case-insensitively (is_missing)
+MISSING_VALUES = frozenset({"", "not specified", "n/a", "nan", "none"})
+
+Extraction = Dict[str, Tuple[str, float]]
+
+def _years(token: str) -> int:
+    token = token.lower()
+    return NUMBER_WORDS[token] if token in NUMBER_WORDS else int(token)
+
+def _amount(value: str, thousands: Optional[str]) -> float:
+    amount = float(value.replace(",", ""))
+    return amount * 1000 if thousands else amount
+
+def _format_salary(currency: str, low: float, high: Optional[float], interval: Optional[str]) -> str:
+    salary = f"{CURRENCY_NAMES.get(currency.lower(), currency.upper())} {low:,.0f}"
+    if high and high != low:
+        salary += f" - {high:,.0f}"
+    if interval:
+        salary += f" per {INTERVAL_NAMES[interval.lower()]}"
+    return salary
+
+def _experience_hit(groups: Dict[str, Optional[str]]) -> Optional[Tuple[str, float]]:
+    if groups["exp_min"]:
+        return f"{groups['exp_min']}-{groups['exp_max']} years", EXPERIENCE_CONFIDENCE["exp_min"]
+    if groups["exp_plus"]:
+        return f"{_years(groups['exp_plus'])}+ years", EXPERIENCE_CONFIDENCE["exp_plus"]
+    if groups["exp_least"]:
+        return f"{_years(groups['exp_least'])}+ years", EXPERIENCE_CONFIDENCE["exp_least"]
+    if groups["exp_years"]:
+        years = _years(groups["exp_years"])
+        return f"{years} year{'s' if years != 1 else ''}", EXPERIENCE_CONFIDENCE["exp_years"]
+    if groups["exp_fresh"]:
+        return ("Entry level" if "entry" in groups["exp_fresh"].lower() else "Fresh"), EXPERIENCE_CONFIDENCE["exp_fresh"]
+    return None
+
+def _salary_hit(groups: Dict[str, Optional[str]]) -> Optional[Tuple[str, float]]:
+    if groups["sal_cur"]:
+        low = _amount(groups["sal_min"], groups["sal_min_k"])
+        high = _amount(groups["sal_max"], groups["sal_max_k"] or groups["sal_min_k"]) if groups["sal_max"] else None
+        interval = groups["sal_interval"]
+        # Bare small amounts ("$5 million funding") are more likely noise than pay
+        if not interval and low < 1000:
+            return None
+        return _format_salary(groups["sal_cur"], low, high, interval), 0.9 if interval else 0.8
+    if groups["sal2_min"]:
+        low, high = _amount(groups["sal2_min"], None), _amount(groups["sal2_max"], None)
+        if low < 1000:
+            return None
+        return _format_salary(groups["sal2_cur"], low, high, None), 0.8
+    return None
+
+def extract_fields(text: Any) -> Extraction:
+    """
+    Scan `text` once and return {field: (value, confidence)} for experience,
+    jobNature and salary. The first hit wins for experience and salary;
+    conflicting job nature mentions lower the confidence.
+    """
+    if not isinstance(text, str) or not text:
+        return {}
+
+    fields: Extraction = {}
+    natures = []
+    for match in FIELD_PATTERN.finditer(text):
+        groups = match.groupdict()
+        kind = match.lastgroup or ""
+        if kind.startswith("nature_"):
+            natures.append(NATURE_NAMES[kind])
+            continue
+        if "experience" not in fields:
+            hit = _experience_hit(groups)
+            if hit:
+                fields["experience"] = hit
+                continue
+        if "salary" not in fields:
+            hit = _salary_hit(groups)
+            if hit:
+                fields["salary"] = hit
+
+    if natures:
+        distinct = set(natures)
+        if len(distinct) == 1:
+            fields["jobNature"] = (natures[0], 0.8)
+        elif "Hybrid" in distinct:
+            fields["jobNature"] = ("Hybrid", 0.75)
+        else:
+            fields["jobNature"] = (natures[0], 0.5)
+    return fields
+
+def extract_experience(text: Any) -> str:
+    """Experience requirement found in `text`; Not specified when nothing confident is found"""
+    value, confidence = extract_fields(text).get("experience", ("Not specified", 0.0))
+    return value if confidence >= FIELD_EXTRACTOR_MIN_CONFIDENCE else "Not specified"
+
+def is_missing(value: Any) -> bool:
+    """True for None, NaN and the MISSING_VALUES placeholders in any case"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return True
+    return isinstance(value, str) and value.strip().lower() in MISSING_VALUES
+
+def _job_text(job: Dict[str, Any]) -> str:
+    parts = [job.get(key) for key in ("description", "full_details", "description_snippet")]
+    return "\n".join(part for part in parts if isinstance(part, str))
+
+def extract_job_fields(job: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Confident values for experience, jobNature and salary from a job's text
+    and structured labels
+    """
+    found = {
+        field: value
+        for field, (value, confidence) in extract_fields(_job_text(job)).items()
+        if confidence >= FIELD_EXTRACTOR_MIN_CONFIDENCE
+    }
+
+    # Structured labels (Rozee's "Job Type", LinkedIn's employment type) back up the text
+    if "jobNature" not in found:
+        for key in ("job_type", "employment_type"):
+            if isinstance(job.get(key), str) and not is_missing(job[key]):
+                found["jobNature"] = job[key]
+                break
+    return found
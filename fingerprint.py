@@ -0,0 +1,76 @@
+"""
+Canonical keys for jobs and search criteria, shared by the caches
+"""
+import hashlib
+import re
+from typing import Any, Dict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"fbclid", "gclid", "trk", "trkinfo", "refid", "trackingid"}
+
+CRITERIA_FIELDS = ("position", "experience", "salary", "jobNature", "location", "skills")
+
+def _normalize_text(value: Any) -> str:
+    """Lowercase and collapse whitespace"""
+    if value is None:
+        return ""
+    return re.sub(r"\s+", " ", str(value)).strip().lower()
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def normalize_url(url: Any) -> str:
+    """
+    Canonical form of a job URL: lowercase scheme and host, no fragment,
+    no tracking parameters (utm_* and friends), sorted query, no trailing slash
+    """
+    url = str(url or "").strip()
+    if not url or url in ("N/A", "nan"):
+        return ""
+    parts = urlsplit(url)
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ""))
+
+def job_content_hash(job: Dict[str, Any]) -> str:
+    """Hash of the normalized title, company and description of a job"""
+    description = job.get("description") or job.get("full_details") or ""
+    content = "|".join(_normalize_text(value) for value in (job.get("job_title"), job.get("company"), description))
+    return _digest(content)
+
+def job_fingerprint(job: Dict[str, Any]) -> str:
+    """Canonical job key: normalized apply link plus a hash of the job's content"""
+    return _digest(f"{normalize_url(job.get('apply_link'))}#{job_content_hash(job)}")
+
+def normalize_criteria(criteria) -> Dict[str, str]:
+    """Normalized search criteria; skills are compared as an unordered set"""
+    normalized = {field: _normalize_text(getattr(criteria, field, "")) for field in CRITERIA_FIELDS}
+    skills = {_normalize_text(skill) for skill in normalized["skills"].split(",")}
+    normalized["skills"] = ",".join(sorted(skill for skill in skills if skill))
+    return normalized
+
+def criteria_hash(criteria) -> str:
+    """Stable hash of the normalized search criteria"""
+    normalized = normalize_criteria(criteria)
+    return _digest("\x1f".join(f"{field}={normalized[field]}" for field in CRITERIA_FIELDS))
+
+def search_key(criteria) -> str:
+    """Canonical key of a search: the criteria hash plus the options that change its result"""
+    options = (getattr(criteria, option, None) for option in ("scorer", "max_llm_calls", "llm_top_k", "target_results", "max_pages"))
+    return f"{criteria_hash(criteria)}:" + ":".join("" if value is None else str(value) for value in options)
+
+def source_query_key(source: str, criteria, page: int = 0) -> str:
+    """
+    Key of the raw results of one source page: only the criteria the
+    scrapers search with (position, location, job type, remote), so
+    searches that differ in skills or experience share them
+    """
+    job_nature = _normalize_text(criteria.jobNature)
+    job_type = next((kind for kind in ("part time", "contract", "internship") if job_nature == kind), "full time")
+    remote = "remote" in job_nature
+    key = "\x1f".join([source, _normalize_text(criteria.position), _normalize_text(criteria.location), job_type, str(remote)])
+    return f"{key}\x1fpage={page}" if page else key
@@ -0,0 +1,368 @@
+# job_sources/driver_pool.py
+"""
+Pool of warm Selenium WebDrivers.
+
+Drivers are started ahead of time (min_size) and lent out to one search at
+a time, up to max_size browsers. Searches that find the pool exhausted wait
+in FIFO order for the next driver to be returned. Between uses a driver's
+session is cleaned (cookies, storage, about:blank); it is retired after
+max_uses searches, past max_age seconds or above max_memory_mb of RSS.
+
+A watchdog thread keeps the pool at min_size, retires dead or bloated idle
+drivers, kills drivers held longer than lease_timeout, and kills Chrome
+processes left behind by retired drivers. Process memory and process trees
+are read from /proc, so those checks are skipped where it is unavailable.
+"""
+import logging
+import os
+import signal
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+def _children(pid: int) -> List[int]:
+    """Every descendant process of `pid`"""
+    parents: Dict[int, List[int]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        parents.setdefault(ppid, []).append(int(entry))
+    found, stack = [], [pid]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+def _rss_mb(pids: List[int]) -> float:
+    total_kb = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+def _kill(pids) -> int:
+    killed = 0
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+            killed += 1
+        except OSError:
+            pass
+    return killed
+
+class PooledDriver:
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.created_at = time.time()
+        self.uses = 0
+        self.checked_out_at: Optional[float] = None
+        self.retired = False
+        self.pids: Set[int] = set()
+        self.refresh_pids()
+
+    @property
+    def service_pid(self) -> Optional[int]:
+        process = getattr(getattr(self.driver, "service", None), "process", None)
+        return getattr(process, "pid", None)
+
+    def refresh_pids(self):
+        """Remember the chromedriver and browser processes so they can be reaped later"""
+        if self.service_pid:
+            self.pids.update([self.service_pid] + _children(self.service_pid))
+
+    def alive(self) -> bool:
+        process = getattr(getattr(self.driver, "service", None), "process", None)
+        return process is None or process.poll() is None
+
+    def rss_mb(self) -> float:
+        return _rss_mb([self.service_pid] + _children(self.service_pid)) if self.service_pid else 0.0
+
+class _Waiter:
+    __slots__ = ("event", "driver")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.driver: Optional[PooledDriver] = None  # None when granted a slot to start one
+
+class DriverPool:
+    def __init__(self, factory: Callable[[], Any], min_size: int, max_size: int, max_uses: int,
+                 max_age: float, max_memory_mb: float, lease_timeout: float, acquire_timeout: float):
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.max_memory_mb = max_memory_mb
+        self.lease_timeout = lease_timeout
+        self.acquire_timeout = acquire_timeout
+        self._lock = threading.Lock()
+        self._idle: Deque[PooledDriver] = deque()
+        self._in_use: Set[PooledDriver] = set()
+        self._waiters: Deque[_Waiter] = deque()
+        self._size = 0  # Live drivers plus drivers being started
+        self._orphans: Set[int] = set()
+        self._watchdog: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        self.created = 0
+        self.retired = 0
+        self.create_failures = 0
+        self.leases_killed = 0
+        self.processes_killed = 0
+        self.checkouts = 0
+        self.acquire_timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def start(self, watchdog_interval: float):
+        """Start the watchdog, which also warms the pool up to min_size"""
+        if self._watchdog is None:
+            self._closed.clear()
+            self._watchdog = threading.Thread(target=self._watch, args=(watchdog_interval,),
+                                              name="driver-pool-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def _create(self) -> PooledDriver:
+        """Start a driver for a slot already counted in _size"""
+        try:
+            pooled = PooledDriver(self.factory())
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self.create_failures += 1
+                self._grant_slot()
+            raise
+        with self._lock:
+            self.created += 1
+        logger.info(f"Started WebDriver ({self._size}/{self.max_size})")
+        return pooled
+
+    def _grant_slot(self):
+        """Let the first waiter start a driver when a slot frees up; caller holds the lock"""
+        if self._waiters and self._size < self.max_size:
+            self._size += 1
+            self._waiters.popleft().event.set()
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledDriver:
+        """Check out a driver, waiting in line behind earlier callers if none is free"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        waiter = None
+        with self._lock:
+            if self._idle and not self._waiters:
+                pooled = self._idle.popleft()
+            elif self._size < self.max_size and not self._waiters:
+                self._size += 1
+                pooled = None
+            else:
+                waiter = _Waiter()
+                self._waiters.append(waiter)
+        if waiter is not None:
+            waiter.event.wait(timeout)
+            with self._lock:
+                if not waiter.event.is_set():
+                    self._waiters.remove(waiter)
+                    self.acquire_timeouts += 1
+                    raise TimeoutError(f"No WebDriver free after {timeout:g}s")
+            pooled = waiter.driver
+        if pooled is None:
+            pooled = self._create()
+
+        waited = time.monotonic() - started
+        with self._lock:
+            pooled.uses += 1
+            pooled.checked_out_at = time.time()
+            self._in_use.add(pooled)
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        return pooled
+
+    def _clean(self, pooled: PooledDriver) -> bool:
+        """Reset the browser session for the next search; False if the driver is unusable"""
+        driver = pooled.driver
+        try:
+            driver.delete_all_cookies()
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception:
+            pass  # Storage is not accessible on every page
+        try:
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not clean WebDriver session: {str(e)}")
+            return False
+
+    def _should_retire(self, pooled: PooledDriver) -> Optional[str]:
+        if not pooled.alive():
+            return "dead"
+        if pooled.uses >= self.max_uses:
+            return f"{pooled.uses} uses"
+        if time.time() - pooled.created_at >= self.max_age:
+            return "max age"
+        if self.max_memory_mb and pooled.rss_mb() > self.max_memory_mb:
+            return "memory"
+        return None
+
+    def release(self, pooled: PooledDriver):
+        """
+        Return a checked-out driver; it is cleaned, or retired if it is worn
+        out or the pool has been closed
+        """
+        with self._lock:
+            self._in_use.discard(pooled)
+            pooled.checked_out_at = None
+            if pooled.retired:  # Killed by the watchdog while checked out
+                return
+        reason = "shutdown" if self._closed.is_set() else self._should_retire(pooled)
+        if reason is None and not self._clean(pooled):
+            reason = "session cleanup failed"
+        if reason:
+            self._retire(pooled, reason)
+        else:
+            self._hand_off(pooled)
+
+    def _hand_off(self, pooled: PooledDriver):
+        """Give a ready driver to the first waiter, or put it back in the idle list"""
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.driver = pooled
+                waiter.event.set()
+            else:
+                self._idle.append(pooled)
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None):
+        """`with pool.driver() as driver:` checks a driver out for the block"""
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled.driver
+        finally:
+            self.release(pooled)
+
+    def _retire(self, pooled: PooledDriver, reason: str):
+        with self._lock:
+            if pooled.retired:
+                return
+            pooled.retired = True
+            self._in_use.discard(pooled)
+            self._size -= 1
+            self.retired += 1
+            self._grant_slot()
+        pooled.refresh_pids()
+        logger.info(f"Retiring WebDriver after {pooled.uses} uses ({reason})")
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting WebDriver: {str(e)}")
+        with self._lock:
+            self._orphans.update(pooled.pids)
+
+    def _reap_orphans(self):
+        """Kill processes of retired drivers that survived quit()"""
+        with self._lock:
+            orphans, self._orphans = self._orphans, set()
+        alive = [pid for pid in orphans if os.path.exists(f"/proc/{pid}")]
+        killed = _kill(alive)
+        if killed:
+            self.processes_killed += killed
+            logger.warning(f"Killed {killed} leftover Chrome processes")
+
+    def _watch(self, interval: float):
+        while not self._closed.is_set():
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"WebDriver pool watchdog error: {str(e)}")
+            self._closed.wait(interval)
+
+    def check(self):
+        """One watchdog pass"""
+        now = time.time()
+        with self._lock:
+            idle = list(self._idle)
+            leaked = [pooled for pooled in self._in_use
+                      if pooled.checked_out_at and now - pooled.checked_out_at > self.lease_timeout]
+        for pooled in idle:
+            reason = self._should_retire(pooled)
+            if reason:
+                with self._lock:
+                    if pooled not in self._idle:
+                        continue
+                    self._idle.remove(pooled)
+                self._retire(pooled, reason)
+            else:
+                pooled.refresh_pids()
+        for pooled in leaked:
+            logger.warning(f"WebDriver checked out for over {self.lease_timeout:.0f}s, killing it")
+            self.leases_killed += 1
+            pooled.refresh_pids()
+            self.processes_killed += _kill(pooled.pids)  # quit() may hang on a stuck browser
+            self._retire(pooled, "lease timeout")
+        self._reap_orphans()
+
+        while not self._closed.is_set():
+            with self._lock:
+                if self._size >= self.min_size or self._waiters:
+                    break
+                self._size += 1
+            try:
+                pooled = self._create()
+            except Exception as e:
+                logger.error(f"Could not start a WebDriver: {str(e)}")
+                break
+            self._hand_off(pooled)
+
+    def close(self):
+        """Stop the watchdog and quit idle drivers; checked-out drivers are retired on release"""
+        self._closed.set()
+        self._watchdog = None
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for pooled in idle:
+            self._retire(pooled, "shutdown")
+        self._reap_orphans()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            drivers = list(self._idle) + list(self._in_use)
+            ages = [now - pooled.created_at for pooled in drivers]
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "waiting": len(self._waiters),
+                "max_size": self.max_size,
+                "checkouts": self.checkouts,
+                "queue_wait_avg": round(self.wait_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "queue_wait_max": round(self.wait_max, 3),
+                "acquire_timeouts": self.acquire_timeouts,
+                "driver_age_avg": round(sum(ages) / len(ages), 1) if ages else 0.0,
+                "driver_age_max": round(max(ages), 1) if ages else 0.0,
+                "created": self.created,
+                "retired": self.retired,
+                "create_failures": self.create_failures,
+                "leases_killed": self.leases_killed,
+                "processes_killed": self.processes_killed,
+            }
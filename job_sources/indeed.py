@@ -5,9 +5,8 @@ from typing import List, Dict, Any
 from pydantic import BaseModel
 from jobspy import scrape_jobs
 import pandas as pd
-from datetime import datetime
 from config import JOBS_PER_SOURCE
-import json
+from job_sources.jobspy_normalizer import normalize_jobs, raw_json
 
 # Configure Indeed-specific logging
 indeed_logger = logging.getLogger('indeed')
@@ -16,17 +15,14 @@ indeed_handler = logging.FileHandler('indeed_raw.log')
 indeed_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 indeed_logger.addHandler(indeed_handler)
 
-class DateTimeEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, (datetime, pd.Timestamp)):
-            return obj.isoformat()
-        return super().default(obj)
-
-def convert_dataframe_to_dict(df: pd.DataFrame) -> List[Dict[str, Any]]:
-    """
-    Convert DataFrame to list of dictionaries using default=str for JSON serialization
-    """
-    return df.to_dict(orient='records')
+# Indeed-specific job record fields -> (jobspy column, value when missing)
+INDEED_FIELDS = {
+    "company_industry": ("company_industry", ""),
+    "company_description": ("company_description", ""),
+    "company_rating": ("company_rating", ""),
+    "company_reviews": ("company_reviews_count", ""),
+    "date_posted": ("date_posted", ""),
+}
 
 class JobSearchCriteria(BaseModel):
     position: str
@@ -36,17 +32,18 @@ class JobSearchCriteria(BaseModel):
     location: str
     skills: str
 
-async def fetch_indeed_jobs(criteria: JobSearchCriteria) -> List[Dict[str, Any]]:
+async def fetch_indeed_jobs(criteria: JobSearchCriteria, page: int = 0) -> List[Dict[str, Any]]:
     """
     Fetch job listings from Indeed based on search criteria
     
     Args:
         criteria: Job search criteria including position, location, etc.
+        page: Zero-based page of JOBS_PER_SOURCE results
         
     Returns:
         List of job listings from Indeed
     """
-    indeed_logger.info(f"Fetching Indeed jobs for position: {criteria.position} in {criteria.location}")
+    indeed_logger.info(f"Fetching Indeed jobs for position: {criteria.position} in {criteria.location} (page {page + 1})")
     
     try:
         # Create job type filter based on criteria
@@ -64,7 +61,7 @@ async def fetch_indeed_jobs(criteria: JobSearchCriteria) -> List[Dict[str, Any]]
         indeed_logger.info(f"Indeed search parameters: job_type={job_type}, is_remote={is_remote}")
         
         # Execute in a separate thread pool to not block the async event loop
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         indeed_jobs = await loop.run_in_executor(
             None,
             lambda: scrape_jobs(
@@ -72,6 +69,7 @@ async def fetch_indeed_jobs(criteria: JobSearchCriteria) -> List[Dict[str, Any]]
                 search_term=criteria.position,
                 location=criteria.location,
                 results_wanted=JOBS_PER_SOURCE,  # Limit to configured number of jobs
+                offset=page * JOBS_PER_SOURCE,  # Skip the jobs of earlier pages
                 hours_old=72,       # Recent jobs only
                 job_type=job_type,
                 is_remote=is_remote,
@@ -81,58 +79,14 @@ async def fetch_indeed_jobs(criteria: JobSearchCriteria) -> List[Dict[str, Any]]
             )
         )
         
-        # Log raw Indeed response
-        indeed_logger.info("Raw Indeed Response:")
-        if isinstance(indeed_jobs, pd.DataFrame):
-            # Convert DataFrame to list of dictionaries
-            indeed_records = convert_dataframe_to_dict(indeed_jobs)
-            # Use default=str to handle any non-serializable objects
-            indeed_logger.info(json.dumps(indeed_records, indent=2, default=str))
-        else:
-            indeed_logger.warning("Indeed returned no jobs or invalid format")
-        
         # Convert to list of dictionaries
         if isinstance(indeed_jobs, pd.DataFrame):
+            # Log raw Indeed response
+            indeed_logger.info("Raw Indeed Response:")
+            indeed_logger.info(raw_json(indeed_jobs))
+            
             # Process the job listings into a standardized format
-            jobs_list = []
-            for _, job in indeed_jobs.iterrows():
-                # Format salary information
-                salary = "Not specified"
-                if job.get('min_amount') is not None and job.get('max_amount') is not None:
-                    min_amount = job.get('min_amount')
-                    max_amount = job.get('max_amount')
-                    interval = job.get('interval', 'yearly')
-                    currency = job.get('currency', 'USD')
-                    
-                    if min_amount == max_amount:
-                        salary = f"{currency} {min_amount:,} per {interval}"
-                    else:
-                        salary = f"{currency} {min_amount:,} - {max_amount:,} per {interval}"
-                
-                # Extract job type information
-                job_nature = job.get('job_type', criteria.jobNature)
-                if job_nature and str(job_nature) != 'nan':
-                    job_nature = str(job_nature).title()
-                
-                # Create standardized job object
-                job_obj = {
-                    "job_title": job.get('title', 'Unknown Title'),
-                    "company": job.get('company', 'Unknown Company'),
-                    "experience": extract_experience_from_description(job.get('description', '')),
-                    "jobNature": job_nature,
-                    "location": job.get('location', criteria.location),
-                    "salary": salary,
-                    "apply_link": job.get('job_url', ''),
-                    "source": "Indeed",
-                    "description": job.get('description', 'No description available'),
-                    "company_industry": job.get('company_industry', ''),
-                    "company_description": job.get('company_description', ''),
-                    "company_rating": job.get('company_rating', ''),
-                    "company_reviews": job.get('company_reviews', ''),
-                    "date_posted": job.get('date_posted', '')
-                }
-                jobs_list.append(job_obj)
-                
+            jobs_list = normalize_jobs(indeed_jobs, "Indeed", criteria, INDEED_FIELDS)
             indeed_logger.info(f"Successfully processed {len(jobs_list)} jobs from Indeed")
             return jobs_list
         
@@ -142,30 +96,3 @@ async def fetch_indeed_jobs(criteria: JobSearchCriteria) -> List[Dict[str, Any]]
     except Exception as e:
         indeed_logger.error(f"Error fetching Indeed jobs: {str(e)}")
         return []  # Return empty list on error
-
-def extract_experience_from_description(description: str) -> str:
-    """Helper function to extract experience requirements from job description"""
-    description = description.lower()
-    
-    # Common experience phrases
-    experience_phrases = [
-        "years of experience", "years experience", "year experience",
-        "yrs experience", "year of experience", "yrs of experience"
-    ]
-    
-    for phrase in experience_phrases:
-        if phrase in description:
-            # Find the position of the phrase
-            pos = description.find(phrase)
-            # Look for numbers before the phrase
-            start = max(0, pos - 20)
-            segment = description[start:pos].strip()
-            words = segment.split()
-            
-            # Check the last few words for numbers
-            for word in reversed(words):
-                if word.isdigit() or word in ["one", "two", "three", "four", "five", 
-                                              "six", "seven", "eight", "nine", "ten"]:
-                    return f"{word} {phrase}"
-    
-    return "Not specified"
\ No newline at end of file
@@ -0,0 +1,131 @@
+# job_sources/jobspy_normalizer.py
+"""
+Column-wise conversion of jobspy results into job records, shared by the
+Indeed and LinkedIn sources. Only the needed columns are kept, salary,
+job nature and experience are built one column at a time, and the records
+are emitted in one pass over the column lists.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import FIELD_EXTRACTOR_MIN_CONFIDENCE
+from field_extractor import EXPERIENCE_CONFIDENCE, EXPERIENCE_PATTERN, NUMBER_WORDS
+
+# Job record field -> (jobspy column, value when missing); location defaults to the searched location
+COMMON_FIELDS = {
+    "job_title": ("title", "Unknown Title"),
+    "company": ("company", "Unknown Company"),
+    "location": ("location", None),
+    "apply_link": ("job_url", ""),
+    "description": ("description", "No description available"),
+}
+SALARY_COLUMNS = ["min_amount", "max_amount", "currency", "interval"]
+
+Fields = Dict[str, Tuple[str, Any]]
+
+def raw_json(frame: pd.DataFrame) -> str:
+    """Compact JSON of a jobspy frame for the raw logs"""
+    return frame.to_json(orient="records", date_format="iso", default_handler=str)
+
+def _filled(column: pd.Series, default: Any) -> pd.Series:
+    return column.astype(object).where(column.notna(), default)
+
+def _amount_labels(amounts: pd.Series) -> np.ndarray:
+    """Amounts with thousands separators, formatted once per distinct value; "" where missing"""
+    codes, uniques = pd.factorize(amounts)
+    labels = np.array([f"{amount:,.0f}" for amount in uniques] + [""], dtype=object)
+    return labels[codes]  # Missing values have code -1, the trailing ""
+
+def salary_column(frame: pd.DataFrame) -> pd.Series:
+    """"USD 50,000 - 70,000 per yearly"; Not specified unless both amounts are known"""
+    low = pd.to_numeric(frame["min_amount"], errors="coerce")
+    high = pd.to_numeric(frame["max_amount"], errors="coerce")
+    currency = _filled(frame["currency"], "USD").astype(str)
+    interval = _filled(frame["interval"], "yearly").astype(str)
+    salary = currency + " " + _amount_labels(low)
+    salary = salary.where(low == high, salary + " - " + _amount_labels(high))
+    salary = salary + " per " + interval
+    return salary.where(low.notna() & high.notna(), "Not specified")
+
+def job_nature_column(job_types: pd.Series, default: str) -> pd.Series:
+    """Title-cased jobspy job types, `default` where missing"""
+    natures = job_types.astype("string").str.title()
+    return _filled(natures.mask(natures == ""), default)
+
+def _years(tokens: pd.Series) -> pd.Series:
+    words = {word: str(number) for word, number in NUMBER_WORDS.items()}
+    return pd.to_numeric(tokens.str.lower().replace(words), errors="coerce").astype("Int64")
+
+def experience_column(texts: pd.Series) -> pd.Series:
+    """field_extractor.extract_experience of every text, with one regex pass per column"""
+    groups = texts.astype("string").str.extract(EXPERIENCE_PATTERN)
+    hits = {
+        "exp_min": groups["exp_min"] + "-" + groups["exp_max"] + " years",
+        "exp_plus": _years(groups["exp_plus"]).astype("string") + "+ years",
+        "exp_least": _years(groups["exp_least"]).astype("string") + "+ years",
+        "exp_fresh": np.where(groups["exp_fresh"].str.contains("entry", case=False).fillna(False), "Entry level", "Fresh"),
+    }
+    years = _years(groups["exp_years"])
+    hits["exp_years"] = years.astype("string") + np.where((years != 1).fillna(True), " years", " year")
+
+    # The first match sets exactly one group family per row
+    experience = pd.Series("Not specified", index=texts.index, dtype=object)
+    for group, values in hits.items():
+        if EXPERIENCE_CONFIDENCE[group] >= FIELD_EXTRACTOR_MIN_CONFIDENCE:
+            found = groups[group].notna()
+            experience[found] = np.asarray(values, dtype=object)[found.to_numpy()]
+    return experience
+
+def normalize_jobs(frame: pd.DataFrame, source: str, criteria, extra_fields: Fields,
+                   experience_column_name: Optional[str] = None, date_format: Optional[str] = None,
+                   details_pending: bool = False) -> List[Dict[str, Any]]:
+    """
+    Job records of a jobspy frame: the common fields, salary, jobNature and
+    experience, then `extra_fields`. Experience comes from
+    `experience_column_name` where it is set and from the description
+    otherwise; date_posted is formatted with `date_format` if given.
+    """
+    fields = {**COMMON_FIELDS, **extra_fields}
+    columns = list(dict.fromkeys([column for column, _ in fields.values()] + SALARY_COLUMNS + ["job_type"]
+                                 + ([experience_column_name] if experience_column_name else [])))
+    frame = frame.reindex(columns=columns)  # Only the needed columns, missing ones as NaN
+    if date_format:
+        dates = pd.to_datetime(frame["date_posted"], errors="coerce")
+        frame["date_posted"] = dates.dt.strftime(date_format)
+
+    experience = pd.Series("Not specified", index=frame.index, dtype=object)
+    need_text = pd.Series(True, index=frame.index)
+    if experience_column_name:
+        labelled = frame[experience_column_name]
+        need_text = labelled.astype("string").fillna("").eq("").astype(bool)
+        experience[~need_text] = labelled[~need_text]
+    if need_text.any():
+        experience[need_text] = experience_column(frame.loc[need_text, "description"])
+
+    def field(name: str) -> pd.Series:
+        column, default = fields[name]
+        return _filled(frame[column], criteria.location if name == "location" and default is None else default)
+
+    columns = {
+        "job_title": field("job_title"),
+        "company": field("company"),
+        "experience": experience,
+        "jobNature": job_nature_column(frame["job_type"], "Not specified"),
+        "location": field("location"),
+        "salary": salary_column(frame),
+        "apply_link": field("apply_link"),
+        "source": [source] * len(frame),
+        "description": field("description"),
+        **{name: field(name) for name in extra_fields},
+    }
+    if details_pending:
+        columns["details_pending"] = [True] * len(frame)
+    return _records(columns)
+
+def _records(columns: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Row dicts of equally long columns, without DataFrame.to_dict's per-cell boxing"""
+    names = list(columns)
+    values = [column.tolist() if isinstance(column, pd.Series) else column for column in columns.values()]
+    return [dict(zip(names, row)) for row in zip(*values)]
@@ -1,13 +1,16 @@
 # job_sources/linkedin.py
 import asyncio
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from jobspy import scrape_jobs
 import pandas as pd
-from datetime import datetime
-from config import JOBS_PER_SOURCE
-import json
+from config import JOBS_PER_SOURCE, LAZY_DETAILS, LINKEDIN_DETAIL_CONCURRENCY, LINKEDIN_DETAIL_TIMEOUT
+from field_extractor import extract_experience
+from job_sources.jobspy_normalizer import normalize_jobs, raw_json
+import re
+import httpx
+from bs4 import BeautifulSoup
 
 # Configure LinkedIn-specific logging
 linkedin_logger = logging.getLogger('linkedin')
@@ -16,11 +19,14 @@ linkedin_handler = logging.FileHandler('linkedin_raw.log')
 linkedin_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 linkedin_logger.addHandler(linkedin_handler)
 
-class DateTimeEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, (datetime, pd.Timestamp)):
-            return obj.isoformat()
-        return super().default(obj)
+# LinkedIn-specific job record fields -> (jobspy column, value when missing)
+LINKEDIN_FIELDS = {
+    "company_industry": ("company_industry", ""),
+    "job_function": ("job_function", ""),
+    "employment_type": ("employment_type", ""),
+    "seniority_level": ("job_level", ""),
+    "posted_date": ("date_posted", ""),
+}
 
 class JobSearchCriteria(BaseModel):
     position: str
@@ -30,17 +36,18 @@ class JobSearchCriteria(BaseModel):
     location: str
     skills: str
 
-async def fetch_linkedin_jobs(criteria: JobSearchCriteria) -> List[Dict[str, Any]]:
+async def fetch_linkedin_jobs(criteria: JobSearchCriteria, page: int = 0) -> List[Dict[str, Any]]:
     """
     Fetch job listings from LinkedIn based on search criteria
     
     Args:
         criteria: Job search criteria including position, location, etc.
+        page: Zero-based page of JOBS_PER_SOURCE results
         
     Returns:
         List of job listings from LinkedIn
     """
-    linkedin_logger.info(f"Fetching LinkedIn jobs for position: {criteria.position} in {criteria.location}")
+    linkedin_logger.info(f"Fetching LinkedIn jobs for position: {criteria.position} in {criteria.location} (page {page + 1})")
     
     try:
         # Create job type filter based on criteria
@@ -58,7 +65,7 @@ async def fetch_linkedin_jobs(criteria: JobSearchCriteria) -> List[Dict[str, Any
         linkedin_logger.info(f"LinkedIn search parameters: job_type={job_type}, is_remote={is_remote}")
         
         # Execute in a separate thread pool to not block the async event loop
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         linkedin_jobs = await loop.run_in_executor(
             None,
             lambda: scrape_jobs(
@@ -66,66 +73,27 @@ async def fetch_linkedin_jobs(criteria: JobSearchCriteria) -> List[Dict[str, Any
                 search_term=criteria.position,
                 location=criteria.location,
                 results_wanted=JOBS_PER_SOURCE,  # Limit to configured number of jobs
+                offset=page * JOBS_PER_SOURCE,  # Skip the jobs of earlier pages
                 hours_old=72,       # Recent jobs only
                 job_type=job_type,
                 is_remote=is_remote,
-                linkedin_fetch_description=True,  # Get full description
+                linkedin_fetch_description=not LAZY_DETAILS,  # Full descriptions, unless fetched later for the best jobs only
                 enforce_annual_salary=True,  # Convert all salaries to annual
                 verbose=0
             )
         )
         
-        # Log raw LinkedIn response
-        linkedin_logger.info("Raw LinkedIn Response:")
-        linkedin_logger.info(json.dumps(linkedin_jobs.to_dict(orient='records'), indent=2, cls=DateTimeEncoder))
-        
         # Convert to list of dictionaries
         if isinstance(linkedin_jobs, pd.DataFrame):
-            # Process the job listings into a standardized format
-            jobs_list = []
-            for _, job in linkedin_jobs.iterrows():
-                # Format salary information
-                salary = "Not specified"
-                if job.get('min_amount') is not None and job.get('max_amount') is not None:
-                    min_amount = job.get('min_amount')
-                    max_amount = job.get('max_amount')
-                    interval = job.get('interval', 'yearly')
-                    currency = job.get('currency', 'USD')
-                    
-                    if min_amount == max_amount:
-                        salary = f"{currency} {min_amount:,} per {interval}"
-                    else:
-                        salary = f"{currency} {min_amount:,} - {max_amount:,} per {interval}"
-                
-                # Extract job type information
-                job_nature = job.get('job_type', criteria.jobNature)
-                if job_nature and str(job_nature) != 'nan':
-                    job_nature = str(job_nature).title()
-                
-                # Format date to string
-                posted_date = job.get('date_posted', '')
-                if isinstance(posted_date, (pd.Timestamp, datetime)):
-                    posted_date = posted_date.strftime('%Y-%m-%d')
-                
-                # Create standardized job object
-                job_obj = {
-                    "job_title": job.get('title', 'Unknown Title'),
-                    "company": job.get('company', 'Unknown Company'),
-                    "experience": job.get('job_level', criteria.experience),  # LinkedIn often provides job level
-                    "jobNature": job_nature,
-                    "location": job.get('location', criteria.location),
-                    "salary": salary,
-                    "apply_link": job.get('job_url', ''),
-                    "source": "LinkedIn",
-                    "description": job.get('description', 'No description available'),
-                    "company_industry": job.get('company_industry', ''),
-                    "job_function": job.get('job_function', ''),
-                    "employment_type": job.get('employment_type', ''),
-                    "seniority_level": job.get('job_level', ''),
-                    "posted_date": posted_date
-                }
-                jobs_list.append(job_obj)
-                
+            # Log raw LinkedIn response
+            linkedin_logger.info("Raw LinkedIn Response:")
+            linkedin_logger.info(raw_json(linkedin_jobs))
+            
+            # Process the job listings into a standardized format; LinkedIn often
+            # provides the job level, otherwise experience comes from the description
+            jobs_list = normalize_jobs(linkedin_jobs, "LinkedIn", criteria, LINKEDIN_FIELDS,
+                                       experience_column_name="job_level", date_format="%Y-%m-%d",
+                                       details_pending=LAZY_DETAILS)
             linkedin_logger.info(f"Successfully processed {len(jobs_list)} jobs from LinkedIn")
             return jobs_list
         
@@ -134,4 +102,66 @@ async def fetch_linkedin_jobs(criteria: JobSearchCriteria) -> List[Dict[str, Any
         
     except Exception as e:
         linkedin_logger.error(f"Error fetching LinkedIn jobs: {str(e)}")
-        return []  # Return empty list on error
\ No newline at end of file
+        return []  # Return empty list on error
+
+LINKEDIN_JOB_URL = "https://www.linkedin.com/jobs/view/{job_id}"
+LINKEDIN_HEADERS = {
+    "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "accept-language": "en-US,en;q=0.9",
+    "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+}
+
+def _criteria_value(soup: BeautifulSoup, heading: str) -> str:
+    """Value under a heading of the job page's criteria list ("Seniority level", "Employment type", ...)"""
+    for subheader in soup.find_all("h3", class_="description__job-criteria-subheader"):
+        if heading in subheader.get_text():
+            value = subheader.find_next_sibling("span", class_="description__job-criteria-text")
+            return value.get_text(strip=True) if value else ""
+    return ""
+
+def parse_linkedin_job_page(html: str) -> Dict[str, Any]:
+    """Description and criteria of a LinkedIn job page, in the fields of a LinkedIn job record"""
+    soup = BeautifulSoup(html, "html.parser")
+    markup = soup.find("div", class_="show-more-less-html__markup")
+    if markup is None:
+        raise ValueError("no job description on the page")
+    description = markup.get_text("\n", strip=True)
+    seniority = _criteria_value(soup, "Seniority level")
+    employment_type = _criteria_value(soup, "Employment type")
+    details = {
+        "description": description,
+        "experience": seniority or extract_experience(description),
+        "seniority_level": seniority.lower(),
+        "employment_type": employment_type,
+        "job_function": _criteria_value(soup, "Job function"),
+        "company_industry": _criteria_value(soup, "Industries"),
+    }
+    if employment_type:
+        details["jobNature"] = employment_type.title()
+    return details
+
+async def fetch_linkedin_details(jobs: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Detail fields for listing-only LinkedIn jobs, fetched with bounded
+    concurrency; None for a job whose page could not be fetched or parsed
+    """
+    semaphore = asyncio.Semaphore(LINKEDIN_DETAIL_CONCURRENCY)
+
+    async def fetch(client: httpx.AsyncClient, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        match = re.search(r"/jobs/view/(\d+)", str(job.get("apply_link") or ""))
+        if not match:
+            return None
+        async with semaphore:
+            try:
+                response = await client.get(LINKEDIN_JOB_URL.format(job_id=match.group(1)))
+                response.raise_for_status()
+                return parse_linkedin_job_page(response.text)
+            except (httpx.HTTPError, ValueError) as e:
+                linkedin_logger.warning(f"Could not fetch LinkedIn job {match.group(1)}: {str(e)}")
+                return None
+
+    async with httpx.AsyncClient(headers=LINKEDIN_HEADERS, timeout=LINKEDIN_DETAIL_TIMEOUT,
+                                 follow_redirects=True) as client:
+        details = await asyncio.gather(*(fetch(client, job) for job in jobs))
+    linkedin_logger.info(f"Fetched details of {sum(d is not None for d in details)}/{len(jobs)} LinkedIn jobs")
+    return details
@@ -7,15 +7,37 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.select import Select
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
 import time
-from urllib.parse import quote
 import traceback
 import re
 from concurrent.futures import ThreadPoolExecutor
 import logging
-from config import JOBS_PER_SOURCE
+from config import (
+    DRIVER_POOL_MIN_SIZE, DRIVER_POOL_MAX_SIZE, DRIVER_POOL_ACQUIRE_TIMEOUT,
+    DRIVER_MAX_USES, DRIVER_MAX_AGE, DRIVER_MAX_MEMORY_MB, DRIVER_LEASE_TIMEOUT, ROZEE_SCRAPER,
+    ROZEE_DETAIL_CONCURRENCY, ROZEE_DETAIL_TIMEOUT, ROZEE_EXTRACTION,
+    ROZEE_PAGE_LOAD_STRATEGY, ROZEE_ALLOWED_DOMAINS, ROZEE_ALLOWED_RESOURCE_TYPES, LAZY_DETAILS,
+)
+from job_sources.driver_pool import DriverPool
+from job_sources.rozee_http import fetch_rozee_details_http, fetch_rozee_jobs_http
+from job_sources.rozee_parser import (
+    CITY_SELECT_SELECTOR, CARD_SELECTOR, TITLE_SELECTOR, LINK_SELECTOR, COMPANY_LOCATION_SELECTOR,
+    CARD_SALARY_SELECTOR, SNIPPET_SELECTOR, DETAIL_CONTAINER_ID, HEADER_SALARY_SELECTOR, DETAILS_SELECTOR,
+    DETAIL_ROW_SELECTOR, DETAIL_LABEL_SELECTOR, DETAIL_VALUE_SELECTOR, APPLY_BUTTON_SELECTOR,
+    JOBS_CONTAINER_SELECTOR, CityCards, RozeeParseError, build_job, card_fields, listing_cache, listing_job,
+    parse_detail, parse_listing, search_city, search_url, split_company_location,
+)
 import json
+import httpx
+
+# URL patterns of the resource types that can be blocked
+RESOURCE_TYPE_PATTERNS = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"],
+    "stylesheet": ["*.css"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.ogg"],
+}
 
 # Configure Rozee-specific logging
 rozee_logger = logging.getLogger('rozee')
@@ -24,18 +46,48 @@ rozee_handler = logging.FileHandler('rozee_raw.log')
 rozee_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 rozee_logger.addHandler(rozee_handler)
 
-async def fetch_rozee_jobs(criteria):
+async def fetch_rozee_jobs(criteria, page=0):
     """
-    Fetch jobs from Rozee.pk using Selenium for web scraping, including details.
+    Fetch one page of jobs from Rozee.pk, including details: over plain HTTP when ROZEE_SCRAPER is "http",
+    otherwise (or when the HTTP pages do not parse) using Selenium for web scraping.
     """
-    rozee_logger.info(f"Fetching Rozee.pk jobs for {criteria.position} in {criteria.location}")
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _fetch_rozee_jobs_sync, criteria)
+    rozee_logger.info(f"Fetching Rozee.pk jobs for {criteria.position} in {criteria.location} (page {page + 1})")
+    if ROZEE_SCRAPER == "http":
+        try:
+            return await fetch_rozee_jobs_http(criteria, page)
+        except (httpx.HTTPError, RozeeParseError) as e:
+            rozee_logger.warning(f"HTTP scraping of Rozee.pk failed ({type(e).__name__}: {str(e)}), falling back to Selenium")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _fetch_rozee_jobs_sync, criteria, page)
 
-def _fetch_rozee_jobs_sync(criteria):
+async def fetch_rozee_details(jobs):
     """
-    Synchronous function to fetch Rozee.pk jobs using Selenium, clicking for details.
+    Detail fields for listing-only Rozee.pk jobs, None where they could not
+    be loaded: over HTTP when ROZEE_SCRAPER is "http", in browser tabs otherwise
+    or for the pages HTTP could not parse
     """
+    cards = [card_fields(job) for job in jobs]
+    details = [None] * len(cards)
+    if ROZEE_SCRAPER == "http":
+        details = await fetch_rozee_details_http(cards)
+    missing = [i for i, job in enumerate(details) if job is None]
+    if missing:
+        loop = asyncio.get_running_loop()
+        loaded = await loop.run_in_executor(None, _fetch_rozee_details_sync, [cards[i] for i in missing])
+        for i, job in zip(missing, loaded):
+            details[i] = job
+    return details
+
+def _fetch_rozee_details_sync(cards):
+    try:
+        with driver_pool.driver() as driver:
+            return _load_details(driver, cards)
+    except (TimeoutError, WebDriverException) as e:
+        rozee_logger.error(f"Could not load Rozee.pk details: {str(e)}")
+        return [None] * len(cards)
+
+def _create_driver():
+    """Start a headless Chrome configured for scraping Rozee.pk"""
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
@@ -64,48 +116,121 @@ def _fetch_rozee_jobs_sync(criteria):
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option("useAutomationExtension", False)
 
+    # Return from driver.get at DOMContentLoaded; the scraper waits for the job list itself
+    chrome_options.page_load_strategy = ROZEE_PAGE_LOAD_STRATEGY
+    # Hosts outside the allow-list do not resolve, so third-party scripts, ads and analytics never load
+    rules = _host_resolver_rules(ROZEE_ALLOWED_DOMAINS)
+    if rules:
+        chrome_options.add_argument(f"--host-resolver-rules={rules}")
+    # CDP network events, summarized in the Rozee log after every search
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
     driver = webdriver.Chrome(options=chrome_options)
     driver.set_page_load_timeout(30)  # Set page load timeout
-    driver.implicitly_wait(5)  # Reduced implicit wait
-    wait = WebDriverWait(driver, 10)  # Reduced explicit wait
+    _block_resources(driver)
+    # Snapshot extraction never looks up optional elements, so it needs no implicit wait
+    driver.implicitly_wait(0 if ROZEE_EXTRACTION == "snapshot" else 5)
+    return driver
+
+# Warm browsers shared by all Rozee searches in this process
+driver_pool = DriverPool(
+    _create_driver,
+    # With the HTTP scraper browsers are only needed as a fallback, so none are started ahead of time
+    min_size=DRIVER_POOL_MIN_SIZE if ROZEE_SCRAPER == "selenium" else 0,
+    max_size=DRIVER_POOL_MAX_SIZE,
+    max_uses=DRIVER_MAX_USES,
+    max_age=DRIVER_MAX_AGE,
+    max_memory_mb=DRIVER_MAX_MEMORY_MB,
+    lease_timeout=DRIVER_LEASE_TIMEOUT,
+    acquire_timeout=DRIVER_POOL_ACQUIRE_TIMEOUT,
+)
+
+def _fetch_rozee_jobs_sync(criteria, page=0):
+    """
+    Synchronous function to fetch Rozee.pk jobs using Selenium, opening each job's details.
+    """
+    try:
+        with driver_pool.driver() as driver:
+            return _scrape_rozee(driver, criteria, page)
+    except TimeoutError as e:
+        rozee_logger.error(f"Rozee.pk search skipped: {str(e)}")
+        return []
+
+def _host_resolver_rules(allowed_domains):
+    """
+    Chrome --host-resolver-rules under which only the allowed domains, their
+    subdomains and localhost resolve; None when every domain is allowed.
+    This is an allow-list on purpose: CDP Network.setBlockedURLs only takes
+    patterns to block, so it cannot block every host but a few.
+    """
+    if not allowed_domains:
+        return None
+    rules = ", ".join(f"EXCLUDE {host}" for domain in allowed_domains for host in (domain, f"*.{domain}"))
+    return f"MAP * ~NOTFOUND, {rules}, EXCLUDE localhost"
 
+def _blocked_url_patterns(allowed_types):
+    """Network.setBlockedURLs patterns for the resource types outside `allowed_types`"""
+    return [pattern for kind, kind_patterns in RESOURCE_TYPE_PATTERNS.items()
+            if kind not in allowed_types for pattern in kind_patterns]
+
+def _block_resources(driver):
+    """Block resource types outside ROZEE_ALLOWED_RESOURCE_TYPES in the current tab"""
+    patterns = _blocked_url_patterns(ROZEE_ALLOWED_RESOURCE_TYPES)
     try:
-        # Navigation and City Selection
-        city = criteria.location.split(',')[0].strip()
-        position_query = quote(criteria.position)
-        rozee_url = f"https://www.rozee.pk/job/jsearch/q/{position_query}"
-        rozee_logger.info(f"Navigating to Rozee.pk URL: {rozee_url}")
-        driver.get(rozee_url)
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except WebDriverException as e:
+        rozee_logger.warning(f"Could not block resources through CDP: {str(e)}")
 
+def _log_network_metrics(driver, page_ready):
+    """Summarize the CDP network events of the search that just ran"""
+    try:
+        entries = driver.get_log("performance")
+    except WebDriverException as e:
+        rozee_logger.warning(f"Could not read CDP network events: {str(e)}")
+        return
+    requests, blocked, transferred = 0, 0, 0
+    for entry in entries:
         try:
-            select_element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "select.form-control.w-100")))
-            select = Select(select_element)
-            rozee_logger.info(f"Selecting city: {city}")
-            select.select_by_visible_text(city)
-        except Exception as city_select_error:
-            rozee_logger.warning(f"Could not select city '{city}'. Error: {city_select_error}. Proceeding without city filter.")
-
-        # Wait for job list to load
-        wait_selector = "div#jobs > div.job div.jhead div.jobt h3.s-18 a"
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector)))
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue  # Not a DevTools event
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            requests += 1
+        elif method == "Network.loadingFinished":
+            transferred += params.get("encodedDataLength", 0)
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked += 1
+    rozee_logger.info(f"Rozee.pk network: {requests} requests, {blocked} blocked, "
+                      f"{transferred / 1024:.1f} KB transferred; job list ready in {page_ready:.2f}s")
 
-        # Find job cards
-        card_selector = "div#jobs > div.job"
-        job_cards = driver.find_elements(By.CSS_SELECTOR, card_selector)
-        rozee_logger.info(f"Found {len(job_cards)} potential job cards.")
+def _scrape_rozee(driver, criteria, page=0):
+    """Run one Rozee.pk search for a page of jobs on a pooled driver"""
+    wait = WebDriverWait(driver, 10)  # Reduced explicit wait
 
-        jobs = []
-        processed_urls = set()
+    try:
+        driver.get_log("performance")  # Drop events left over from the previous search
+    except WebDriverException:
+        pass
 
-        # Process only the configured number of cards
-        for i in range(min(len(job_cards), JOBS_PER_SOURCE)):
-            try:
-                job = process_job_card(driver, job_cards[i], i, criteria, processed_urls)
-                if job:
-                    jobs.append(job)
-            except Exception as e:
-                rozee_logger.error(f"Error processing job card {i + 1}: {str(e)}")
-                continue
+    try:
+        # Listing pages in order until this page of jobs in the city is complete
+        city_cards = CityCards(criteria.location, page)
+        page_ready = 0.0
+        while not city_cards.done:
+            navigation_started = time.monotonic()
+            city_cards.add(_read_listing(driver, wait, criteria, city_cards.offset))
+            page_ready += time.monotonic() - navigation_started
+        cards = city_cards.page()
+
+        if LAZY_DETAILS:
+            jobs = [listing_job(card) for card in cards]
+        else:
+            # A card whose details did not load keeps only its listing fields
+            details = _load_details(driver, cards)
+            jobs = [job or build_job(card, "", {}, False) for card, job in zip(cards, details)]
+        _log_network_metrics(driver, page_ready)
 
         # Log raw Rozee jobs
         rozee_logger.info("Raw Rozee Jobs:")
@@ -119,140 +244,215 @@ def _fetch_rozee_jobs_sync(criteria):
         rozee_logger.error("Full Traceback:", exc_info=True)
         return []
 
+def _read_listing(driver, wait, criteria, offset):
+    """Cards of the listing page at `offset` with the city selected, parsed once per ROZEE_LISTING_CACHE_TTL"""
+    city = search_city(criteria.location)
+    rozee_url = search_url(criteria.position, offset)
+    cache_key = f"selenium:{city}:{rozee_url}"
+    cached = listing_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Navigation and City Selection
+    rozee_logger.info(f"Navigating to Rozee.pk URL: {rozee_url}")
+    driver.get(rozee_url)
+    try:
+        select_element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, CITY_SELECT_SELECTOR)))
+        select = Select(select_element)
+        rozee_logger.info(f"Selecting city: {city}")
+        select.select_by_visible_text(city)
+    except Exception as city_select_error:
+        rozee_logger.warning(f"Could not select city '{city}'. Error: {city_select_error}. Keeping only cards located there.")
+
+    # Wait for job list to load; an empty list is the end of the results
+    wait_selector = f"{CARD_SELECTOR} {LINK_SELECTOR}"
+    try:
+        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector)))
+    except TimeoutException:
+        if offset and driver.find_elements(By.CSS_SELECTOR, JOBS_CONTAINER_SELECTOR):
+            listing_cache.set(cache_key, [])
+            return []
+        raise
+
+    # Find job cards
+    job_cards = driver.find_elements(By.CSS_SELECTOR, CARD_SELECTOR)
+    rozee_logger.info(f"Found {len(job_cards)} potential job cards.")
+
+    # Listing fields of every card, so that later pages of the search can reuse them
+    started = time.perf_counter()
+    if ROZEE_EXTRACTION == "snapshot":
+        cards = parse_listing(driver.page_source, driver.current_url, criteria.location)
+    else:
+        cards = []
+        for i, card in enumerate(job_cards):
+            try:
+                cards.append(read_job_card(card, criteria))
+            except Exception as e:
+                rozee_logger.error(f"Error processing job card {i + 1}: {str(e)}")
+    _log_extraction_time("listing", time.perf_counter() - started, len(cards))
+    listing_cache.set(cache_key, cards)
+    return cards
+
+def read_job_card(card, criteria):
+    """Listing fields of a single job card"""
+    job_title_elem = card.find_element(By.CSS_SELECTOR, TITLE_SELECTOR)
+    job_title = job_title_elem.get_attribute("title") or job_title_elem.text.strip()
+
+    job_link_elem = job_title_elem.find_element(By.CSS_SELECTOR, "a")
+    job_link = job_link_elem.get_attribute("href")
+
+    company_location_container = card.find_element(By.CSS_SELECTOR, COMPANY_LOCATION_SELECTOR)
+    company_location_parts = [a.text.strip() for a in company_location_container.find_elements(By.TAG_NAME, "a")]
+    company, location = split_company_location(company_location_parts, criteria.location)
+
+    # Get salary from the job card if available
+    salary = "Not Specified"
+    try:
+        salary_div = card.find_element(By.CSS_SELECTOR, CARD_SALARY_SELECTOR)
+        if salary_div:
+            salary = salary_div.text.strip()
+    except NoSuchElementException:
+        pass
+
+    return {
+        "job_title": job_title,
+        "company": company,
+        "location": location,
+        "salary": salary,
+        "apply_link": job_link,
+        "description_snippet": card.find_element(By.CSS_SELECTOR, SNIPPET_SELECTOR).text.strip(),
+    }
+
+def _load_details(driver, cards):
+    """
+    Job records with details for `cards`, None where the details did not
+    load. Up to ROZEE_DETAIL_CONCURRENCY detail pages load at once, each in
+    its own tab, and each card gets its own ROZEE_DETAIL_TIMEOUT, so a slow
+    page only costs its own details.
+    """
+    main_window = driver.current_window_handle
+    jobs = []
+    extraction_time = 0.0
+    try:
+        for start in range(0, len(cards), ROZEE_DETAIL_CONCURRENCY):
+            tabs = []
+            for card in cards[start:start + ROZEE_DETAIL_CONCURRENCY]:
+                driver.switch_to.new_window("tab")
+                _block_resources(driver)  # CDP settings are per tab
+                # Navigate without waiting for the load, so the tabs load in parallel
+                driver.execute_script("window.location.href = arguments[0];", card["apply_link"])
+                tabs.append((driver.current_window_handle, card, time.monotonic() + ROZEE_DETAIL_TIMEOUT))
+
+            for handle, card, deadline in tabs:
+                driver.switch_to.window(handle)
+                job, seconds = _read_detail_tab(driver, card, deadline)
+                jobs.append(job)
+                extraction_time += seconds
+                driver.close()
+                # Closing leaves the driver on a closed window, where the next batch could not open tabs
+                driver.switch_to.window(main_window)
+        _log_extraction_time("detail", extraction_time, len(cards))
     finally:
-        rozee_logger.info("Closing Rozee.pk WebDriver.")
-        if 'driver' in locals() and driver:
-            driver.quit()
+        for handle in driver.window_handles:
+            if handle != main_window:
+                driver.switch_to.window(handle)
+                driver.close()
+        driver.switch_to.window(main_window)
+    return jobs
 
-def process_job_card(driver, card, index, criteria, processed_urls):
-    """Process a single job card and extract its details"""
+def _read_detail_tab(driver, card, deadline):
+    """
+    (job record, seconds spent extracting) for the detail page in the current
+    tab; the record is None if the page does not load in time
+    """
     try:
-        # Extract basic info
-        job_title_elem = card.find_element(By.CSS_SELECTOR, "div.jhead div.jobt h3.s-18")
-        job_title = job_title_elem.get_attribute("title") or job_title_elem.text.strip()
+        wait = WebDriverWait(driver, max(deadline - time.monotonic(), 0.1))
+        detail_container = wait.until(EC.visibility_of_element_located((By.ID, DETAIL_CONTAINER_ID)))
+        started = time.perf_counter()
+        if ROZEE_EXTRACTION == "snapshot":
+            details = parse_detail(driver.page_source)
+        else:
+            details = read_job_details(driver, detail_container)
+        extraction_time = time.perf_counter() - started
+    except (TimeoutException, WebDriverException, RozeeParseError) as e:
+        rozee_logger.warning(f"Details of {card['apply_link']} not loaded: {type(e).__name__}")
+        return None, 0.0
 
-        job_link_elem = job_title_elem.find_element(By.CSS_SELECTOR, "a")
-        job_link = job_link_elem.get_attribute("href")
+    full_details, job_details, apply_button_found, header_salary = details
+    if card["salary"] == "Not Specified" and header_salary:
+        card = {**card, "salary": header_salary}
+    rozee_logger.info(f"Successfully processed job: {card['job_title']}")
+    return build_job(card, full_details, job_details, apply_button_found), extraction_time
 
-        if job_link in processed_urls:
-            return None
+def _log_extraction_time(stage, seconds, cards):
+    if cards:
+        rozee_logger.info(f"Rozee.pk {stage} extraction ({ROZEE_EXTRACTION}): "
+                          f"{seconds * 1000:.1f} ms for {cards} cards, {seconds * 1000 / cards:.1f} ms per card")
 
-        company_location_container = card.find_element(By.CSS_SELECTOR, "div.jhead div.cname bdi")
-        company_location_parts = [a.text.strip() for a in company_location_container.find_elements(By.TAG_NAME, "a")]
-        company = company_location_parts[0].rstrip(',') if company_location_parts else "N/A"
-        location = " ".join(company_location_parts[1:]).lstrip(', ') if len(company_location_parts) > 1 else criteria.location
+def read_job_details(driver, detail_container):
+    """(full details text, labelled detail rows, apply button present, header salary) of a loaded detail view"""
+    # Get full job description and details
+    full_details = ""
+    try:
+        # Get job description
+        desc_section = detail_container.find_element(By.XPATH, ".//h3[text()='Job Description']/following-sibling::div[1]")
+        if desc_section:
+            full_details += "Job Description:\n" + desc_section.text.strip() + "\n\n"
+    except NoSuchElementException:
+        pass
 
-        # Get salary if available
-        salary = "Not Specified"
-        try:
-            # First try to get salary from the job header
-            salary_div = driver.find_element(By.CSS_SELECTOR, "div.mrsl.float-left.mt5.ofa.nrs-18")
-            if salary_div:
-                salary = salary_div.text.strip()
-        except NoSuchElementException:
-            try:
-                # Try to get salary from the job card
-                salary_div = card.find_element(By.CSS_SELECTOR, "div.mrsl")
-                if salary_div:
-                    salary = salary_div.text.strip()
-            except NoSuchElementException:
-                pass
-
-        # Click to view details
-        click_target = card.find_element(By.CSS_SELECTOR, "div.jhead div.jobt h3.s-18 a")
-        click_target.click()
-        processed_urls.add(job_link)
-
-        # Wait for job details to load
-        wait = WebDriverWait(driver, 5)
-        detail_container = wait.until(EC.visibility_of_element_located((By.ID, "job-content")))
-        
-        # Get full job description and details
-        full_details = ""
-        try:
-            # Get job description
-            desc_section = detail_container.find_element(By.XPATH, ".//h3[text()='Job Description']/following-sibling::div[1]")
-            if desc_section:
-                full_details += "Job Description:\n" + desc_section.text.strip() + "\n\n"
-        except NoSuchElementException:
-            pass
+    try:
+        # Get job skills
+        skills_section = detail_container.find_element(By.XPATH, ".//h4[text()='Job Skills']/following-sibling::div[1]")
+        if skills_section:
+            full_details += "Job Skills:\n" + skills_section.text.strip() + "\n\n"
+    except NoSuchElementException:
+        pass
 
-        try:
-            # Get job skills
-            skills_section = detail_container.find_element(By.XPATH, ".//h4[text()='Job Skills']/following-sibling::div[1]")
-            if skills_section:
-                full_details += "Job Skills:\n" + skills_section.text.strip() + "\n\n"
-        except NoSuchElementException:
-            pass
-
-        # Extract structured job details
-        job_details = {}
-        try:
-            # Find the job details section using the correct class
-            details_section = detail_container.find_element(By.CSS_SELECTOR, "div.jblk h4.nrs-18 + div.jcnt.jobd")
-            if details_section:
-                # Find all rows in the details section
-                rows = details_section.find_elements(By.CSS_SELECTOR, "div.row")
-                for row in rows:
-                    try:
-                        # Get the label (first column)
-                        label_elem = row.find_element(By.CSS_SELECTOR, "div.col-lg-3")
-                        label = label_elem.text.strip().rstrip(':')
-                        
-                        # Get the value (second column)
-                        value_elem = row.find_element(By.CSS_SELECTOR, "div.col-lg-7")
-                        # Get text from all elements in the value column
-                        value_parts = []
-                        for elem in value_elem.find_elements(By.CSS_SELECTOR, "*"):
-                            if elem.tag_name == "a":
-                                value_parts.append(elem.text.strip())
-                            else:
-                                value_parts.append(elem.text.strip())
-                        value = " ".join(filter(None, value_parts))
-                        
-                        # Store in job_details
-                        job_details[label] = value
-                    except NoSuchElementException:
-                        continue
-        except NoSuchElementException:
-            pass
-
-        # Check if apply button exists
-        apply_button_found = False
-        try:
-            apply_button = driver.find_element(By.CSS_SELECTOR, "a.btn-applyJb")
-            apply_button_found = apply_button.is_displayed()
-        except NoSuchElementException:
-            pass
-
-        # Create simplified job object with complete details
-        job = {
-            "job_title": job_title,
-            "company": company,
-            "location": location,
-            "salary": salary,
-            "apply_link": job_link if job_link else "N/A",
-            "apply_button_present": apply_button_found,
-            "source": "Rozee.pk",
-            "description_snippet": card.find_element(By.CSS_SELECTOR, "div.jbody bdi").text.strip(),
-            "full_details": full_details,
-            # Add structured job details
-            "industry": job_details.get("Industry", "Not specified"),
-            "functional_area": job_details.get("Functional Area", "Not specified"),
-            "total_positions": job_details.get("Total Positions", "Not specified"),
-            "job_shift": job_details.get("Job Shift", "Not specified"),
-            "job_type": job_details.get("Job Type", "Not specified"),
-            "gender": job_details.get("Gender", "Not specified"),
-            "minimum_education": job_details.get("Minimum Education", "Not specified"),
-            "career_level": job_details.get("Career Level", "Not specified"),
-            "experience": job_details.get("Experience", "Not specified"),
-            "apply_before": job_details.get("Apply Before", "Not specified"),
-            "posting_date": job_details.get("Posting Date", "Not specified")
-        }
-
-        rozee_logger.info(f"Successfully processed job card {index + 1}: {job_title}")
-        return job
+    # Extract structured job details
+    job_details = {}
+    try:
+        # Find the job details section using the correct class
+        details_section = detail_container.find_element(By.CSS_SELECTOR, DETAILS_SELECTOR)
+        if details_section:
+            # Find all rows in the details section
+            rows = details_section.find_elements(By.CSS_SELECTOR, DETAIL_ROW_SELECTOR)
+            for row in rows:
+                try:
+                    # Get the label (first column)
+                    label_elem = row.find_element(By.CSS_SELECTOR, DETAIL_LABEL_SELECTOR)
+                    label = label_elem.text.strip().rstrip(':')
+                    
+                    # Get the value (second column)
+                    value_elem = row.find_element(By.CSS_SELECTOR, DETAIL_VALUE_SELECTOR)
+                    # Get text from all elements in the value column
+                    value_parts = []
+                    for elem in value_elem.find_elements(By.CSS_SELECTOR, "*"):
+                        if elem.tag_name == "a":
+                            value_parts.append(elem.text.strip())
+                        else:
+                            value_parts.append(elem.text.strip())
+                    value = " ".join(filter(None, value_parts))
+                    
+                    # Store in job_details
+                    job_details[label] = value
+                except NoSuchElementException:
+                    continue
+    except NoSuchElementException:
+        pass
 
-    except Exception as e:
-        rozee_logger.error(f"Error processing card {index + 1}: {str(e)}")
-        return None
\ No newline at end of file
+    # Check if apply button exists
+    apply_button_found = False
+    try:
+        apply_button = driver.find_element(By.CSS_SELECTOR, APPLY_BUTTON_SELECTOR)
+        apply_button_found = apply_button.is_displayed()
+    except NoSuchElementException:
+        pass
+
+    header_salary = None
+    try:
+        header_salary = driver.find_element(By.CSS_SELECTOR, HEADER_SALARY_SELECTOR).text.strip() or None
+    except NoSuchElementException:
+        pass
+
+    return full_details, job_details, apply_button_found, header_salary
@@ -0,0 +1,108 @@
+# job_sources/rozee_http.py
+"""
+Browserless Rozee.pk scraper: the search listing and every job's detail
+page are fetched with one pooled async HTTP client and parsed with the
+same selectors as the Selenium scraper (job_sources.rozee_parser).
+
+RozeeParseError means the pages did not have the expected structure;
+fetch_rozee_jobs then falls back to the Selenium scraper.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from config import (
+    LAZY_DETAILS, ROZEE_DETAIL_CONCURRENCY, ROZEE_DETAIL_TIMEOUT, ROZEE_HTTP_MAX_CONNECTIONS, ROZEE_HTTP_TIMEOUT,
+)
+from job_sources.rozee_parser import (
+    CityCards, RozeeParseError, build_job, listing_cache, listing_job, parse_detail, parse_listing, search_url,
+)
+
+rozee_logger = logging.getLogger('rozee')
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_client: Optional[httpx.AsyncClient] = None
+
+def _get_client() -> httpx.AsyncClient:
+    """One connection pool for all Rozee requests in this process"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=ROZEE_HTTP_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=ROZEE_HTTP_MAX_CONNECTIONS,
+                                max_keepalive_connections=ROZEE_HTTP_MAX_CONNECTIONS),
+        )
+    return _client
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def _fetch_listing(client: httpx.AsyncClient, criteria, offset: int) -> List[Dict[str, Any]]:
+    """Cards of the listing page at `offset`, parsed once per ROZEE_LISTING_CACHE_TTL"""
+    url = search_url(criteria.position, offset)
+    cards = listing_cache.get(f"http:{url}")
+    if cards is None:
+        rozee_logger.info(f"Fetching Rozee.pk listing over HTTP: {url}")
+        response = await client.get(url)
+        response.raise_for_status()
+        cards = parse_listing(response.text, str(response.url), criteria.location)
+        listing_cache.set(f"http:{url}", cards)
+    return cards
+
+async def _fetch_details(client: httpx.AsyncClient, card: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Job record for one card, or None if its detail page could not be fetched or parsed"""
+    try:
+        response = await client.get(card["apply_link"], timeout=ROZEE_DETAIL_TIMEOUT)
+        response.raise_for_status()
+        full_details, job_details, apply_button_found, header_salary = parse_detail(response.text)
+    except (httpx.HTTPError, RozeeParseError) as e:
+        rozee_logger.warning(f"Could not load details for {card['apply_link']}: {str(e)}")
+        return None
+    if card["salary"] == "Not Specified" and header_salary:
+        card = {**card, "salary": header_salary}
+    return build_job(card, full_details, job_details, apply_button_found)
+
+async def fetch_rozee_details_http(cards: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """Job records with details for `cards`, fetched in parallel; None where a detail page failed"""
+    client = _get_client()
+    semaphore = asyncio.Semaphore(ROZEE_DETAIL_CONCURRENCY)
+
+    async def fetch_bounded(card):
+        async with semaphore:
+            return await _fetch_details(client, card)
+
+    return await asyncio.gather(*(fetch_bounded(card) for card in cards))
+
+async def fetch_rozee_jobs_http(criteria, page: int = 0) -> List[Dict[str, Any]]:
+    """
+    Rozee.pk jobs of one page without a browser, with details unless
+    LAZY_DETAILS defers them; raises RozeeParseError if the pages did not parse
+    """
+    client = _get_client()
+    city_cards = CityCards(criteria.location, page)
+    while not city_cards.done:
+        city_cards.add(await _fetch_listing(client, criteria, city_cards.offset))
+    cards = city_cards.page()
+    rozee_logger.info(f"Found {len(cards)} Rozee.pk job cards over HTTP.")
+    if LAZY_DETAILS:
+        return [listing_job(card) for card in cards]
+
+    # One detail page that fails or times out keeps only its listing fields
+    results = await fetch_rozee_details_http(cards)
+    if cards and all(job is None for job in results):
+        raise RozeeParseError("no detail page could be parsed")
+    jobs = [job or build_job(card, "", {}, False) for card, job in zip(cards, results)]
+    rozee_logger.info(f"Finished processing. Found {len(jobs)} valid Rozee.pk jobs with details over HTTP.")
+    return jobs
@@ -0,0 +1,209 @@
+# job_sources/rozee_parser.py
+"""
+Rozee.pk page structure shared by the Selenium and HTTP scrapers: the CSS
+selectors, HTML parsing of listing and detail pages, and the job record
+both scrapers return.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urljoin
+
+from bs4 import BeautifulSoup
+
+from bounded_cache import BoundedCache
+from config import JOBS_PER_SOURCE, ROZEE_LISTING_CACHE_TTL, ROZEE_LISTING_PAGE_SIZE, ROZEE_MAX_LISTING_PAGES
+from field_extractor import extract_job_fields
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+SEARCH_URL = "https://www.rozee.pk/job/jsearch/q/{query}"
+SEARCH_PAGE_PATH = "/fpn/{offset}"  # Appended for results after the first listing page
+
+# Listing page
+CITY_SELECT_SELECTOR = "select.form-control.w-100"
+JOBS_CONTAINER_SELECTOR = "div#jobs"
+CARD_SELECTOR = "div#jobs > div.job"
+TITLE_SELECTOR = "div.jhead div.jobt h3.s-18"
+LINK_SELECTOR = "div.jhead div.jobt h3.s-18 a"
+COMPANY_LOCATION_SELECTOR = "div.jhead div.cname bdi"
+CARD_SALARY_SELECTOR = "div.mrsl"
+SNIPPET_SELECTOR = "div.jbody bdi"
+
+# Detail view
+DETAIL_CONTAINER_ID = "job-content"
+HEADER_SALARY_SELECTOR = "div.mrsl.float-left.mt5.ofa.nrs-18"
+DETAILS_SELECTOR = "div.jblk h4.nrs-18 + div.jcnt.jobd"
+DETAIL_ROW_SELECTOR = "div.row"
+DETAIL_LABEL_SELECTOR = "div.col-lg-3"
+DETAIL_VALUE_SELECTOR = "div.col-lg-7"
+APPLY_BUTTON_SELECTOR = "a.btn-applyJb"
+
+# Job record fields that come from the listing card
+CARD_FIELDS = ("job_title", "company", "location", "salary", "apply_link", "description_snippet")
+
+# Job record field -> label in the detail rows
+DETAIL_FIELDS = {
+    "industry": "Industry",
+    "functional_area": "Functional Area",
+    "total_positions": "Total Positions",
+    "job_shift": "Job Shift",
+    "job_type": "Job Type",
+    "gender": "Gender",
+    "minimum_education": "Minimum Education",
+    "career_level": "Career Level",
+    "experience": "Experience",
+    "apply_before": "Apply Before",
+    "posting_date": "Posting Date",
+}
+
+class RozeeParseError(Exception):
+    """The page does not have the structure the selectors expect"""
+
+def search_url(position: str, offset: int = 0) -> str:
+    url = SEARCH_URL.format(query=quote(position))
+    return url + SEARCH_PAGE_PATH.format(offset=offset) if offset else url
+
+# Parsed listing pages by scraper and URL, so later pages of a search do not load them again
+listing_cache = BoundedCache("rozee_listing", ROZEE_LISTING_CACHE_TTL, 256, 8 << 20)
+
+def search_city(location: str) -> str:
+    return location.split(',')[0].strip()
+
+class CityCards:
+    """
+    Our `page` of JOBS_PER_SOURCE distinct cards located in the searched
+    city. Listing pages are added in order (offsets 0, ROZEE_LISTING_PAGE_SIZE,
+    ...) until the page is complete, the listing ends or
+    ROZEE_MAX_LISTING_PAGES were read. Cards in other cities are never
+    returned, so a city without (more) jobs gives an empty page.
+    """
+
+    def __init__(self, location: str, page: int):
+        self.city = search_city(location).lower()
+        self.start = page * JOBS_PER_SOURCE
+        self.cards: Dict[str, Dict[str, Any]] = {}
+        self.offset = 0
+        self.done = False
+
+    def add(self, listing: List[Dict[str, Any]]):
+        """Cards of the listing page at self.offset; an empty listing is the end of the results"""
+        for card in listing:
+            if self.city in card["location"].lower():
+                self.cards.setdefault(card["apply_link"], card)
+        self.offset += ROZEE_LISTING_PAGE_SIZE
+        self.done = (not listing or len(self.cards) >= self.start + JOBS_PER_SOURCE
+                     or self.offset >= ROZEE_MAX_LISTING_PAGES * ROZEE_LISTING_PAGE_SIZE)
+
+    def page(self) -> List[Dict[str, Any]]:
+        return list(self.cards.values())[self.start:self.start + JOBS_PER_SOURCE]
+
+def build_job(card: Dict[str, Any], full_details: str, job_details: Dict[str, str],
+              apply_button_found: bool) -> Dict[str, Any]:
+    """Job record from the listing card fields and the detail view"""
+    job = {
+        "job_title": card["job_title"],
+        "company": card["company"],
+        "location": card["location"],
+        "salary": card["salary"],
+        "apply_link": card["apply_link"] or "N/A",
+        "apply_button_present": apply_button_found,
+        "source": "Rozee.pk",
+        "description_snippet": card["description_snippet"],
+        "full_details": full_details,
+    }
+    for field, label in DETAIL_FIELDS.items():
+        job[field] = job_details.get(label, "Not specified")
+
+    # Recover job nature and salary from the details without an LLM call
+    extracted = extract_job_fields(job)
+    job["jobNature"] = extracted.get("jobNature", "Not specified")
+    if job["salary"] == "Not Specified" and "salary" in extracted:
+        job["salary"] = extracted["salary"]
+    return job
+
+def listing_job(card: Dict[str, Any]) -> Dict[str, Any]:
+    """Job record from the listing card alone, marked for a later detail fetch"""
+    job = build_job(card, "", {}, False)
+    job["details_pending"] = True
+    return job
+
+def card_fields(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Listing card fields of a job record"""
+    return {field: job.get(field, "") for field in CARD_FIELDS}
+
+def _text(element) -> str:
+    return element.get_text(" ", strip=True) if element is not None else ""
+
+def split_company_location(parts: List[str], default_location: str) -> Tuple[str, str]:
+    company = parts[0].rstrip(',') if parts else "N/A"
+    location = " ".join(parts[1:]).lstrip(', ') if len(parts) > 1 else default_location
+    return company, location
+
+def parse_listing(html: str, base_url: str, default_location: str) -> List[Dict[str, Any]]:
+    """Listing card fields of every job on a search results page; none past the last page"""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    cards = soup.select(CARD_SELECTOR)
+    if not cards:
+        if soup.select_one(JOBS_CONTAINER_SELECTOR) is not None:
+            return []
+        raise RozeeParseError("no job cards on the listing page")
+
+    parsed = []
+    for card in cards:
+        title_elem = card.select_one(TITLE_SELECTOR)
+        link_elem = card.select_one(LINK_SELECTOR)
+        if title_elem is None or link_elem is None or not link_elem.get("href"):
+            continue
+        company_location = card.select_one(COMPANY_LOCATION_SELECTOR)
+        parts = [_text(a) for a in company_location.find_all("a")] if company_location is not None else []
+        company, location = split_company_location(parts, default_location)
+        salary = _text(card.select_one(CARD_SALARY_SELECTOR)) or "Not Specified"
+        parsed.append({
+            "job_title": title_elem.get("title") or _text(title_elem),
+            "apply_link": urljoin(base_url, link_elem["href"]),
+            "company": company,
+            "location": location,
+            "salary": salary,
+            "description_snippet": _text(card.select_one(SNIPPET_SELECTOR)),
+        })
+    if not parsed:
+        raise RozeeParseError("no job card had a title and link")
+    return parsed
+
+def _section_after(container, tag: str, heading: str):
+    """The div following the `tag` heading with exactly this text"""
+    for element in container.find_all(tag):
+        if element.get_text(strip=True) == heading:
+            return element.find_next_sibling("div")
+    return None
+
+def parse_detail(html: str) -> Tuple[str, Dict[str, str], bool, Optional[str]]:
+    """(full details text, labelled detail rows, apply button present, header salary) of a detail view"""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    container = soup.find(id=DETAIL_CONTAINER_ID)
+    if container is None:
+        raise RozeeParseError(f"no #{DETAIL_CONTAINER_ID} on the detail page")
+
+    full_details = ""
+    description = _section_after(container, "h3", "Job Description")
+    if description is not None:
+        full_details += "Job Description:\n" + description.get_text("\n", strip=True) + "\n\n"
+    skills = _section_after(container, "h4", "Job Skills")
+    if skills is not None:
+        full_details += "Job Skills:\n" + skills.get_text("\n", strip=True) + "\n\n"
+
+    job_details = {}
+    details_section = container.select_one(DETAILS_SELECTOR)
+    if details_section is not None:
+        for row in details_section.select(DETAIL_ROW_SELECTOR):
+            label_elem = row.select_one(DETAIL_LABEL_SELECTOR)
+            value_elem = row.select_one(DETAIL_VALUE_SELECTOR)
+            if label_elem is not None and value_elem is not None:
+                job_details[_text(label_elem).rstrip(':')] = _text(value_elem)
+
+    apply_button_found = soup.select_one(APPLY_BUTTON_SELECTOR) is not None
+    header_salary = _text(soup.select_one(HEADER_SALARY_SELECTOR)) or None
+    return full_details, job_details, apply_button_found, header_salary
@@ -0,0 +1,89 @@
+"""
+Second phase of two-phase scraping.
+
+With LAZY_DETAILS, sources return listing fields only and mark those jobs
+`details_pending`. Once a search has all its listings, they are scored with
+the first-stage scorer (no LLM calls), and only the top DETAIL_TOP_K jobs
+and any scoring at least DETAIL_MIN_SCORE get their descriptions and
+details fetched from the job board. Details are cached per posting.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from config import DETAIL_MIN_SCORE, DETAIL_TOP_K
+from fingerprint import normalize_url
+from job_sources.linkedin import fetch_linkedin_details
+from job_sources.rozee import fetch_rozee_details
+from relevance_analyzer import provisional_relevance_async
+
+logger = logging.getLogger(__name__)
+
+# Detail fetchers by the `source` of a job record
+DETAIL_FETCHERS = {
+    "LinkedIn": fetch_linkedin_details,
+    "Rozee.pk": fetch_rozee_details,
+}
+
+def _needs_details(job: Dict[str, Any]) -> bool:
+    if not job.get("details_pending") or job.get("source") not in DETAIL_FETCHERS:
+        return False
+    # A duplicate from another source may already have filled in the description
+    description = job.get("description") or job.get("full_details")
+    return not (isinstance(description, str) and description.strip() and description != "No description available")
+
+def _detail_key(job: Dict[str, Any]) -> str:
+    return f"details\x1f{normalize_url(job.get('apply_link'))}"
+
+def select_candidates(jobs: List[Dict[str, Any]], scores: List[Optional[float]]) -> List[int]:
+    """Indexes of the jobs in the top DETAIL_TOP_K by score or scoring at least DETAIL_MIN_SCORE"""
+    ranked = sorted(range(len(jobs)), key=lambda i: scores[i] or 0.0, reverse=True)
+    top = set(ranked[:DETAIL_TOP_K])
+    return [i for i in ranked if i in top or (scores[i] or 0.0) >= DETAIL_MIN_SCORE]
+
+async def fill_details(jobs: List[Dict[str, Any]], criteria, cache=None) -> Dict[str, int]:
+    """
+    Fetch details for the promising listing-only jobs, in place; jobs left
+    without details keep their listing fields. Returns counts for logging.
+    """
+    pending = [job for job in jobs if _needs_details(job)]
+    for job in jobs:
+        job.pop("details_pending", None)
+    if not pending:
+        return {"pending": 0, "fetched": 0, "cached": 0}
+
+    scores = await provisional_relevance_async(pending, criteria)
+    candidates = [pending[i] for i in select_candidates(pending, scores)]
+
+    to_fetch: Dict[str, List[Dict[str, Any]]] = {}
+    cached = 0
+    for job in candidates:
+        details = await cache.get_async(_detail_key(job)) if cache is not None else None
+        if details is not None:
+            job.update(details)
+            cached += 1
+        else:
+            to_fetch.setdefault(job["source"], []).append(job)
+
+    async def fetch(source: str, source_jobs: List[Dict[str, Any]]) -> int:
+        try:
+            results = await DETAIL_FETCHERS[source](source_jobs)
+        except Exception as e:
+            logger.error(f"Error fetching {source} details: {str(e)}")
+            return 0
+        fetched = 0
+        for job, details in zip(source_jobs, results):
+            if details is None:
+                continue
+            details = {key: value for key, value in details.items() if key not in ("source", "sources")}
+            job.update(details)
+            if cache is not None:
+                await cache.set_async(_detail_key(job), details)
+            fetched += 1
+        return fetched
+
+    counts = await asyncio.gather(*(fetch(source, source_jobs) for source, source_jobs in to_fetch.items()))
+    stats = {"pending": len(pending), "candidates": len(candidates), "fetched": sum(counts), "cached": cached}
+    logger.info(f"Details: {stats['candidates']} of {stats['pending']} listing-only jobs selected, "
+                f"{stats['cached']} cached, {stats['fetched']} fetched")
+    return stats
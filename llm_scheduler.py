@@ -0,0 +1,182 @@
+"""
+Shared scheduling for Gemini calls.
+
+Every LLM call in the process goes through one token bucket driven by
+GEMINI_API_LIMIT_PER_MINUTE, so concurrent searches share the quota instead
+of each assuming it has the whole budget. Async callers are additionally
+bounded by LLM_MAX_CONCURRENCY, and 429/quota errors are retried after the
+delay the API asks for.
+"""
+import asyncio
+import logging
+import random
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import google.generativeai as genai
+
+from config import (
+    GEMINI_API_LIMIT_PER_MINUTE,
+    GEMINI_MODEL,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_DELAY,
+)
+
+logger = logging.getLogger(__name__)
+
+class QuotaExceededError(Exception):
+    """Raised when Gemini keeps rejecting a call for quota reasons after all retries"""
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Callers reserve a token and are told how long
+    to wait before using it, so waiters are served in arrival order and the
+    same bucket works from both threads and coroutines.
+    """
+
+    def __init__(self, rate_per_minute: int, capacity: Optional[int] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity or rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _reserve(self) -> float:
+        """Take one token and return the number of seconds to wait before using it"""
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds`, e.g. after the API returned a retry-after"""
+        with self._lock:
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = max(self.updated, time.monotonic() + seconds)
+
+    async def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def _spare_wait(self, reserve: float) -> float:
+        """Seconds until more than `reserve` tokens are available; 0 if they are now"""
+        with self._lock:
+            self._refill()
+            missing = reserve + 1 - self.tokens
+            return missing / self.rate if missing > 0 else 0.0
+
+    async def wait_for_spare(self, reserve: float):
+        """
+        Wait until more than `reserve` tokens are available, without taking
+        one. Foreground callers take tokens as they come, so low-priority
+        work that waits here never holds up a request.
+        """
+        while True:
+            wait = self._spare_wait(reserve)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate_per_minute": round(self.rate * 60),
+                "available_tokens": round(self.tokens, 2),
+            }
+
+# Process-wide limiter shared by every request
+rate_limiter = TokenBucket(GEMINI_API_LIMIT_PER_MINUTE)
+
+# Blocking Gemini HTTP calls run here rather than on the default executor,
+# which the job sources use for scraping
+llm_executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="gemini")
+
+# asyncio.Semaphore is bound to the loop it is first used on
+_semaphores = weakref.WeakKeyDictionary()
+
+def _concurrency_limit() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+def is_quota_error(error: Exception) -> bool:
+    """True for 429 / resource exhausted responses from the Gemini API"""
+    if getattr(error, "code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "resource exhausted" in message or "resourceexhausted" in message
+
+def retry_after_seconds(error: Exception, attempt: int) -> float:
+    """
+    Delay before retrying a quota error: the retry delay reported by the API
+    when present, otherwise exponential backoff with jitter.
+    """
+    message = str(error)
+    match = (re.search(r"retry_delay\s*\{\s*seconds:\s*(\d+)", message)
+             or re.search(r"retry in ([\d.]+)\s*s", message, re.IGNORECASE)
+             or re.search(r"retry-after:?\s*([\d.]+)", message, re.IGNORECASE))
+    if match:
+        return float(match.group(1))
+    return LLM_RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, LLM_RETRY_BASE_DELAY)
+
+def _handle_quota_error(error: Exception, attempt: int):
+    if attempt >= LLM_MAX_RETRIES:
+        raise QuotaExceededError(f"Gemini quota exceeded after {attempt + 1} attempts: {error}") from error
+    delay = retry_after_seconds(error, attempt)
+    logger.warning(f"Gemini quota error, retrying in {delay:.1f}s (attempt {attempt + 1}/{LLM_MAX_RETRIES})")
+    rate_limiter.pause(delay)
+
+async def wait_for_spare_capacity(reserve: float):
+    """Wait until the shared quota has more than `reserve` calls to spare"""
+    await rate_limiter.wait_for_spare(reserve)
+
+def _generate_blocking(prompt: str) -> str:
+    model = genai.GenerativeModel(GEMINI_MODEL)
+    response = model.generate_content(prompt)
+    return response.text.strip()
+
+def generate_content_sync(prompt: str) -> str:
+    """Rate-limited blocking Gemini call returning the response text"""
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        rate_limiter.acquire_sync()
+        try:
+            return _generate_blocking(prompt)
+        except Exception as e:
+            if not is_quota_error(e):
+                raise
+            _handle_quota_error(e, attempt)
+
+async def generate_content(prompt: str) -> str:
+    """Rate-limited, concurrency-bounded Gemini call that does not block the event loop"""
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        await rate_limiter.acquire()
+        async with _concurrency_limit():
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(llm_executor, _generate_blocking, prompt)
+            except Exception as e:
+                if not is_quota_error(e):
+                    raise
+                error = e
+        _handle_quota_error(error, attempt)
@@ -0,0 +1,98 @@
+"""
+Offline relevance signal: hashed TF-IDF vectors with cosine similarity.
+
+Job title, skills and description are tokenized into hashed unigram and
+bigram features and stored as a CSR-style sparse matrix in NumPy arrays.
+The similarity of every job to the criteria vector is then a single sparse
+matrix-vector product. Nothing here needs the network or an API key.
+"""
+import re
+import zlib
+from typing import Any, Dict, List
+
+import numpy as np
+
+from config import LOCAL_FEATURE_BITS, LOCAL_SIMILARITY_SCALE
+
+N_FEATURES = 1 << LOCAL_FEATURE_BITS
+
+# Keeps tokens like c++, c#, node.js and .net together
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+# Title and skills say more about a job than the body of its description
+TITLE_REPEAT = 3
+SKILLS_REPEAT = 2
+
+def _hashed_features(text: str) -> np.ndarray:
+    """Hashed unigram and bigram feature ids of `text`"""
+    tokens = _TOKEN.findall(text.lower())
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) % N_FEATURES for gram in grams),
+                       dtype=np.int64, count=len(grams))
+
+def _job_text(job: Dict[str, Any]) -> str:
+    def text(key):
+        value = job.get(key)
+        return value if isinstance(value, str) else ""
+
+    skills = job.get("skills")
+    skills = ", ".join(skills) if isinstance(skills, list) else text("skills")
+    return " ".join(
+        [text("job_title")] * TITLE_REPEAT
+        + [skills] * SKILLS_REPEAT
+        + [text("description") or text("full_details") or text("description_snippet")]
+    )
+
+def _criteria_text(criteria) -> str:
+    return " ".join(
+        [criteria.position] * TITLE_REPEAT
+        + [criteria.skills] * SKILLS_REPEAT
+        + [criteria.experience, criteria.jobNature]
+    )
+
+def _sparse_rows(texts: List[str]):
+    """Term counts of each text as (row ids, feature ids, counts) arrays"""
+    rows, features, counts = [], [], []
+    for row, text in enumerate(texts):
+        ids, tf = np.unique(_hashed_features(text), return_counts=True)
+        rows.append(np.full(len(ids), row, dtype=np.int64))
+        features.append(ids)
+        counts.append(tf)
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    return np.concatenate(rows), np.concatenate(features), np.concatenate(counts)
+
+def similarity_scores(jobs: List[Dict[str, Any]], criteria, batch_idf: bool = True) -> np.ndarray:
+    """
+    Cosine similarity between each job's TF-IDF vector and the criteria
+    vector. Without batch_idf the vectors are plain sublinear TF, so a job's
+    similarity does not depend on the other jobs it is scored with.
+    """
+    n = len(jobs)
+    if not n:
+        return np.zeros(0)
+
+    rows, features, counts = _sparse_rows([_job_text(job) for job in jobs])
+    query_ids, query_counts = np.unique(_hashed_features(_criteria_text(criteria)), return_counts=True)
+
+    # Smoothed IDF over the jobs being ranked
+    if batch_idf:
+        document_frequency = np.bincount(features, minlength=N_FEATURES)
+        idf = np.log((1 + n) / (1 + document_frequency)) + 1.0
+    else:
+        idf = np.ones(N_FEATURES)
+
+    # Sublinear TF-IDF weights
+    weights = (1.0 + np.log(counts)) * idf[features]
+    query = np.zeros(N_FEATURES)
+    query[query_ids] = (1.0 + np.log(query_counts)) * idf[query_ids]
+
+    dots = np.bincount(rows, weights=weights * query[features], minlength=n)
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n)) * np.linalg.norm(query)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(norms > 0, dots / norms, 0.0)
+
+def local_scores(jobs: List[Dict[str, Any]], criteria) -> np.ndarray:
+    """Similarity rescaled to the 0-1 range of the other relevance scores"""
+    return np.minimum(1.0, similarity_scores(jobs, criteria) * LOCAL_SIMILARITY_SCALE)
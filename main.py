@@ -1,7 +1,8 @@
 # main.py
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any, Literal, Callable
 import uvicorn
 import os
 import json
@@ -9,12 +10,30 @@ import time
 from datetime import datetime
 import asyncio
 import logging
-from config import CACHE_EXPIRY, MAX_JOBS_PER_SOURCE
+from config import (
+    CACHE_EXPIRY, SOURCE_CACHE_TTL, MAX_JOBS_PER_SOURCE, DISTILL_REFIT_INTERVAL, DISTILL_MIN_NEW_SAMPLES,
+    JOB_CACHE_MAX_ENTRIES, JOB_CACHE_MAX_BYTES, SOURCE_CACHE_MAX_ENTRIES, SOURCE_CACHE_MAX_BYTES,
+    CACHE_COMPRESS, CACHE_SWEEP_INTERVAL, CACHE_STALE_GRACE, CACHE_STALE_IF_ERROR,
+    REFRESH_WORKERS, REFRESH_JITTER, REFRESH_QUEUE_MAX, DRIVER_WATCHDOG_INTERVAL
+)
 # Import job source modules
 from job_sources.indeed import fetch_indeed_jobs
-from job_sources.rozee import fetch_rozee_jobs
+from job_sources.rozee import fetch_rozee_jobs, driver_pool
+from job_sources.rozee_http import close_client as close_rozee_client
 from job_sources.linkedin import fetch_linkedin_jobs
-from relevance_analyzer import analyze_job_relevance
+from relevance_analyzer import (
+    analyze_job_relevance_async, analysis_executor, job_id, enricher, RELEVANCE_THRESHOLD
+)
+from score_cache import score_cache
+import distill
+from dedup import dedupe_jobs
+from lazy_details import fill_details
+from adaptive_fetch import fetch_pages
+from fingerprint import search_key, source_query_key
+from singleflight import SingleFlight
+from bounded_cache import sweep_periodically
+from cache_backends import cache_executor, create_cache
+from refresh_scheduler import RefreshScheduler
 
 # Configure logging
 logging.basicConfig(
@@ -33,6 +52,30 @@ app = FastAPI(
     version="1.0.0"
 )
 
+@app.on_event("startup")
+async def start_distillation():
+    """Refit the distilled relevance model as new LLM scores are logged"""
+    app.state.distill_task = asyncio.create_task(
+        distill.refit_periodically(DISTILL_REFIT_INTERVAL, DISTILL_MIN_NEW_SAMPLES)
+    )
+
+@app.on_event("startup")
+async def start_cache_sweeper():
+    """A single task that drops expired entries from the caches"""
+    app.state.cache_sweeper = asyncio.create_task(sweep_periodically([job_cache, source_cache], CACHE_SWEEP_INTERVAL))
+    refresher.start()
+
+@app.on_event("startup")
+async def start_driver_pool():
+    """Start the Rozee browser pool's watchdog, which warms it up when Selenium is the scraper"""
+    driver_pool.start(DRIVER_WATCHDOG_INTERVAL)
+
+@app.on_event("shutdown")
+async def close_rozee_scrapers():
+    """Quit the pooled browsers and close the Rozee HTTP connections"""
+    driver_pool.close()
+    await close_rozee_client()
+
 class JobSearchCriteria(BaseModel):
     position: str
     experience: str
@@ -40,6 +83,11 @@ class JobSearchCriteria(BaseModel):
     jobNature: str
     location: str
     skills: str
+    max_llm_calls: Optional[int] = Field(None, ge=0)  # Per-request budget of LLM scoring calls
+    llm_top_k: Optional[int] = Field(None, ge=0)  # Number of top basic-scored jobs sent to the LLM
+    scorer: Optional[Literal["llm", "local", "hybrid"]] = None  # Relevance scorer backend (default from config)
+    target_results: Optional[int] = Field(None, ge=1)  # Relevant-looking jobs to collect before pagination stops
+    max_pages: Optional[int] = Field(None, ge=1)  # Pages fetched per source at most
 
 class JobListing(BaseModel):
     job_title: str
@@ -50,119 +98,265 @@ class JobListing(BaseModel):
     salary: str
     apply_link: str
     relevance_score: Optional[float] = None
+    sources: Optional[List[str]] = None  # Every source the posting was found on
 
 class JobSearchResponse(BaseModel):
     relevant_jobs: List[JobListing]
     total_jobs_found: int
     search_timestamp: str
+    llm_calls_used: int = 0
+    duplicates_removed: int = 0
+    stale: bool = False  # Served from an expired cache entry
+
+# Cache of scored search responses, keyed by the full normalized criteria
+job_cache = create_cache("job", CACHE_EXPIRY, JOB_CACHE_MAX_ENTRIES, JOB_CACHE_MAX_BYTES, CACHE_COMPRESS,
+                         grace=max(CACHE_STALE_GRACE, CACHE_STALE_IF_ERROR), model=JobSearchResponse)
+
+# Background refreshes of stale search results
+refresher = RefreshScheduler(REFRESH_WORKERS, REFRESH_JITTER, REFRESH_QUEUE_MAX)
+
+# Cache of raw per-source results, keyed by what the scrapers search with
+source_cache = create_cache("source", CACHE_EXPIRY, SOURCE_CACHE_MAX_ENTRIES, SOURCE_CACHE_MAX_BYTES, CACHE_COMPRESS)
+
+# Job sources, fetched concurrently for every search, one page of JOBS_PER_SOURCE jobs at a time
+JOB_SOURCES = {
+    "Indeed": fetch_indeed_jobs,
+    "Rozee": fetch_rozee_jobs,
+    "LinkedIn": fetch_linkedin_jobs,
+}
+
+# Coalesce concurrent identical searches and identical source scrapes
+search_flight = SingleFlight()
+source_flight = SingleFlight()
 
-# In-memory cache for job search results
-job_cache = {}
+LISTING_FIELDS = ("job_title", "company", "experience", "jobNature", "location", "salary", "apply_link")
+
+async def _scrape_source(source: str, criteria: JobSearchCriteria, page: int, cache_key: str) -> List[Dict[str, Any]]:
+    jobs = await JOB_SOURCES[source](criteria, page)
+    # Empty results are usually a failed scrape, so they are not cached
+    if jobs:
+        await source_cache.set_async(cache_key, jobs, ttl=SOURCE_CACHE_TTL.get(source, CACHE_EXPIRY))
+    return jobs
+
+async def _fetch_source(source: str, criteria: JobSearchCriteria, page: int = 0) -> List[Dict[str, Any]]:
+    """Raw results of one source page, from the source cache when fresh"""
+    cache_key = source_query_key(source, criteria, page)
+    jobs = await source_cache.get_async(cache_key)
+    if jobs is not None:
+        logger.info(f"Using cached {source} results (page {page + 1})")
+        return jobs
+    jobs, _ = await source_flight.do(cache_key, lambda: _scrape_source(source, criteria, page, cache_key))
+    # Copies, so that scoring never modifies records shared with other waiters
+    return [dict(job) for job in jobs]
+
+async def _run_search(criteria: JobSearchCriteria, cache_key: str,
+                      on_page: Optional[Callable[..., None]] = None) -> JobSearchResponse:
+    """
+    Fetch, merge and score jobs for a search and cache the response.
+    `on_page` is called with each (source, page, jobs or exception,
+    provisional scores) as it arrives.
+    """
+    # Start job search process
+    logger.info(f"Starting job search for position: {criteria.position} in {criteria.location}")
+    
+    # Fetch pages from the sources concurrently until enough jobs look relevant
+    all_jobs = []
+    async for source, page, jobs, scores in fetch_pages(_fetch_source, list(JOB_SOURCES), criteria):
+        if on_page is not None:
+            on_page(source, page, jobs, scores)
+        # Handle potential errors from job sources
+        if not isinstance(jobs, Exception):
+            logger.info(f"Successfully fetched {len(jobs)} jobs from {source} (page {page + 1})")
+            all_jobs.extend(jobs)
+        else:
+            logger.error(f"Error fetching {source} jobs: {str(jobs)}")
+    
+    if not all_jobs:
+        logger.warning("No jobs found matching criteria")
+        raise HTTPException(status_code=404, detail="No jobs found matching your criteria")
+    
+    # Merge postings found on more than one source before they are scored
+    loop = asyncio.get_running_loop()
+    all_jobs, duplicates_removed = await loop.run_in_executor(analysis_executor, dedupe_jobs, all_jobs)
+    logger.info(f"Removed {duplicates_removed} duplicate jobs")
+    
+    # Descriptions and details only for the jobs that look promising on their listing fields
+    await fill_details(all_jobs, criteria, source_cache)
+    
+    # Analyze job relevance
+    logger.info(f"Analyzing relevance for {len(all_jobs)} jobs")
+    analysis_stats = {}
+    relevant_jobs = await analyze_job_relevance_async(all_jobs, criteria, analysis_stats)
+    
+    # Sort by relevance score (descending)
+    relevant_jobs = sorted(relevant_jobs, key=lambda x: x.get('relevance_score', 0), reverse=True)
+    
+    # Create response
+    response = JobSearchResponse(
+        relevant_jobs=relevant_jobs,
+        total_jobs_found=len(relevant_jobs),
+        search_timestamp=datetime.now().isoformat(),
+        llm_calls_used=analysis_stats.get("llm_calls", 0),
+        duplicates_removed=duplicates_removed
+    )
+    
+    # Cache the results
+    await job_cache.set_async(cache_key, response)
+    return response
 
 @app.post("/search-jobs", response_model=JobSearchResponse)
-async def search_jobs(criteria: JobSearchCriteria, background_tasks: BackgroundTasks):
+async def search_jobs(criteria: JobSearchCriteria):
     """
     Search for jobs based on the provided criteria across Indeed, Rozee.pk, and LinkedIn
     """
+    # Create a cache key based on search criteria
+    cache_key = search_key(criteria)
     try:
-        # Create a cache key based on search criteria
-        cache_key = f"{criteria.position}_{criteria.location}_{criteria.jobNature}"
-        
-        # Check cache
-        current_time = time.time()
-        if cache_key in job_cache and (current_time - job_cache[cache_key]['timestamp']) < CACHE_EXPIRY:
-            logger.info(f"Returning cached results for {cache_key}")
-            return job_cache[cache_key]['response']
-        
-        # Start job search process
-        logger.info(f"Starting job search for position: {criteria.position} in {criteria.location}")
-        
-        # Fetch jobs from different sources concurrently
-        indeed_task = fetch_indeed_jobs(criteria)
-        rozee_task = fetch_rozee_jobs(criteria)
-        linkedin_task = fetch_linkedin_jobs(criteria)
-        
-        # Wait for all tasks to complete
-        indeed_jobs, rozee_jobs, linkedin_jobs = await asyncio.gather(
-            indeed_task, 
-            rozee_task,
-            linkedin_task,
-            return_exceptions=True
-        )
-        
-        # Handle potential errors from job sources
-        all_jobs = []
-        if not isinstance(indeed_jobs, Exception):
-            logger.info(f"Successfully fetched {len(indeed_jobs)} jobs from Indeed")
-            all_jobs.extend(indeed_jobs)
-        else:
-            logger.error(f"Error fetching Indeed jobs: {str(indeed_jobs)}")
-            
-        if not isinstance(rozee_jobs, Exception):
-            logger.info(f"Successfully fetched {len(rozee_jobs)} jobs from Rozee")
-            all_jobs.extend(rozee_jobs)
-        else:
-            logger.error(f"Error fetching Rozee jobs: {str(rozee_jobs)}")
-            
-        if not isinstance(linkedin_jobs, Exception):
-            logger.info(f"Successfully fetched {len(linkedin_jobs)} jobs from LinkedIn")
-            all_jobs.extend(linkedin_jobs)
-        else:
-            logger.error(f"Error fetching LinkedIn jobs: {str(linkedin_jobs)}")
-            
-        if not all_jobs:
-            logger.warning("No jobs found matching criteria")
-            raise HTTPException(status_code=404, detail="No jobs found matching your criteria")
+        # Check cache; expired results within the grace window are served while one refresh runs
+        cached = await job_cache.get_entry_async(cache_key, max_stale=CACHE_STALE_GRACE)
+        if cached is not None:
+            response, stale = cached
+            if stale:
+                refresher.schedule(
+                    cache_key, lambda: search_flight.do(cache_key, lambda: _run_search(criteria, cache_key))
+                )
+                logger.info(f"Returning stale results for {cache_key}, refresh queued")
+            else:
+                logger.info(f"Returning cached results for {cache_key}")
+            return response.model_copy(update={"llm_calls_used": 0, "stale": stale})
         
-        # Analyze job relevance
-        logger.info(f"Analyzing relevance for {len(all_jobs)} jobs")
-        relevant_jobs = analyze_job_relevance(all_jobs, criteria)
-        
-        # Sort by relevance score (descending)
-        relevant_jobs = sorted(relevant_jobs, key=lambda x: x.get('relevance_score', 0), reverse=True)
-        
-        # Create response
-        response = JobSearchResponse(
-            relevant_jobs=relevant_jobs,
-            total_jobs_found=len(relevant_jobs),
-            search_timestamp=datetime.now().isoformat()
+        # Identical searches already in flight share one computation
+        response, shared = await search_flight.do(
+            cache_key, lambda: _run_search(criteria, cache_key)
         )
+        if shared:
+            logger.info(f"Returning coalesced results for {cache_key}")
+            return response.model_copy(update={"llm_calls_used": 0})
         
-        # Cache the results
-        job_cache[cache_key] = {
-            'response': response,
-            'timestamp': current_time
-        }
-        
-        # Start background task to refresh cache
-        background_tasks.add_task(refresh_job_cache, criteria)
-        
-        logger.info(f"Successfully completed job search. Found {len(relevant_jobs)} relevant jobs")
+        logger.info(f"Successfully completed job search. Found {len(response.relevant_jobs)} relevant jobs")
         return response
         
     except Exception as e:
         logger.error(f"Error in job search: {str(e)}")
+        # Stale results beat an error, e.g. when every source failed
+        cached = await job_cache.get_entry_async(cache_key)
+        if cached is not None:
+            logger.warning(f"Returning stale results for {cache_key} after the search failed")
+            return cached[0].model_copy(update={"llm_calls_used": 0, "stale": cached[1]})
+        if isinstance(e, HTTPException):
+            raise
         raise HTTPException(status_code=500, detail=f"Error searching for jobs: {str(e)}")
 
-async def refresh_job_cache(criteria: JobSearchCriteria):
-    """Background task to refresh job cache periodically"""
+def _format_event(event: str, data: Dict[str, Any], stream_format: str) -> str:
+    """One NDJSON line or Server-Sent Event"""
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    return json.dumps({"event": event, "data": data}, default=str) + "\n"
+
+def _provisional_listing(job: Dict[str, Any], score: float) -> Dict[str, Any]:
+    listing = {field: job.get(field) if isinstance(job.get(field), str) else "" for field in LISTING_FIELDS}
+    listing.update(job_id=job_id(job), source=job.get("source"), relevance_score=round(score, 2), provisional=True)
+    return listing
+
+def _final_events(response: JobSearchResponse, emitted: set, stream_format: str):
+    """`update` for every final listing, `remove` for provisional jobs that did not make it, then `summary`"""
+    final_ids = set()
+    for listing in response.relevant_jobs:
+        job = listing.model_dump()
+        final_ids.add(job_id(job))
+        yield _format_event("update", {"job_id": job_id(job), **job, "provisional": False}, stream_format)
+    for removed in emitted - final_ids:
+        yield _format_event("remove", {"job_id": removed}, stream_format)
+    yield _format_event("summary", response.model_dump(), stream_format)
+
+async def _stream_search(criteria: JobSearchCriteria, stream_format: str):
+    """
+    Search events in order: a provisional `job` for each relevant-looking
+    posting as soon as its source returns, then `update` (LLM-refined score)
+    or `remove` events once all sources are in, and a final `summary`
+    """
+    search = None
     try:
-        await asyncio.sleep(CACHE_EXPIRY)
-        cache_key = f"{criteria.position}_{criteria.location}_{criteria.jobNature}"
-        if cache_key in job_cache:
-            del job_cache[cache_key]
-            logger.info(f"Cache cleared for {cache_key}")
+        cache_key = search_key(criteria)
+        cached = await job_cache.get_async(cache_key)
+        if cached is not None:
+            logger.info(f"Streaming cached results for {cache_key}")
+            for event in _final_events(cached.model_copy(update={"llm_calls_used": 0}), set(), stream_format):
+                yield event
+            return
+        
+        # Identical searches in flight, streamed or not, share one computation. The
+        # stream that starts it gets each page as it arrives; the ones that join it
+        # only get the final events.
+        logger.info(f"Starting streaming job search for position: {criteria.position} in {criteria.location}")
+        pages = asyncio.Queue()
+        search = asyncio.ensure_future(
+            search_flight.do(cache_key, lambda: _run_search(criteria, cache_key, lambda *page: pages.put_nowait(page)))
+        )
+        search.add_done_callback(lambda _: pages.put_nowait(None))
+        emitted = set()
+        while (page := await pages.get()) is not None:
+            source, _, jobs, scores = page
+            if isinstance(jobs, Exception):
+                yield _format_event("source_error", {"source": source, "detail": str(jobs)}, stream_format)
+                continue
+            for job, score in zip(jobs, scores):
+                if score is not None and score >= RELEVANCE_THRESHOLD and job_id(job) not in emitted:
+                    listing = _provisional_listing(job, score)
+                    emitted.add(listing["job_id"])
+                    yield _format_event("job", listing, stream_format)
+        
+        response, shared = await search
+        if shared:
+            logger.info(f"Streaming coalesced results for {cache_key}")
+            response = response.model_copy(update={"llm_calls_used": 0})
+        else:
+            logger.info(f"Completed streaming job search. Found {len(response.relevant_jobs)} relevant jobs")
+        for event in _final_events(response, emitted, stream_format):
+            yield event
+    
+    except HTTPException as e:
+        yield _format_event("error", {"detail": e.detail}, stream_format)
     except Exception as e:
-        logger.error(f"Error in cache refresh: {str(e)}")
+        logger.error(f"Error in streaming job search: {str(e)}")
+        yield _format_event("error", {"detail": f"Error searching for jobs: {str(e)}"}, stream_format)
+    finally:
+        # A client that went away stops waiting; the shared search still completes and is cached.
+        # A failure it already saw is marked retrieved (SingleFlight logs it once).
+        if search is not None and not search.cancel() and not search.cancelled():
+            search.exception()
+
+@app.post("/search-jobs/stream")
+async def search_jobs_stream(criteria: JobSearchCriteria,
+                             stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format")):
+    """
+    Streaming variant of /search-jobs: jobs are emitted as each source
+    finishes, as NDJSON lines or Server-Sent Events
+    """
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(_stream_search(criteria, stream_format), media_type=media_type,
+                             headers={"Cache-Control": "no-cache"})
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     logger.info("Health check requested")
+    loop = asyncio.get_running_loop()
+    job_stats, source_stats, score_stats = await asyncio.gather(
+        job_cache.stats_async(), source_cache.stats_async(), loop.run_in_executor(cache_executor, score_cache.stats)
+    )
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "cache_size": len(job_cache)
+        "cache_size": job_stats["size"],
+        "job_cache": job_stats,
+        "source_cache": source_stats,
+        "llm_score_cache": score_stats,
+        "rozee_driver_pool": driver_pool.stats(),
+        "enrichment": enricher.stats(),
+        "distilled_model": distill.stats(),
+        "search_coalescing": search_flight.stats(),
+        "cache_refresh": refresher.stats()
     }
 
 if __name__ == "__main__":
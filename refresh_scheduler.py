@@ -0,0 +1,76 @@
+"""
+Background refreshes for stale cache entries.
+
+A refresh is queued at most once per key until it has run. A fixed number
+of workers drain the queue, each waiting a random jitter before starting,
+so many keys expiring together do not all scrape at the same moment.
+"""
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+class RefreshScheduler:
+    def __init__(self, workers: int, jitter: float, max_queue: int):
+        self.workers = workers
+        self.jitter = jitter
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._keys: Set[Hashable] = set()
+        self._tasks = []
+        self.scheduled = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the workers; must be called from the running event loop"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def schedule(self, key: Hashable, refresh: Callable[[], Awaitable[object]]) -> bool:
+        """Queue a refresh for `key` unless one is already pending; returns whether it was queued"""
+        self.start()
+        if key in self._keys:
+            self.deduplicated += 1
+            return False
+        try:
+            self._queue.put_nowait((key, refresh))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Refresh queue full, not refreshing {key}")
+            return False
+        self._keys.add(key)
+        self.scheduled += 1
+        return True
+
+    async def _worker(self):
+        while True:
+            key, refresh = await self._queue.get()
+            try:
+                await asyncio.sleep(random.uniform(0, self.jitter))
+                await refresh()
+                self.completed += 1
+                logger.info(f"Refreshed cache entry {key}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Error refreshing cache entry {key}: {str(e)}")
+            finally:
+                self._keys.discard(key)
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._keys),
+            "scheduled": self.scheduled,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
@@ -1,9 +1,25 @@
 import google.generativeai as genai
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import os
+import asyncio
+import re
 import json
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    LLM_BATCH_SCORING, LLM_BATCH_SIZE, LLM_BATCH_TOKEN_BUDGET, GEMINI_MODEL, ANALYSIS_EXECUTOR_WORKERS,
+    LLM_TOP_K, LLM_UNCERTAINTY_BAND, MAX_LLM_CALLS_PER_REQUEST, DEFAULT_SCORER, LOCAL_SCORE_WEIGHT,
+    ENRICHMENT_BACKGROUND_RESERVE
+)
+from llm_scheduler import generate_content, generate_content_sync, wait_for_spare_capacity, QuotaExceededError
+from fingerprint import job_fingerprint, criteria_hash
+from score_cache import score_cache
+from basic_scorer import score_jobs
+from local_scorer import local_scores
+from distill import pair_features, confident_scores, log_samples
+from enrichment import ENRICHABLE_FIELDS, JobEnricher, enrichment_store, resolve_fields
 
 # Load environment variables
 load_dotenv()
@@ -14,6 +30,13 @@ genai.configure(api_key=GEMINI_API_KEY)
 
 logger = logging.getLogger(__name__)
 
+# Jobs scoring below this are dropped from the results
+RELEVANCE_THRESHOLD = 0.3  # Lowered threshold to include more jobs
+
+# Dedicated, bounded pool for the synchronous parts of relevance analysis so
+# they neither block the event loop nor compete with scrapers for the default executor
+analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_EXECUTOR_WORKERS, thread_name_prefix="relevance")
+
 def test_gemini_api():
     """
     Test if Gemini API is working correctly
@@ -30,7 +53,7 @@ def test_gemini_api():
         test_prompt = "What is 2+2? Answer with just the number."
         
         # Initialize the model with the correct name
-        model = genai.GenerativeModel("gemini-2.0-flash")
+        model = genai.GenerativeModel(GEMINI_MODEL)
         
         # Make a test API call
         response = model.generate_content(test_prompt)
@@ -46,64 +69,300 @@ def test_gemini_api():
         if "API key" in error_msg.lower():
             return False, "Invalid or missing API key. Please check your GEMINI_API_KEY in .env file"
         elif "model" in error_msg.lower():
-            return False, "Model configuration error. Please check if 'gemini-2.0-flash' is available"
+            return False, f"Model configuration error. Please check if '{GEMINI_MODEL}' is available"
         else:
             return False, f"Error testing Gemini API: {error_msg}"
 
-def analyze_job_relevance(jobs: List[Dict[str, Any]], criteria):
+def _basic_scores(jobs: List[Dict[str, Any]], criteria) -> List[Optional[float]]:
+    """Basic relevance for every job, scored in one columnar pass"""
+    try:
+        return [float(score) for score in score_jobs(jobs, criteria)]
+    except Exception as e:
+        logger.error(f"Columnar basic scoring failed, scoring jobs one by one: {str(e)}")
+        return _basic_scores_per_job(jobs, criteria)
+
+def _basic_scores_per_job(jobs: List[Dict[str, Any]], criteria) -> List[Optional[float]]:
+    """Basic relevance for every job; None for jobs that could not be scored"""
+    # Create user skills set for easier comparison
+    user_skills = set(skill.strip().lower() for skill in criteria.skills.split(','))
+    
+    basic_scores = []
+    for job in jobs:
+        try:
+            relevance_score = calculate_basic_relevance(job, criteria, user_skills)
+            logger.debug(f"Basic relevance score for {job.get('job_title', 'Unknown')}: {relevance_score}")
+            basic_scores.append(relevance_score)
+        except Exception as e:
+            logger.error(f"Error analyzing job {job.get('job_title', 'Unknown')}: {str(e)}")
+            basic_scores.append(None)
+    return basic_scores
+
+def _scorer(criteria) -> str:
+    """Scorer backend for a request: llm, local or hybrid"""
+    return (getattr(criteria, "scorer", None) or DEFAULT_SCORER).lower()
+
+def _first_stage_scores(jobs: List[Dict[str, Any]], criteria) -> List[Optional[float]]:
+    """
+    Scores the cascade ranks jobs by. The llm scorer uses the basic keyword
+    score alone; the local and hybrid scorers blend it with the offline
+    TF-IDF similarity to the criteria.
+    """
+    basic_scores = _basic_scores(jobs, criteria)
+    if _scorer(criteria) == "llm":
+        return basic_scores
+    try:
+        similarities = local_scores(jobs, criteria)
+    except Exception as e:
+        logger.error(f"Local scoring failed, using basic scores: {str(e)}")
+        return basic_scores
+    return [
+        None if basic is None else basic * (1 - LOCAL_SCORE_WEIGHT) + float(similarity) * LOCAL_SCORE_WEIGHT
+        for basic, similarity in zip(basic_scores, similarities)
+    ]
+
+class LLMBudget:
+    """Per-request cap on Gemini scoring calls; a batched call counts once"""
+
+    def __init__(self, max_calls: Optional[int]):
+        self.max_calls = max_calls
+        self.used = 0
+
+    def try_spend(self) -> bool:
+        if self.max_calls is not None and self.used >= self.max_calls:
+            return False
+        self.used += 1
+        return True
+
+def _llm_budget(criteria) -> LLMBudget:
+    max_calls = getattr(criteria, "max_llm_calls", None)
+    return LLMBudget(max_calls if max_calls is not None else MAX_LLM_CALLS_PER_REQUEST)
+
+def _llm_candidates(basic_scores: List[Optional[float]], criteria) -> List[int]:
+    """
+    Scoring cascade: indices of the jobs that get a deeper LLM analysis, in
+    priority order; none for the local scorer. These are the top-K jobs by
+    basic score that pass the relevance threshold, followed by jobs in the
+    uncertainty band around the threshold, closest first. Everything else
+    keeps its basic score.
+    """
+    if _scorer(criteria) == "local":
+        return []
+    top_k = getattr(criteria, "llm_top_k", None)
+    if top_k is None:
+        top_k = LLM_TOP_K
+    scored = [(i, score) for i, score in enumerate(basic_scores) if score is not None]
+    ranked = sorted((item for item in scored if item[1] >= RELEVANCE_THRESHOLD), key=lambda item: item[1], reverse=True)
+    top = [i for i, _ in ranked[:top_k]]
+    chosen = set(top)
+    band = sorted(
+        (item for item in scored
+         if item[0] not in chosen and abs(item[1] - RELEVANCE_THRESHOLD) <= LLM_UNCERTAINTY_BAND),
+        key=lambda item: abs(item[1] - RELEVANCE_THRESHOLD)
+    )
+    return top + [i for i, _ in band]
+
+async def _run_in_analysis_executor(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(analysis_executor, func, *args)
+
+async def _no_score():
+    return None
+
+def _cached_llm_scores(candidate_jobs: List[Dict[str, Any]], criteria):
+    """Cache keys for the candidates and their cached LLM scores (None on a miss)"""
+    criteria_key = criteria_hash(criteria)
+    keys = [(job_fingerprint(job), criteria_key) for job in candidate_jobs]
+    cached = score_cache.get_many(keys)
+    return keys, [cached.get(key) for key in keys]
+
+def _distill_pending(jobs: List[Dict[str, Any]], candidates: List[int], pending: List[int],
+                     scores: List[Optional[float]], criteria):
+    """
+    Score the pending candidates the distilled model is confident about in
+    place. Returns the candidates still pending and their feature rows.
+    """
+    try:
+        features = pair_features([jobs[candidates[n]] for n in pending], criteria)
+    except Exception as e:
+        logger.error(f"Error computing distillation features: {str(e)}")
+        return pending, None
+    distilled = confident_scores(features)
+    for row, score in distilled.items():
+        scores[pending[row]] = score
+    remaining = [row for row in range(len(pending)) if row not in distilled]
+    return [pending[row] for row in remaining], features[remaining]
+
+def _store_llm_scores(keys, features, scores):
+    """Cache fresh LLM scores and log them as distillation samples"""
+    score_cache.put_many({key: score for key, score in zip(keys, scores) if score is not None})
+    if features is not None:
+        log_samples(keys, features, scores)
+
+def _score_candidates(jobs: List[Dict[str, Any]], candidates: List[int], criteria,
+                      budget: LLMBudget) -> Dict[int, Optional[float]]:
+    """
+    LLM scores for the candidate jobs, served from the score cache or the
+    distilled model where possible. Candidates beyond the request's call
+    budget get None.
+    """
+    keys, scores = _cached_llm_scores([jobs[i] for i in candidates], criteria)
+    pending = [n for n, score in enumerate(scores) if score is None]
+    cached = len(candidates) - len(pending)
+    features = None
+    if pending:
+        pending, features = _distill_pending(jobs, candidates, pending, scores, criteria)
+    logger.info(f"LLM scores: {cached} cached, {len(candidates) - cached - len(pending)} distilled, "
+                f"{len(pending)} to request")
+    
+    if pending:
+        pending_jobs = [jobs[candidates[n]] for n in pending]
+        if LLM_BATCH_SCORING:
+            fresh_scores = analyze_batch_with_llm(pending_jobs, criteria, budget)
+        else:
+            fresh_scores = [analyze_with_llm(job, criteria) if budget.try_spend() else None for job in pending_jobs]
+        _store_llm_scores([keys[n] for n in pending], features, fresh_scores)
+        for n, score in zip(pending, fresh_scores):
+            scores[n] = score
+    return dict(zip(candidates, scores))
+
+async def _score_candidates_async(jobs: List[Dict[str, Any]], candidates: List[int], criteria,
+                                  budget: LLMBudget) -> Dict[int, Optional[float]]:
+    """Async variant of _score_candidates"""
+    keys, scores = await _run_in_analysis_executor(_cached_llm_scores, [jobs[i] for i in candidates], criteria)
+    pending = [n for n, score in enumerate(scores) if score is None]
+    cached = len(candidates) - len(pending)
+    features = None
+    if pending:
+        pending, features = await _run_in_analysis_executor(
+            _distill_pending, jobs, candidates, pending, scores, criteria
+        )
+    logger.info(f"LLM scores: {cached} cached, {len(candidates) - cached - len(pending)} distilled, "
+                f"{len(pending)} to request")
+    
+    if pending:
+        pending_jobs = [jobs[candidates[n]] for n in pending]
+        if LLM_BATCH_SCORING:
+            fresh_scores = await analyze_batch_with_llm_async(pending_jobs, criteria, budget)
+        else:
+            allowed = [budget.try_spend() for _ in pending_jobs]
+            fresh_scores = await asyncio.gather(*(
+                analyze_with_llm_async(job, criteria) if spend else _no_score()
+                for job, spend in zip(pending_jobs, allowed)
+            ))
+        await _run_in_analysis_executor(_store_llm_scores, [keys[n] for n in pending], features, fresh_scores)
+        for n, score in zip(pending, fresh_scores):
+            scores[n] = score
+    return dict(zip(candidates, scores))
+
+def _combine_scores(jobs: List[Dict[str, Any]], basic_scores: List[Optional[float]],
+                    llm_by_index: Dict[int, Optional[float]]) -> List[Dict[str, Any]]:
+    """
+    Combine basic and LLM scores, set `relevance_score` on each job and return
+    the jobs that pass the relevance threshold
+    """
+    relevant = []
+    for index, job in enumerate(jobs):
+        relevance_score = basic_scores[index]
+        if relevance_score is None:
+            continue
+        llm_relevance = llm_by_index.get(index)
+        if llm_relevance is not None:
+            logger.debug(f"LLM relevance score for {job.get('job_title', 'Unknown')}: {llm_relevance}")
+            # Combine basic and LLM relevance scores with more weight on LLM analysis
+            final_relevance = (relevance_score * 0.3) + (llm_relevance * 0.7)
+        else:
+            final_relevance = relevance_score
+        
+        # Add relevance score to job
+        job["relevance_score"] = round(final_relevance, 2)
+        logger.debug(f"Final relevance score for {job.get('job_title', 'Unknown')}: {final_relevance}")
+        
+        # Filter out jobs with very low relevance
+        if final_relevance >= RELEVANCE_THRESHOLD:
+            relevant.append(job)
+        else:
+            logger.debug(f"Job {job.get('job_title', 'Unknown')} filtered out due to low relevance")
+    return relevant
+
+def _record_stats(stats: Optional[Dict[str, Any]], candidates: List[int], budget: LLMBudget):
+    if stats is not None:
+        stats["llm_candidates"] = len(candidates)
+        stats["llm_calls"] = budget.used
+
+def analyze_job_relevance(jobs: List[Dict[str, Any]], criteria, stats: Optional[Dict[str, Any]] = None):
     """
     Analyze job listings for relevance to the user's criteria using LLM
+    If `stats` is given it receives the number of LLM candidates and calls spent
     """
-    print(f"Analyzing relevance for {len(jobs)} jobs")
+    logger.info(f"Analyzing relevance for {len(jobs)} jobs")
     
     if not jobs:
         return []
     
-    # Create user skills set for easier comparison
-    user_skills = set(skill.strip().lower() for skill in criteria.skills.split(','))
+    basic_scores = _first_stage_scores(jobs, criteria)
+    
+    budget = _llm_budget(criteria)
+    candidates = _llm_candidates(basic_scores, criteria)
+    llm_by_index = _score_candidates(jobs, candidates, criteria, budget)
+    _record_stats(stats, candidates, budget)
     
-    # Process each job
     relevant_jobs = []
-    for job in jobs:
+    for job in _combine_scores(jobs, basic_scores, llm_by_index):
         try:
-            # Extract and clean job description
-            description = job.get("description", "").lower()
-            if not description and "full_details" in job:
-                description = job["full_details"].lower()
-            
-            # Basic relevance score calculation
-            relevance_score = calculate_basic_relevance(job, criteria, user_skills)
-            print(f"Basic relevance score for {job.get('job_title', 'Unknown')}: {relevance_score}")
-            
-            # For jobs with moderate to high basic relevance, use LLM for deeper analysis
-            if relevance_score >= 0.3:  # Lowered threshold to include more jobs
-                llm_relevance = analyze_with_llm(job, criteria)
-                print(f"LLM relevance score for {job.get('job_title', 'Unknown')}: {llm_relevance}")
-                # Combine basic and LLM relevance scores with more weight on LLM analysis
-                final_relevance = (relevance_score * 0.3) + (llm_relevance * 0.7)
-            else:
-                final_relevance = relevance_score
-            
-            # Add relevance score to job
-            job["relevance_score"] = round(final_relevance, 2)
-            print(f"Final relevance score for {job.get('job_title', 'Unknown')}: {final_relevance}")
-            
-            # Filter out jobs with very low relevance
-            if final_relevance >= 0.3:  # Lowered threshold to include more jobs
-                # Standardize job format and fill missing fields using LLM
-                standardized_job = standardize_job_format(job, criteria)
-                relevant_jobs.append(standardized_job)
-                print(f"Added job {standardized_job['job_title']} to relevant jobs")
-            else:
-                print(f"Job {job.get('job_title', 'Unknown')} filtered out due to low relevance")
-                
+            # Standardize job format and fill missing fields using LLM
+            standardized_job = standardize_job_format(job, criteria)
+            relevant_jobs.append(standardized_job)
+            logger.debug(f"Added job {standardized_job['job_title']} to relevant jobs")
         except Exception as e:
-            print(f"Error analyzing job {job.get('job_title', 'Unknown')}: {str(e)}")
+            logger.error(f"Error analyzing job {job.get('job_title', 'Unknown')}: {str(e)}")
+            continue
+    
+    logger.info(f"Found {len(relevant_jobs)} relevant jobs")
+    return relevant_jobs
+
+async def analyze_job_relevance_async(jobs: List[Dict[str, Any]], criteria, stats: Optional[Dict[str, Any]] = None):
+    """
+    Async variant of analyze_job_relevance that never blocks the event loop.
+    LLM scoring and field filling run concurrently through the shared rate
+    limiter; the CPU-bound scoring passes run on the bounded analysis executor.
+    """
+    logger.info(f"Analyzing relevance for {len(jobs)} jobs")
+    
+    if not jobs:
+        return []
+    
+    basic_scores = await _run_in_analysis_executor(_first_stage_scores, jobs, criteria)
+    
+    budget = _llm_budget(criteria)
+    candidates = _llm_candidates(basic_scores, criteria)
+    llm_by_index = await _score_candidates_async(jobs, candidates, criteria, budget)
+    _record_stats(stats, candidates, budget)
+    
+    scored_jobs = await _run_in_analysis_executor(_combine_scores, jobs, basic_scores, llm_by_index)
+    
+    # Postings that did not make the cut are enriched for later searches, with quota requests leave unused
+    relevant_ids = {id(job) for job in scored_jobs}
+    enricher.schedule([job for job in jobs if id(job) not in relevant_ids])
+    standardized = await asyncio.gather(
+        *(standardize_job_format_async(job, criteria) for job in scored_jobs),
+        return_exceptions=True
+    )
+    
+    relevant_jobs = []
+    for job, standardized_job in zip(scored_jobs, standardized):
+        if isinstance(standardized_job, Exception):
+            logger.error(f"Error analyzing job {job.get('job_title', 'Unknown')}: {str(standardized_job)}")
             continue
+        relevant_jobs.append(standardized_job)
+        logger.debug(f"Added job {standardized_job['job_title']} to relevant jobs")
     
-    print(f"Found {len(relevant_jobs)} relevant jobs")
+    logger.info(f"Found {len(relevant_jobs)} relevant jobs")
     return relevant_jobs
 
+async def provisional_relevance_async(jobs: List[Dict[str, Any]], criteria) -> List[Optional[float]]:
+    """First-stage (basic or local) relevance of each job, without any LLM calls"""
+    return await _run_in_analysis_executor(_first_stage_scores, jobs, criteria)
+
 def calculate_basic_relevance(job, criteria, user_skills):
     """
     Calculate basic relevance score based on keyword matching
@@ -114,20 +373,20 @@ def calculate_basic_relevance(job, criteria, user_skills):
     job_title = job.get("job_title", "").lower()
     if criteria.position.lower() in job_title:
         score += 0.3
-        print(f"Title match for {job_title}")
+        logger.debug(f"Title match for {job_title}")
     
     # Location match
     job_location = job.get("location", "").lower()
     criteria_location = criteria.location.lower()
     if criteria_location.split(',')[0].strip() in job_location:
         score += 0.1
-        print(f"Location match for {job_location}")
+        logger.debug(f"Location match for {job_location}")
     
     # Job nature match
     job_nature = job.get("jobNature", "").lower()
     if criteria.jobNature.lower() in job_nature:
         score += 0.1
-        print(f"Job nature match for {job_nature}")
+        logger.debug(f"Job nature match for {job_nature}")
     
     # Experience match - convert to years for comparison
     job_exp = job.get("experience", "").lower()
@@ -144,7 +403,7 @@ def calculate_basic_relevance(job, criteria, user_skills):
         # If job experience is within 1 year of criteria
         if abs(job_years - criteria_years) <= 1:
             score += 0.1
-            print(f"Experience match: {job_years} years")
+            logger.debug(f"Experience match: {job_years} years")
     
     # Skills match from description
     description = job.get("description", "").lower()
@@ -155,84 +414,71 @@ def calculate_basic_relevance(job, criteria, user_skills):
     skill_score = min(0.4, skill_matches * 0.05)  # Cap at 0.4
     score += skill_score
     if skill_matches > 0:
-        print(f"Found {skill_matches} skill matches")
+        logger.debug(f"Found {skill_matches} skill matches")
     
     return min(1.0, score)  # Cap at 1.0
 
-def analyze_with_llm(job, criteria):
+def _job_details_section(job):
     """
-    Use Gemini to analyze job relevance in greater depth using complete job details
+    Build the JOB DETAILS block of a relevance prompt for a single job
     Handles different job source formats (Indeed, Rozee, LinkedIn)
     """
-    try:
-        # Extract and normalize job information based on source
-        source = job.get('source', '').lower()
-        
-        # Common fields that should be present in all sources
-        job_details = {
-            "title": job.get('job_title', ''),
-            "company": job.get('company', ''),
-            "location": job.get('location', ''),
-            "salary": job.get('salary', ''),
-            "description": job.get('description', ''),
-            "experience": job.get('experience', ''),
-            "job_nature": job.get('jobNature', ''),
-            "source": source
-        }
-
-        # Source-specific fields
-        if source == 'rozee.pk':
-            job_details.update({
-                "full_details": job.get('full_details', ''),
-                "industry": job.get('industry', ''),
-                "functional_area": job.get('functional_area', ''),
-                "total_positions": job.get('total_positions', ''),
-                "job_shift": job.get('job_shift', ''),
-                "job_type": job.get('job_type', ''),
-                "gender": job.get('gender', ''),
-                "minimum_education": job.get('minimum_education', ''),
-                "career_level": job.get('career_level', ''),
-                "experience": job.get('experience', ''),
-                "apply_before": job.get('apply_before', ''),
-                "posting_date": job.get('posting_date', '')
-            })
-        elif source == 'indeed':
-            # Indeed specific fields
-            job_details.update({
-                "job_type": job.get('job_type', ''),
-                "posted_date": job.get('posted_date', ''),
-                "company_rating": job.get('company_rating', ''),
-                "company_reviews": job.get('company_reviews', ''),
-                "benefits": job.get('benefits', []),
-                "qualifications": job.get('qualifications', ''),
-                "responsibilities": job.get('responsibilities', '')
-            })
-        elif source == 'linkedin':
-            # LinkedIn specific fields
-            job_details.update({
-                "employment_type": job.get('employment_type', ''),
-                "seniority_level": job.get('seniority_level', ''),
-                "industry": job.get('industry', ''),
-                "job_function": job.get('job_function', ''),
-                "posted_date": job.get('posted_date', ''),
-                "applicants": job.get('applicants', ''),
-                "company_size": job.get('company_size', ''),
-                "company_industry": job.get('company_industry', '')
-            })
-
-        # Build a comprehensive prompt for the LLM
-        prompt = f"""
-        Analyze how relevant this job is to the candidate's criteria. Consider all aspects of the job and candidate's requirements.
-        Score from 0.0 (not relevant) to 1.0 (perfect match).
+    # Extract and normalize job information based on source
+    source = job.get('source', '').lower()
 
-        CANDIDATE CRITERIA:
-        - Position: {criteria.position}
-        - Experience: {criteria.experience}
-        - Salary: {criteria.salary}
-        - Job Nature: {criteria.jobNature}
-        - Location: {criteria.location}
-        - Skills: {criteria.skills}
+    # Common fields that should be present in all sources
+    job_details = {
+        "title": job.get('job_title', ''),
+        "company": job.get('company', ''),
+        "location": job.get('location', ''),
+        "salary": job.get('salary', ''),
+        "description": job.get('description', ''),
+        "experience": job.get('experience', ''),
+        "job_nature": job.get('jobNature', ''),
+        "source": source
+    }
+
+    # Source-specific fields
+    if source == 'rozee.pk':
+        job_details.update({
+            "full_details": job.get('full_details', ''),
+            "industry": job.get('industry', ''),
+            "functional_area": job.get('functional_area', ''),
+            "total_positions": job.get('total_positions', ''),
+            "job_shift": job.get('job_shift', ''),
+            "job_type": job.get('job_type', ''),
+            "gender": job.get('gender', ''),
+            "minimum_education": job.get('minimum_education', ''),
+            "career_level": job.get('career_level', ''),
+            "experience": job.get('experience', ''),
+            "apply_before": job.get('apply_before', ''),
+            "posting_date": job.get('posting_date', '')
+        })
+    elif source == 'indeed':
+        # Indeed specific fields
+        job_details.update({
+            "job_type": job.get('job_type', ''),
+            "posted_date": job.get('posted_date', ''),
+            "company_rating": job.get('company_rating', ''),
+            "company_reviews": job.get('company_reviews', ''),
+            "benefits": job.get('benefits', []),
+            "qualifications": job.get('qualifications', ''),
+            "responsibilities": job.get('responsibilities', '')
+        })
+    elif source == 'linkedin':
+        # LinkedIn specific fields
+        job_details.update({
+            "employment_type": job.get('employment_type', ''),
+            "seniority_level": job.get('seniority_level', ''),
+            "industry": job.get('industry', ''),
+            "job_function": job.get('job_function', ''),
+            "posted_date": job.get('posted_date', ''),
+            "applicants": job.get('applicants', ''),
+            "company_size": job.get('company_size', ''),
+            "company_industry": job.get('company_industry', '')
+        })
 
+    section = f"""
         JOB DETAILS:
         - Title: {job_details['title']}
         - Company: {job_details['company']}
@@ -243,9 +489,9 @@ def analyze_with_llm(job, criteria):
         - Source: {job_details['source']}
         """
 
-        # Add source-specific details to the prompt
-        if source == 'rozee.pk':
-            prompt += f"""
+    # Add source-specific details to the prompt
+    if source == 'rozee.pk':
+        section += f"""
             ADDITIONAL DETAILS (Rozee):
             - Industry: {job_details['industry']}
             - Functional Area: {job_details['functional_area']}
@@ -260,8 +506,8 @@ def analyze_with_llm(job, criteria):
             - Posted Date: {job_details['posting_date']}
             - Full Details: {job_details['full_details']}
             """
-        elif source == 'indeed':
-            prompt += f"""
+    elif source == 'indeed':
+        section += f"""
             ADDITIONAL DETAILS (Indeed):
             - Job Type: {job_details['job_type']}
             - Posted Date: {job_details['posted_date']}
@@ -271,8 +517,8 @@ def analyze_with_llm(job, criteria):
             - Qualifications: {job_details['qualifications']}
             - Responsibilities: {job_details['responsibilities']}
             """
-        elif source == 'linkedin':
-            prompt += f"""
+    elif source == 'linkedin':
+        section += f"""
             ADDITIONAL DETAILS (LinkedIn):
             - Employment Type: {job_details['employment_type']}
             - Seniority Level: {job_details['seniority_level']}
@@ -284,7 +530,21 @@ def analyze_with_llm(job, criteria):
             - Company Industry: {job_details['company_industry']}
             """
 
-        prompt += """
+    return section
+
+def _criteria_section(criteria):
+    """Build the CANDIDATE CRITERIA block of a relevance prompt"""
+    return f"""
+        CANDIDATE CRITERIA:
+        - Position: {criteria.position}
+        - Experience: {criteria.experience}
+        - Salary: {criteria.salary}
+        - Job Nature: {criteria.jobNature}
+        - Location: {criteria.location}
+        - Skills: {criteria.skills}
+        """
+
+RELEVANCE_ASPECTS = """
         Please analyze the following aspects:
         1. Position match (title and responsibilities)
         2. Experience level compatibility
@@ -294,30 +554,232 @@ def analyze_with_llm(job, criteria):
         6. Salary expectations
         7. Education and career level fit
         8. Overall suitability
+        """
 
+def build_relevance_prompt(job, criteria) -> str:
+    """Build the single-job relevance prompt"""
+    prompt = """
+        Analyze how relevant this job is to the candidate's criteria. Consider all aspects of the job and candidate's requirements.
+        Score from 0.0 (not relevant) to 1.0 (perfect match).
+        """
+    prompt += _criteria_section(criteria)
+    prompt += _job_details_section(job)
+    prompt += RELEVANCE_ASPECTS
+    prompt += """
         Output only a number between 0.0 and 1.0 representing the overall relevance score.
         """
+    return prompt
 
-        # Call Gemini API with the correct model
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        response = model.generate_content(prompt)
-        result = response.text.strip()
+def parse_relevance_score(result: str) -> Optional[float]:
+    """Parse a single-job relevance response; None if it is not a number"""
+    try:
+        relevance_score = float(result)
+        return max(0.0, min(1.0, relevance_score))
+    except ValueError:
+        logger.error(f"Failed to parse Gemini relevance score: {result}")
+        return None
 
-        try:
-            relevance_score = float(result)
-            return max(0.0, min(1.0, relevance_score))
-        except ValueError:
-            logger.error(f"Failed to parse Gemini relevance score: {result}")
-            return 0.5
+def analyze_with_llm(job, criteria) -> Optional[float]:
+    """
+    Use Gemini to analyze job relevance in greater depth using complete job details
+    Handles different job source formats (Indeed, Rozee, LinkedIn)
+    Returns None when no score could be obtained so the basic score is kept
+    (and nothing is cached)
+    """
+    try:
+        return parse_relevance_score(generate_content_sync(build_relevance_prompt(job, criteria)))
+    except QuotaExceededError as e:
+        logger.error(str(e))
+        return None
+    except Exception as e:
+        logger.error(f"Error in Gemini relevance analysis: {str(e)}")
+        return None
 
+async def analyze_with_llm_async(job, criteria) -> Optional[float]:
+    """Async variant of analyze_with_llm"""
+    try:
+        return parse_relevance_score(await generate_content(build_relevance_prompt(job, criteria)))
+    except QuotaExceededError as e:
+        logger.error(str(e))
+        return None
     except Exception as e:
         logger.error(f"Error in Gemini relevance analysis: {str(e)}")
-        return 0.5
+        return None
 
-def standardize_job_format(job: Dict[str, Any], criteria) -> Dict[str, Any]:
+def job_id(job: Dict[str, Any]) -> str:
+    """
+    Stable identifier for a job, used to key batched LLM scores
+    """
+    identity = job.get("apply_link") or f"{job.get('job_title', '')}|{job.get('company', '')}"
+    return "job-" + hashlib.sha1(str(identity).encode("utf-8")).hexdigest()[:10]
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)"""
+    return len(text) // 4 + 1
+
+def _batch_jobs_for_llm(jobs: List[Dict[str, Any]], criteria) -> List[List[Tuple[str, Dict[str, Any], str]]]:
+    """
+    Pack jobs into batches of at most LLM_BATCH_SIZE jobs whose combined
+    prompt stays within LLM_BATCH_TOKEN_BUDGET. A job that exceeds the
+    budget on its own is sent in a batch by itself.
+    """
+    base_tokens = _estimate_tokens(_criteria_section(criteria) + RELEVANCE_ASPECTS) + 200
+    batches = []
+    current, current_tokens = [], base_tokens
+    seen_ids = set()
+
+    for index, job in enumerate(jobs):
+        jid = job_id(job)
+        if jid in seen_ids:
+            jid = f"{jid}-{index}"
+        seen_ids.add(jid)
+
+        section = _job_details_section(job)
+        tokens = _estimate_tokens(section)
+        if current and (len(current) >= LLM_BATCH_SIZE or current_tokens + tokens > LLM_BATCH_TOKEN_BUDGET):
+            batches.append(current)
+            current, current_tokens = [], base_tokens
+        current.append((jid, job, section))
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+def _build_batch_prompt(batch, criteria) -> str:
+    """Build one structured prompt that asks Gemini to score every job in the batch"""
+    prompt = f"""
+        Analyze how relevant each of the following {len(batch)} jobs is to the candidate's criteria.
+        Consider all aspects of each job and the candidate's requirements.
+        Score each job from 0.0 (not relevant) to 1.0 (perfect match).
+        """
+    prompt += _criteria_section(criteria)
+    for jid, _, section in batch:
+        prompt += f"""
+        === JOB id={jid} ==="""
+        prompt += section
+    prompt += RELEVANCE_ASPECTS
+    prompt += """
+        Output only a JSON array with one object per job, in the form
+        [{"id": "<job id>", "score": <number between 0.0 and 1.0>}].
+        Do not include any markdown formatting or code blocks.
+        """
+    return prompt
+
+def parse_batch_scores(result: str) -> Dict[str, float]:
+    """
+    Parse a batched Gemini response into {job id: score}.
+    Entries that cannot be parsed are left out so the caller can fall back.
+    """
+    result = result.replace("```json", "").replace("```", "").strip()
+    try:
+        parsed = json.loads(result)
+    except json.JSONDecodeError:
+        # The model sometimes wraps the array in prose
+        match = re.search(r"\[.*\]", result, re.DOTALL)
+        if not match:
+            return {}
+        try:
+            parsed = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return {}
+
+    if isinstance(parsed, dict):
+        parsed = [{"id": key, "score": value} for key, value in parsed.items()]
+    if not isinstance(parsed, list):
+        return {}
+
+    scores = {}
+    for item in parsed:
+        if not isinstance(item, dict) or "id" not in item:
+            continue
+        try:
+            score = float(item.get("score"))
+        except (TypeError, ValueError):
+            continue
+        scores[str(item["id"])] = max(0.0, min(1.0, score))
+    return scores
+
+def _batch_fallbacks(batch, batch_scores, scores) -> List[Tuple[str, Dict[str, Any]]]:
+    """Record parsed batch scores and return the jobs that need a single-job call"""
+    fallbacks = []
+    for jid, job, _ in batch:
+        if jid in batch_scores:
+            scores[jid] = batch_scores[jid]
+        else:
+            logger.warning(f"No batched score for {job.get('job_title', 'Unknown')}, falling back to single-job analysis")
+            fallbacks.append((jid, job))
+    return fallbacks
+
+def analyze_batch_with_llm(jobs: List[Dict[str, Any]], criteria,
+                           budget: Optional[LLMBudget] = None) -> List[Optional[float]]:
     """
-    Standardize job format and fill missing fields using LLM
+    Score several jobs with one Gemini call per batch instead of one per job.
+    Returns scores in the same order as `jobs`. Jobs missing from a batch
+    response are scored individually with analyze_with_llm. Once `budget`
+    runs out the remaining jobs get None.
     """
+    budget = budget or LLMBudget(None)
+    scores = {}
+    batches = _batch_jobs_for_llm(jobs, criteria)
+    ordered_ids = [jid for batch in batches for jid, _, _ in batch]
+
+    for batch in batches:
+        if not budget.try_spend():
+            scores.update({jid: None for jid, _, _ in batch})
+            continue
+        try:
+            batch_scores = parse_batch_scores(generate_content_sync(_build_batch_prompt(batch, criteria)))
+        except QuotaExceededError as e:
+            # Falling back to single-job calls would only hit the same quota
+            logger.error(str(e))
+            scores.update({jid: None for jid, _, _ in batch})
+            continue
+        except Exception as e:
+            logger.error(f"Error in batched Gemini relevance analysis: {str(e)}")
+            batch_scores = {}
+
+        for jid, job in _batch_fallbacks(batch, batch_scores, scores):
+            scores[jid] = analyze_with_llm(job, criteria) if budget.try_spend() else None
+
+    return [scores[jid] for jid in ordered_ids]
+
+async def _score_batch_async(batch, criteria, scores, budget: LLMBudget):
+    if not budget.try_spend():
+        scores.update({jid: None for jid, _, _ in batch})
+        return
+    try:
+        batch_scores = parse_batch_scores(await generate_content(_build_batch_prompt(batch, criteria)))
+    except QuotaExceededError as e:
+        logger.error(str(e))
+        scores.update({jid: None for jid, _, _ in batch})
+        return
+    except Exception as e:
+        logger.error(f"Error in batched Gemini relevance analysis: {str(e)}")
+        batch_scores = {}
+
+    fallbacks = []
+    for jid, job in _batch_fallbacks(batch, batch_scores, scores):
+        if budget.try_spend():
+            fallbacks.append((jid, job))
+        else:
+            scores[jid] = None
+    fallback_scores = await asyncio.gather(*(analyze_with_llm_async(job, criteria) for _, job in fallbacks))
+    for (jid, _), score in zip(fallbacks, fallback_scores):
+        scores[jid] = score
+
+async def analyze_batch_with_llm_async(jobs: List[Dict[str, Any]], criteria,
+                                       budget: Optional[LLMBudget] = None) -> List[Optional[float]]:
+    """Async variant of analyze_batch_with_llm; batches are scored concurrently"""
+    budget = budget or LLMBudget(None)
+    scores = {}
+    batches = _batch_jobs_for_llm(jobs, criteria)
+    ordered_ids = [jid for batch in batches for jid, _, _ in batch]
+    await asyncio.gather(*(_score_batch_async(batch, criteria, scores, budget) for batch in batches))
+    return [scores[jid] for jid in ordered_ids]
+
+def _standardized_fields(job: Dict[str, Any]):
+    """Initial standardized job plus the list of fields that are missing"""
     # Initialize standardized job with required fields
     standardized_job = {
         "job_title": job.get("job_title", ""),
@@ -329,58 +791,88 @@ def standardize_job_format(job: Dict[str, Any], criteria) -> Dict[str, Any]:
         "apply_link": job.get("apply_link", ""),
         "relevance_score": job.get("relevance_score", 0.0)
     }
+    if job.get("sources"):
+        standardized_job["sources"] = job["sources"]
     
-    # Check for missing or unspecified fields
-    missing_fields = [field for field, value in standardized_job.items() 
-                     if not value or value == "Not specified" or value == "N/A" or value == "Not Specified"]
-    
+    # Check for missing or unspecified fields; only what the extractor cannot fill goes to the LLM
+    extracted, missing_fields = resolve_fields(job)
+    standardized_job.update(extracted)
     if missing_fields:
         logger.info(f"Missing fields for job {job.get('job_title', 'Unknown')}: {missing_fields}")
-        # Use LLM to fill missing fields
-        filled_fields = fill_missing_fields_with_llm(job, missing_fields)
+    return standardized_job, missing_fields
+
+def standardize_job_format(job: Dict[str, Any], criteria) -> Dict[str, Any]:
+    """
+    Standardize job format and fill missing fields using the enrichment
+    store, falling back to the LLM for postings that were never enriched
+    """
+    standardized_job, missing_fields = _standardized_fields(job)
+    
+    if missing_fields:
+        job_key = job_fingerprint(job)
+        filled_fields = enrichment_store.get(job_key)
+        if filled_fields is None:
+            try:
+                filled_fields = _parse_filled_fields(
+                    generate_content_sync(_build_fill_prompt(job, missing_fields)), missing_fields, strict=True
+                )
+                filled_fields = {field: value for field, value in filled_fields.items() if field in ENRICHABLE_FIELDS}
+                enrichment_store.put(job_key, filled_fields)
+            except Exception as e:
+                logger.error(f"Error filling missing fields with LLM: {str(e)}")
+                filled_fields = {field: "Not specified" for field in missing_fields}
+        filled_fields = {field: value for field, value in filled_fields.items() if field in missing_fields}
         standardized_job.update(filled_fields)
         logger.info(f"Filled missing fields: {filled_fields}")
     
     return standardized_job
 
-def fill_missing_fields_with_llm(job: Dict[str, Any], missing_fields: List[str]) -> Dict[str, Any]:
-    """
-    Use LLM to fill missing fields based on job description and details
-    """
-    try:
-        # Prepare job details for LLM
-        job_details = {
-            "title": job.get("job_title", ""),
-            "company": job.get("company", ""),
-            "description": job.get("description", ""),
-            "full_details": job.get("full_details", ""),
-            "source": job.get("source", ""),
-            "job_type": job.get("job_type", ""),
-            "employment_type": job.get("employment_type", ""),
-            "seniority_level": job.get("seniority_level", ""),
-            "location": job.get("location", ""),
-            "salary": job.get("salary", ""),
-            "experience": job.get("experience", ""),
-            "skills": job.get("skills", []),
-            "posted_date": job.get("posted_date", ""),
-            # Add Rozee-specific fields
-            "industry": job.get("industry", ""),
-            "functional_area": job.get("functional_area", ""),
-            "total_positions": job.get("total_positions", ""),
-            "job_shift": job.get("job_shift", ""),
-            "gender": job.get("gender", ""),
-            "minimum_education": job.get("minimum_education", ""),
-            "career_level": job.get("career_level", ""),
-            "apply_before": job.get("apply_before", "")
-        }
-        
-        # Build prompt for LLM
-        prompt = f"""
+async def standardize_job_format_async(job: Dict[str, Any], criteria) -> Dict[str, Any]:
+    """Async variant of standardize_job_format; enrichment runs once per posting"""
+    standardized_job, missing_fields = _standardized_fields(job)
+    
+    if missing_fields:
+        filled_fields = await enricher.enrich(job)
+        standardized_job.update(filled_fields)
+        logger.info(f"Filled missing fields: {filled_fields}")
+    
+    return standardized_job
+
+def _build_fill_prompt(job: Dict[str, Any], missing_fields: List[str]) -> str:
+    """Build the prompt asking Gemini to fill in missing job fields"""
+    # Prepare job details for LLM
+    job_details = {
+        "title": job.get("job_title", ""),
+        "company": job.get("company", ""),
+        "description": job.get("description", ""),
+        "full_details": job.get("full_details", ""),
+        "source": job.get("source", ""),
+        "job_type": job.get("job_type", ""),
+        "employment_type": job.get("employment_type", ""),
+        "seniority_level": job.get("seniority_level", ""),
+        "location": job.get("location", ""),
+        "salary": job.get("salary", ""),
+        "experience": job.get("experience", ""),
+        "skills": job.get("skills", []),
+        "posted_date": job.get("posted_date", ""),
+        # Add Rozee-specific fields
+        "industry": job.get("industry", ""),
+        "functional_area": job.get("functional_area", ""),
+        "total_positions": job.get("total_positions", ""),
+        "job_shift": job.get("job_shift", ""),
+        "gender": job.get("gender", ""),
+        "minimum_education": job.get("minimum_education", ""),
+        "career_level": job.get("career_level", ""),
+        "apply_before": job.get("apply_before", "")
+    }
+    
+    # Build prompt for LLM
+    return f"""
         Based on the following job details, fill in the missing fields: {', '.join(missing_fields)}.
         Only output the missing fields in JSON format.
         
         Job Details:
-        {json.dumps(job_details, indent=2)}
+        {json.dumps(job_details, indent=2, default=str)}
         
         For each missing field, provide the most accurate information based on the available details.
         If information cannot be determined, use "Not specified".
@@ -397,25 +889,48 @@ def fill_missing_fields_with_llm(job: Dict[str, Any], missing_fields: List[str])
         Output format should be a JSON object with only the missing fields.
         Do not include any markdown formatting or code blocks.
         """
-        
-        # Call Gemini API
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        response = model.generate_content(prompt)
-        result = response.text.strip()
-        
-        # Clean the response to remove any markdown formatting
-        result = result.replace("```json", "").replace("```", "").strip()
-        
-        # Parse LLM response
-        try:
-            filled_fields = json.loads(result)
-            logger.info(f"Successfully filled fields: {filled_fields}")
-            return filled_fields
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response: {result}")
-            logger.error(f"JSON decode error: {str(e)}")
-            return {field: "Not specified" for field in missing_fields}
-            
+
+def _parse_filled_fields(result: str, missing_fields: List[str], strict: bool = False) -> Dict[str, Any]:
+    """Parse the filled fields; with `strict`, unparseable responses raise instead of defaulting"""
+    # Clean the response to remove any markdown formatting
+    result = result.replace("```json", "").replace("```", "").strip()
+    
+    # Parse LLM response
+    try:
+        filled_fields = json.loads(result)
+        logger.info(f"Successfully filled fields: {filled_fields}")
+        return filled_fields
+    except json.JSONDecodeError as e:
+        if strict:
+            raise
+        logger.error(f"Failed to parse LLM response: {result}")
+        logger.error(f"JSON decode error: {str(e)}")
+        return {field: "Not specified" for field in missing_fields}
+
+def fill_missing_fields_with_llm(job: Dict[str, Any], missing_fields: List[str]) -> Dict[str, Any]:
+    """
+    Use LLM to fill missing fields based on job description and details
+    """
+    try:
+        return _parse_filled_fields(generate_content_sync(_build_fill_prompt(job, missing_fields)), missing_fields)
     except Exception as e:
         logger.error(f"Error filling missing fields with LLM: {str(e)}")
         return {field: "Not specified" for field in missing_fields}
+
+async def fill_missing_fields_with_llm_async(job: Dict[str, Any], missing_fields: List[str]) -> Dict[str, Any]:
+    """Async variant of fill_missing_fields_with_llm"""
+    try:
+        return _parse_filled_fields(await generate_content(_build_fill_prompt(job, missing_fields)), missing_fields)
+    except Exception as e:
+        logger.error(f"Error filling missing fields with LLM: {str(e)}")
+        return {field: "Not specified" for field in missing_fields}
+
+async def _request_filled_fields_async(job: Dict[str, Any], missing_fields: List[str]) -> Dict[str, Any]:
+    """Fill missing fields with the LLM, raising on failure so the result is not stored"""
+    return _parse_filled_fields(await generate_content(_build_fill_prompt(job, missing_fields)), missing_fields, strict=True)
+
+async def _spare_enrichment_capacity():
+    await wait_for_spare_capacity(ENRICHMENT_BACKGROUND_RESERVE)
+
+enricher = JobEnricher(enrichment_store, _request_filled_fields_async,
+                       wait_for_capacity=_spare_enrichment_capacity, executor=analysis_executor)
@@ -0,0 +1,188 @@
+"""
+Persistent cache of LLM relevance scores.
+
+Scores are keyed by (job fingerprint, criteria hash) and stored in SQLite so
+they survive restarts and are shared by every worker process on the host.
+Entries expire after SCORE_CACHE_TTL and the least recently used entries are
+evicted once the cache holds more than SCORE_CACHE_MAX_ENTRIES. The table
+is only counted and swept when the rows written since the last pass could
+take it over that bound, or every SCORE_CACHE_EVICT_EVERY writes.
+
+With CACHE_BACKEND = "redis" the scores go to Redis instead, so they are
+shared across hosts as well.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from cache_backends import CacheBackend, create_cache
+from config import CACHE_BACKEND, SCORE_CACHE_EVICT_EVERY, SCORE_CACHE_MAX_ENTRIES, SCORE_CACHE_PATH, SCORE_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str]
+
+class ScoreCache:
+    def __init__(self, path: str, ttl: float, max_entries: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size: Optional[int] = None  # Rows at the last eviction pass; None before the first
+        self._written = 0  # Rows written by this instance since then
+        self._writes = 0
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+        self._init_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets several worker processes share the file"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_scores (
+                job_key TEXT NOT NULL,
+                criteria_key TEXT NOT NULL,
+                score REAL NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (job_key, criteria_key)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS llm_scores_accessed ON llm_scores (accessed_at)")
+
+    def get_many(self, keys: Iterable[Key]) -> Dict[Key, float]:
+        """Return cached scores for the given keys, refreshing their LRU position"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        now = time.time()
+        conn = self._connection()
+        found = {}
+        try:
+            for job_key, criteria_key in keys:
+                row = conn.execute(
+                    "SELECT score, created_at FROM llm_scores WHERE job_key = ? AND criteria_key = ?",
+                    (job_key, criteria_key)
+                ).fetchone()
+                if row and now - row[1] < self.ttl:
+                    found[(job_key, criteria_key)] = row[0]
+            if found:
+                conn.executemany(
+                    "UPDATE llm_scores SET accessed_at = ? WHERE job_key = ? AND criteria_key = ?",
+                    [(now, job_key, criteria_key) for job_key, criteria_key in found]
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error reading LLM score cache: {str(e)}")
+
+        with self._counter_lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, job_key: str, criteria_key: str) -> Optional[float]:
+        return self.get_many([(job_key, criteria_key)]).get((job_key, criteria_key))
+
+    def put_many(self, scores: Dict[Key, float]):
+        """Store scores and evict expired / least recently used entries"""
+        if not scores:
+            return
+        now = time.time()
+        conn = self._connection()
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO llm_scores (job_key, criteria_key, score, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(job_key, criteria_key, score, now, now) for (job_key, criteria_key), score in scores.items()]
+            )
+            if self._eviction_due(len(scores)):
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.error(f"Error writing LLM score cache: {str(e)}")
+
+    def put(self, job_key: str, criteria_key: str, score: float):
+        self.put_many({(job_key, criteria_key): score})
+
+    def _eviction_due(self, rows: int) -> bool:
+        """Count the rows just written; True if the table may be over its bound or is due a sweep"""
+        with self._counter_lock:
+            self._written += rows
+            self._writes += 1
+            due = (self._size is None or self._size + self._written > self.max_entries
+                   or self._writes >= SCORE_CACHE_EVICT_EVERY)
+            if due:
+                self._written = self._writes = 0
+            return due
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        evicted = conn.execute("DELETE FROM llm_scores WHERE created_at < ?", (now - self.ttl,)).rowcount
+        size = conn.execute("SELECT COUNT(*) FROM llm_scores").fetchone()[0]
+        if size > self.max_entries:
+            evicted += conn.execute(
+                "DELETE FROM llm_scores WHERE rowid IN "
+                "(SELECT rowid FROM llm_scores ORDER BY accessed_at ASC LIMIT ?)",
+                (size - self.max_entries,)
+            ).rowcount
+        with self._counter_lock:
+            self._size = min(size, self.max_entries)
+            self.evictions += evicted
+
+    def stats(self) -> Dict[str, float]:
+        try:
+            size = self._connection().execute("SELECT COUNT(*) FROM llm_scores").fetchone()[0]
+        except sqlite3.Error:
+            size = None
+        with self._counter_lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+class BackendScoreCache:
+    """Same interface as ScoreCache, stored in one of the cache_backends"""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    @staticmethod
+    def _key(key: Key) -> str:
+        return f"{key[0]}:{key[1]}"
+
+    def get_many(self, keys: Iterable[Key]) -> Dict[Key, float]:
+        keys = list(keys)
+        found = self.backend.get_many(self._key(key) for key in keys)
+        return {key: found[self._key(key)] for key in keys if self._key(key) in found}
+
+    def get(self, job_key: str, criteria_key: str) -> Optional[float]:
+        return self.get_many([(job_key, criteria_key)]).get((job_key, criteria_key))
+
+    def put_many(self, scores: Dict[Key, float]):
+        for key, score in scores.items():
+            self.backend.set(self._key(key), score)
+
+    def put(self, job_key: str, criteria_key: str, score: float):
+        self.put_many({(job_key, criteria_key): score})
+
+    def stats(self) -> Dict[str, float]:
+        return self.backend.stats()
+
+if CACHE_BACKEND == "redis":
+    score_cache = BackendScoreCache(create_cache("llm_scores", SCORE_CACHE_TTL, SCORE_CACHE_MAX_ENTRIES, 0))
+else:
+    score_cache = ScoreCache(SCORE_CACHE_PATH, SCORE_CACHE_TTL, SCORE_CACHE_MAX_ENTRIES)
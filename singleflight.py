@@ -0,0 +1,53 @@
+"""
+Coalescing of identical concurrent work.
+
+The first caller for a key starts the computation; callers arriving while
+it runs wait for the same result (or exception) instead of starting their
+own. The computation runs as its own task, so a waiter that is cancelled
+(e.g. a client disconnecting) does not cancel it for the others.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def _finished(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Retrieve the outcome so an error nobody waited for is still logged once
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+            logger.error(f"Shared computation for {key} failed: {str(task.exception())}")
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Result of `func()` for `key`, running it only if no identical call
+        is in flight. Returns (result, shared) where `shared` is True for
+        callers that joined an existing computation.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda finished: self._finished(key, finished))
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced_requests": self.coalesced,
+            "failures": self.failures,
+        }
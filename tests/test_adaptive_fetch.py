@@ -0,0 +1,40 @@
+"""Demand-driven pagination: page limits, targets and their validation"""
+import asyncio
+
+import pydantic
+import pytest
+
+from adaptive_fetch import fetch_pages
+from main import JobSearchCriteria
+from testkit import make_job
+
+def _criteria(**overrides):
+    body = dict(position="Python Developer", experience="2 years", salary="150,000", jobNature="Remote",
+                location="Lahore, Pakistan", skills="python, django, sql", scorer="local")
+    return JobSearchCriteria(**body, **overrides)
+
+def _run(criteria, sources=("Indeed", "LinkedIn")):
+    fetched = []
+
+    async def fetch(source, criteria, page):
+        fetched.append((source, page))
+        return [make_job(i, apply_link=f"https://jobs.example.com/{source}/{page}/{i}") for i in range(3)]
+
+    async def scenario():
+        return [(source, page) async for source, page, _, _ in fetch_pages(fetch, list(sources), criteria)]
+
+    return asyncio.run(scenario()), fetched
+
+def test_pages_stop_at_max_pages_per_source():
+    pages, _ = _run(_criteria(max_pages=2, target_results=1000))
+    assert sorted(pages) == [("Indeed", 0), ("Indeed", 1), ("LinkedIn", 0), ("LinkedIn", 1)]
+
+def test_one_page_per_source_once_the_target_is_met():
+    pages, fetched = _run(_criteria(max_pages=5, target_results=1))
+    assert sorted(pages) == sorted(fetched) == [("Indeed", 0), ("LinkedIn", 0)]
+
+@pytest.mark.parametrize("field", ["target_results", "max_pages"])
+@pytest.mark.parametrize("value", [0, -1])
+def test_pagination_overrides_below_one_are_rejected(field, value):
+    with pytest.raises(pydantic.ValidationError):
+        _criteria(**{field: value})
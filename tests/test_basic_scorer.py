@@ -0,0 +1,58 @@
+"""Columnar basic scorer against the per-job calculate_basic_relevance"""
+from types import SimpleNamespace
+
+import pytest
+
+from basic_scorer import CompiledCriteria, score_jobs
+from relevance_analyzer import calculate_basic_relevance
+from testkit import make_job
+
+TITLES = ["Python Developer", "Senior Python Developer", "Django Engineer", "Accountant", ""]
+LOCATIONS = ["Lahore, Pakistan", "Karachi", "Remote", ""]
+NATURES = ["Remote", "Onsite", "Hybrid", "Not specified"]
+EXPERIENCES = ["2 years", "3-5 years", "1+ years", "10 years", "Fresh", "Not specified"]
+DESCRIPTIONS = [
+    "python django sql docker rest",
+    "We use Python and JSON APIs on AWS.",
+    "node.js react typescript",
+    "javascript and nosql stores",
+    "",
+]
+
+def _jobs():
+    jobs = []
+    for i in range(240):
+        job = make_job(i, job_title=TITLES[i % 5], location=LOCATIONS[i % 4], jobNature=NATURES[i % 4],
+                       experience=EXPERIENCES[i % 6], description=DESCRIPTIONS[i % 5])
+        if not job["description"]:
+            job["full_details"] = "Full details mention Python and SQL"
+        jobs.append(job)
+    return jobs
+
+@pytest.mark.parametrize("criteria", [
+    SimpleNamespace(position="Python Developer", experience="2 years", jobNature="Remote",
+                    location="Lahore, Pakistan", skills="python, django, sql, docker, rest"),
+    SimpleNamespace(position="Engineer", experience="Fresh", jobNature="Hybrid",
+                    location="Karachi", skills="react, node.js, json"),
+    # Overlapping skills: each is still a substring on its own
+    SimpleNamespace(position="Developer", experience="2 years", jobNature="Remote",
+                    location="Lahore", skills="java, script, typescript, js, json, sql, nosql, "),
+])
+def test_columnar_scores_match_per_job_scores(criteria):
+    jobs = _jobs()
+    user_skills = set(skill.strip().lower() for skill in criteria.skills.split(','))
+    expected = [calculate_basic_relevance(job, criteria, user_skills) for job in jobs]
+    scores = score_jobs(jobs, criteria, CompiledCriteria(criteria, expand_aliases=False))
+    assert list(scores) == pytest.approx(expected, abs=1e-12)
+
+def test_aliases_match_whole_tokens_only():
+    criteria = SimpleNamespace(position="Developer", experience="2 years", jobNature="Remote",
+                               location="Lahore", skills="javascript")
+    jobs = [make_job(1, description="Modern JS and HTML"), make_job(2, description="Parsing JSON files")]
+    assert list(score_jobs(jobs, criteria)) == pytest.approx([0.65, 0.6])
+
+def test_aliases_are_credited_to_their_skill_once():
+    criteria = SimpleNamespace(position="Developer", experience="2 years", jobNature="Remote",
+                               location="Lahore", skills="javascript, postgresql")
+    jobs = [make_job(1, description="js, JS and postgres"), make_job(2, description="jsx and postgresdb")]
+    assert list(score_jobs(jobs, criteria)) == pytest.approx([0.7, 0.6])
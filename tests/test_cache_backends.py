@@ -0,0 +1,155 @@
+"""Every cache backend stores JSON and behaves the same way"""
+import asyncio
+import json
+import time
+import zlib
+
+import pytest
+
+import cache_backends
+from bounded_cache import BoundedCache, sweep_periodically
+from cache_backends import RedisCache, SQLiteCache
+from main import JobListing, JobSearchResponse
+from testkit import make_job
+
+fakeredis = pytest.importorskip("fakeredis")
+
+def _backend(kind, tmp_path, max_entries=100, max_bytes=1 << 20, **options):
+    if kind == "memory":
+        return BoundedCache("test", 60, max_entries, max_bytes, **options)
+    if kind == "sqlite":
+        return SQLiteCache("test", 60, max_entries, max_bytes, path=str(tmp_path / "cache.sqlite3"), **options)
+    return RedisCache("test", 60, client=fakeredis.FakeRedis(), **options)
+
+BACKENDS = ["memory", "sqlite", "redis"]
+
+def _response():
+    listing = JobListing(**{key: value for key, value in make_job(1).items() if key != "description"},
+                         relevance_score=0.8, sources=["Indeed"])
+    return JobSearchResponse(relevant_jobs=[listing], total_jobs_found=1, search_timestamp="2026-01-01T00:00:00")
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_model_values_round_trip_as_json(kind, tmp_path):
+    cache = _backend(kind, tmp_path, compress=True, model=JobSearchResponse)
+    cache.set("key", _response())
+
+    assert cache.get("key") == _response()
+    payload, _ = cache._read("key")
+    assert json.loads(zlib.decompress(payload))["relevant_jobs"][0]["company"] == "Company 1"
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_plain_values_round_trip_and_are_copies(kind, tmp_path):
+    cache = _backend(kind, tmp_path)
+    jobs = [make_job(1), make_job(2)]
+    cache.set("jobs", jobs)
+
+    cached = cache.get("jobs")
+    cached[0]["company"] = "Changed"
+    assert cache.get("jobs") == jobs
+    assert cache.get_many(["jobs", "missing"]) == {"jobs": jobs}
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_expired_entries_are_served_stale_within_grace(kind, tmp_path):
+    cache = _backend(kind, tmp_path, grace=60)
+    cache.set("key", {"value": 1}, ttl=-1)
+
+    assert cache.get("key") is None
+    assert cache.get_entry("key") == ({"value": 1}, True)
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_async_methods_match_the_sync_ones(kind, tmp_path):
+    cache = _backend(kind, tmp_path)
+
+    async def scenario():
+        await cache.set_async("key", [1, 2, 3])
+        return await cache.get_async("key"), await cache.get_entry_async("key"), await cache.stats_async()
+
+    value, entry, stats = asyncio.run(scenario())
+    assert value == [1, 2, 3]
+    assert entry == ([1, 2, 3], False)
+    assert stats["hits"] == 2
+
+def test_redis_stats_do_not_scan_the_keyspace(monkeypatch):
+    cache = RedisCache("test", 60, client=fakeredis.FakeRedis())
+    cache.set("key", 1)
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError("stats scanned the keyspace")
+
+    monkeypatch.setattr(cache.client, "scan_iter", no_scan)
+    assert cache.stats()["db_size"] == 1
+
+def test_redis_entries_expire_after_grace():
+    client = fakeredis.FakeRedis()
+    cache = RedisCache("test", 60, grace=30, client=client)
+    cache.set("key", 1)
+
+    assert 85 < client.pttl(cache.prefix + "key") / 1000 <= 90  # TTL plus grace
+
+@pytest.mark.parametrize("kind", BACKENDS)
+def test_undecodable_entries_are_misses(kind, tmp_path):
+    cache = _backend(kind, tmp_path, compress=True)
+    cache._write("key", b"\x80\x05not json", time.time() + 60)
+
+    assert cache.get("key") is None
+    assert cache._read("key") is None
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_least_recently_used_entries_go_when_over_the_byte_bound(kind, tmp_path):
+    cache = _backend(kind, tmp_path, max_bytes=1600)  # Room for three 502-byte payloads
+    for key in ("a", "b", "c"):
+        cache.set(key, "x" * 500)
+        time.sleep(0.01)
+    cache.get("a")  # Now the most recently used
+    time.sleep(0.01)
+    cache.set("d", "x" * 500)
+
+    assert sorted(cache.get_many(["a", "b", "c", "d"])) == ["a", "c", "d"]
+    assert cache.stats()["evictions"] == 1
+
+def test_sqlite_writes_below_the_bounds_do_not_count_the_table(tmp_path):
+    cache = _backend("sqlite", tmp_path)
+    cache.set("first", 1)  # Counts the table once
+    statements = []
+    cache._connection().set_trace_callback(statements.append)
+
+    for i in range(20):
+        cache.set(f"key-{i}", i)
+
+    assert not [statement for statement in statements if "COUNT(*)" in statement]
+
+def test_sqlite_recounts_to_take_in_other_workers_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_backends, "CACHE_SQLITE_RECOUNT_EVERY", 5)
+    worker = _backend("sqlite", tmp_path, max_entries=10)
+    other = _backend("sqlite", tmp_path, max_entries=10)
+    worker.set("first", 0)
+    for i in range(10):
+        other.set(f"other-{i}", i)  # Unseen by worker's running totals
+    assert len(worker) == 10
+
+    for i in range(5):
+        worker.set(f"worker-{i}", i)
+
+    assert len(worker) == 10
+
+def test_sweeper_keeps_going_after_a_cache_fails(tmp_path):
+    class BrokenCache:
+        name = "broken"
+
+        async def sweep_async(self):
+            raise OSError("disk unavailable")
+
+    cache = _backend("sqlite", tmp_path)
+    cache.set("expired", 1, ttl=-1)
+    cache.set("fresh", 2)
+
+    async def scenario():
+        sweeper = asyncio.create_task(sweep_periodically([BrokenCache(), cache], 0.02))
+        await asyncio.sleep(0.1)
+        sweeper.cancel()
+
+    asyncio.run(scenario())
+
+    assert cache._read("expired") is None
+    assert cache.get("fresh") == 2
+    assert cache.stats()["expirations"] == 1
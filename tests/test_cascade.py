@@ -0,0 +1,33 @@
+"""Scoring cascade: which jobs the per-request overrides send to the LLM"""
+from types import SimpleNamespace
+
+import pydantic
+import pytest
+
+from config import LLM_UNCERTAINTY_BAND
+from main import JobSearchCriteria
+from relevance_analyzer import RELEVANCE_THRESHOLD, _llm_budget, _llm_candidates
+
+def _criteria(**overrides):
+    fields = dict(scorer="llm", max_llm_calls=None, llm_top_k=None)
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+# Clearly relevant jobs first, then one just under the threshold
+SCORES = [0.95, 0.9, 0.85, RELEVANCE_THRESHOLD - LLM_UNCERTAINTY_BAND / 2]
+
+def test_llm_top_k_zero_sends_only_the_uncertainty_band():
+    assert _llm_candidates(SCORES, _criteria(llm_top_k=0)) == [3]
+
+def test_llm_top_k_unset_uses_config_default():
+    assert _llm_candidates(SCORES, _criteria()) == [0, 1, 2, 3]  # LLM_TOP_K covers every relevant job
+
+def test_max_llm_calls_zero_allows_no_calls():
+    assert not _llm_budget(_criteria(max_llm_calls=0)).try_spend()
+
+@pytest.mark.parametrize("field", ["max_llm_calls", "llm_top_k"])
+def test_negative_overrides_are_rejected(field):
+    body = dict(position="Python Developer", experience="2 years", salary="150,000", jobNature="Remote",
+                location="Lahore, Pakistan", skills="python")
+    with pytest.raises(pydantic.ValidationError):
+        JobSearchCriteria(**body, **{field: -1})
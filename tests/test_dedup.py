@@ -0,0 +1,24 @@
+"""Cross-source deduplication"""
+from dedup import dedupe_jobs
+from testkit import make_job
+
+def test_same_title_on_two_sources_is_merged():
+    jobs = [make_job(1, source="Indeed"), make_job(2, source="LinkedIn", company="Company 1")]
+    unique, removed = dedupe_jobs(jobs)
+    assert removed == 1
+    assert unique[0]["sources"] == ["Indeed", "LinkedIn"]
+
+def test_repeated_title_within_one_source_stays_separate():
+    # Two openings with the same title at one company and city, plus the same title elsewhere
+    jobs = [
+        make_job(1, source="Rozee", company="Acme"),
+        make_job(2, source="Rozee", company="Acme"),
+        make_job(3, source="Indeed", company="Acme"),
+    ]
+    unique, removed = dedupe_jobs(jobs)
+    assert removed == 0
+    assert len(unique) == 3
+
+def test_shared_apply_link_is_merged_within_a_source():
+    jobs = [make_job(1, company="Acme"), make_job(2, company="Acme Ltd", apply_link="https://jobs.example.com/1?utm_source=x")]
+    assert dedupe_jobs(jobs)[1] == 1
@@ -0,0 +1,134 @@
+"""Distillation: bounded sample log, fitting, the publication gate and hot reload"""
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import distill
+from distill import FEATURE_NAMES, LOG_COMPACT_FACTOR, DistilledModel, ModelStore, SampleLog
+from testkit import make_job
+
+def _append(log, start, count):
+    keys = [(f"job{i}", "criteria") for i in range(start, start + count)]
+    log.append(keys, np.full((count, len(FEATURE_NAMES)), 0.5), [i / 100 for i in range(start, start + count)])
+
+def test_sample_log_is_compacted_to_the_most_recent_samples(tmp_path):
+    path = tmp_path / "samples.jsonl"
+    log = SampleLog(str(path), max_samples=10)
+    for start in range(0, 50, 5):
+        _append(log, start, 5)
+        assert len(path.read_text().splitlines()) <= 10 * LOG_COMPACT_FACTOR
+
+    keys, features, scores = log.load(10)
+    assert keys == [f"job{i}" for i in range(40, 50)]
+    assert features.shape == (10, len(FEATURE_NAMES))
+    assert log.appended == 50
+
+def test_existing_log_is_counted_before_appending(tmp_path):
+    path = tmp_path / "samples.jsonl"
+    _append(SampleLog(str(path), max_samples=1000), 0, 30)
+
+    _append(SampleLog(str(path), max_samples=10), 30, 1)
+    assert len(path.read_text().splitlines()) == 10
+
+def _criteria():
+    return SimpleNamespace(position="Python Developer", experience="2 years", jobNature="Remote",
+                           location="Lahore, Pakistan", skills="python, django, sql")
+
+SEPARATING = [FEATURE_NAMES.index(name) for name in ("title", "skills", "tf_similarity")]
+
+def _separable_samples(count, seed=0):
+    """Features where the LLM called a job relevant exactly when its title, skills and text matched"""
+    rng = np.random.default_rng(seed)
+    features = rng.uniform(0, 0.1, (count, len(FEATURE_NAMES)))
+    relevant = rng.random(count) < 0.5
+    features[:, SEPARATING] += np.where(relevant, 0.3, 0.0)[:, None]
+    scores = np.where(relevant, 0.85, 0.15) + rng.normal(0, 0.02, count)
+    return features, scores
+
+@pytest.fixture
+def distill_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(distill, "sample_log", SampleLog(str(tmp_path / "samples.jsonl")))
+    monkeypatch.setattr(distill, "model_store", ModelStore(str(tmp_path / "models")))
+    return tmp_path
+
+def _log(count, seed=0):
+    features, scores = _separable_samples(count, seed)
+    keys = [(f"job{seed}-{i}", "criteria") for i in range(count)]
+    distill.log_samples(keys, features, list(scores))
+
+def test_pair_features_do_not_depend_on_the_batch():
+    jobs = [make_job(i, description=text) for i, text in enumerate([
+        "python django sql", "python and rust", "accounting and audits", "django rest framework",
+    ])]
+    alone = distill.pair_features(jobs[:1], _criteria())
+    assert distill.pair_features(jobs, _criteria())[0] == pytest.approx(alone[0])
+
+def test_fit_agrees_with_the_llm_on_held_out_postings(distill_files):
+    _log(600)
+    model = distill.fit_from_log(distill.sample_log)
+
+    report = model.report
+    assert report["holdout_samples"] + report["training_samples"] == 600
+    assert 0.1 < report["holdout_samples"] / 600 < 0.3
+    assert report["agreement"] >= 0.95 and report["llm_calls_saved"] > 0
+
+def test_too_few_samples_fit_nothing(distill_files):
+    _log(distill.DISTILL_MIN_SAMPLES - 1)
+    assert distill.fit_from_log(distill.sample_log) is None
+
+def test_model_is_published_only_above_the_agreement_gate(distill_files, monkeypatch):
+    _log(600)
+    monkeypatch.setattr(distill, "DISTILL_MIN_AGREEMENT", 1.01)
+    assert distill.refit() is None
+    assert distill.model_store.current() is None
+
+    monkeypatch.setattr(distill, "DISTILL_MIN_AGREEMENT", 0.9)
+    assert distill.refit().version == 1
+    assert distill.model_store.current().version == 1
+
+def test_samples_from_another_feature_set_are_ignored(distill_files):
+    _log(10)
+    with open(distill.sample_log.path, "a", encoding="utf-8") as f:
+        f.write('{"job_key": "old", "criteria_key": "c", "features": [0, 0, 0, 0, 0, 0, 0], "score": 1}\n')
+    keys, _, _ = distill.sample_log.load(100)
+    assert len(keys) == 10 and "old" not in keys
+
+def test_newest_model_is_reloaded_and_removing_it_rolls_back(distill_files):
+    features, scores = _separable_samples(300)
+    store = distill.model_store
+    store.save(DistilledModel.train(features, scores))
+    assert store.current().version == 1
+
+    store.save(DistilledModel.train(features, scores))
+    assert store.current().version == 2
+
+    os.remove(store._path(2))
+    assert store.current().version == 1
+
+def test_confident_scores_cover_only_confident_rows(distill_files, monkeypatch):
+    features, scores = _separable_samples(300)
+    distill.model_store.save(DistilledModel.train(features, scores))
+    between = np.full(len(FEATURE_NAMES), 0.05)
+    between[SEPARATING] = 0.2  # Halfway between the two classes
+    query = np.vstack([features[:4], between])
+    served = distill.predictions_served
+
+    confident = distill.confident_scores(query)
+
+    assert sorted(confident) == [0, 1, 2, 3]
+    assert [confident[n] >= 0.5 for n in range(4)] == list(scores[:4] >= 0.5)
+    assert distill.predictions_served == served + 4
+    monkeypatch.setattr(distill, "DISTILL_ENABLED", False)
+    assert distill.confident_scores(query) == {}
+
+def test_only_one_worker_refits_at_a_time(distill_files):
+    _log(600)
+    with distill.refit_lock(distill.sample_log.path + ".lock") as acquired:
+        assert acquired
+        assert distill.refit_once(min_age=0) is None  # Another worker holds the lock
+        assert distill.model_store.current() is None
+
+    assert distill.refit_once(min_age=3600).version == 1
+    assert distill.refit_once(min_age=3600) is None  # Just published
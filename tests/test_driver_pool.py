@@ -0,0 +1,165 @@
+"""WebDriver pool: FIFO waiting, slot granting, retirement, the lease watchdog and shutdown"""
+import threading
+import time
+
+import pytest
+
+from job_sources import driver_pool
+from job_sources.driver_pool import DriverPool
+
+class StubDriver:
+    """A WebDriver without a browser process; `rss` is the memory its processes report"""
+
+    def __init__(self, number):
+        self.number = number
+        self.rss = 0.0
+        self.broken = False
+        self.quit_calls = 0
+
+    def delete_all_cookies(self):
+        pass
+
+    def execute_script(self, script):
+        pass
+
+    def get(self, url):
+        if self.broken:
+            raise RuntimeError("session deleted")
+
+    def quit(self):
+        self.quit_calls += 1
+
+class StubFactory:
+    def __init__(self):
+        self.drivers = []
+
+    def __call__(self):
+        self.drivers.append(StubDriver(len(self.drivers)))
+        return self.drivers[-1]
+
+@pytest.fixture(autouse=True)
+def stub_memory(monkeypatch):
+    monkeypatch.setattr(driver_pool.PooledDriver, "rss_mb", lambda pooled: pooled.driver.rss)
+
+def _pool(factory, **options):
+    settings = dict(min_size=0, max_size=1, max_uses=50, max_age=3600, max_memory_mb=1024,
+                    lease_timeout=300, acquire_timeout=5)
+    settings.update(options)
+    return DriverPool(factory, **settings)
+
+def _acquire_in_thread(pool, name, order):
+    def run():
+        pooled = pool.acquire()
+        order.append(name)
+        pool.release(pooled)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+def _wait_for_waiters(pool, count):
+    deadline = time.monotonic() + 2
+    while pool.stats()["waiting"] < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+def test_waiters_are_served_in_arrival_order():
+    pool = _pool(StubFactory())
+    held = pool.acquire()
+    order = []
+    threads = []
+    for name in ("first", "second", "third"):
+        threads.append(_acquire_in_thread(pool, name, order))
+        _wait_for_waiters(pool, len(threads))
+
+    pool.release(held)
+    for thread in threads:
+        thread.join(2)
+
+    assert order == ["first", "second", "third"]
+    assert pool.stats()["created"] == 1  # The one driver was handed along the line
+
+def test_retired_driver_frees_a_slot_for_the_next_waiter():
+    factory = StubFactory()
+    pool = _pool(factory, max_size=2, max_uses=1)
+    first, second = pool.acquire(), pool.acquire()
+    order = []
+    waiter = _acquire_in_thread(pool, "waiter", order)
+    _wait_for_waiters(pool, 1)
+
+    pool.release(first)  # Worn out after one use: retired, and its slot goes to the waiter
+    waiter.join(2)
+
+    assert order == ["waiter"]
+    assert len(factory.drivers) == 3
+    assert factory.drivers[0].quit_calls == 1
+    pool.release(second)
+    assert pool.stats()["size"] == 0
+
+def test_exhausted_pool_times_out():
+    pool = _pool(StubFactory())
+    pool.acquire()
+
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+    assert pool.stats()["acquire_timeouts"] == 1
+    assert pool.stats()["waiting"] == 0
+
+@pytest.mark.parametrize("wear, reason", [
+    (lambda driver: time.sleep(0.06), "max age"),
+    (lambda driver: setattr(driver, "rss", 2048.0), "memory"),
+    (lambda driver: setattr(driver, "broken", True), "session cleanup failed"),
+])
+def test_worn_out_drivers_are_retired_on_release(wear, reason, caplog):
+    factory = StubFactory()
+    pool = _pool(factory, max_age=0.05)
+    pooled = pool.acquire()
+    wear(pooled.driver)
+
+    with caplog.at_level("INFO", logger=driver_pool.__name__):
+        pool.release(pooled)
+
+    assert factory.drivers[0].quit_calls == 1
+    assert f"({reason})" in caplog.text
+    assert pool.stats()["idle"] == 0 and pool.stats()["retired"] == 1
+
+def test_healthy_driver_goes_back_to_the_idle_list():
+    factory = StubFactory()
+    pool = _pool(factory)
+    pool.release(pool.acquire())
+
+    assert pool.acquire().driver is factory.drivers[0]
+    assert factory.drivers[0].quit_calls == 0
+
+def test_watchdog_kills_a_driver_held_past_its_lease():
+    factory = StubFactory()
+    pool = _pool(factory, lease_timeout=0.05)
+    pooled = pool.acquire()
+    time.sleep(0.1)
+
+    pool.check()
+
+    assert pooled.retired and factory.drivers[0].quit_calls == 1
+    assert pool.stats()["leases_killed"] == 1
+    pool.release(pooled)  # The search finishing late does not return it to the pool
+    assert pool.stats()["idle"] == 0 and pool.stats()["retired"] == 1
+
+def test_watchdog_warms_the_pool_up_to_min_size():
+    factory = StubFactory()
+    pool = _pool(factory, min_size=2, max_size=3)
+
+    pool.check()
+
+    assert pool.stats()["idle"] == 2 and len(factory.drivers) == 2
+
+def test_driver_released_after_close_is_retired(caplog):
+    factory = StubFactory()
+    pool = _pool(factory, max_size=2)
+    held = pool.acquire()
+    pool.release(pool.acquire())
+
+    with caplog.at_level("INFO", logger=driver_pool.__name__):
+        pool.close()  # Quits the idle driver
+        pool.release(held)
+
+    assert [driver.quit_calls for driver in factory.drivers] == [1, 1]
+    assert pool.stats()["idle"] == 0 and pool.stats()["size"] == 0
+    assert caplog.text.count("(shutdown)") == 2
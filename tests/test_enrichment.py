@@ -0,0 +1,75 @@
+"""Job enrichment: field filtering and low-priority background work"""
+import asyncio
+import time
+
+from enrichment import EnrichmentStore, JobEnricher
+from fingerprint import job_fingerprint
+from llm_scheduler import TokenBucket
+from testkit import make_job
+
+def _enricher(tmp_path, fill_fields, wait_for_capacity=None):
+    store = EnrichmentStore(str(tmp_path / "enrichment.sqlite3"), ttl=3600)
+    return JobEnricher(store, fill_fields, wait_for_capacity=wait_for_capacity)
+
+def _unenriched_job(i):
+    return make_job(i, experience="Not specified", description="")
+
+def test_cold_miss_keeps_only_enrichable_fields(tmp_path):
+    async def fill_fields(job, missing):
+        return {"experience": "3 years", "company": "Someone Else", "unexpected": "x"}
+
+    enricher = _enricher(tmp_path, fill_fields)
+    job = _unenriched_job(1)
+
+    assert asyncio.run(enricher.enrich(job)) == {"experience": "3 years"}
+    assert enricher.store.get(job_fingerprint(job)) == {"experience": "3 years", "company": "Someone Else"}
+
+def test_background_enrichment_waits_for_spare_capacity(tmp_path):
+    calls = []
+
+    async def fill_fields(job, missing):
+        calls.append(job["apply_link"])
+        return {"experience": "3 years"}
+
+    async def scenario():
+        spare = asyncio.Event()
+        enricher = _enricher(tmp_path, fill_fields, wait_for_capacity=spare.wait)
+        enricher.schedule([_unenriched_job(2)])
+        await asyncio.sleep(0.1)
+        assert calls == []
+        spare.set()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    assert calls == ["https://jobs.example.com/2"]
+
+def test_request_promotes_waiting_background_enrichment(tmp_path):
+    async def fill_fields(job, missing):
+        return {"experience": "3 years"}
+
+    async def scenario():
+        never = asyncio.Event()
+        enricher = _enricher(tmp_path, fill_fields, wait_for_capacity=never.wait)
+        job = _unenriched_job(3)
+        enricher.schedule([job])
+        await asyncio.sleep(0.05)
+        filled = await asyncio.wait_for(enricher.enrich(dict(job)), timeout=1)
+        return filled, enricher.stats()
+
+    filled, stats = asyncio.run(scenario())
+    assert filled == {"experience": "3 years"}
+    assert stats["promoted"] == 1
+
+def test_spare_capacity_leaves_reserve_for_requests():
+    bucket = TokenBucket(rate_per_minute=600, capacity=5)  # 10 tokens per second
+
+    async def scenario():
+        await asyncio.wait_for(bucket.wait_for_spare(3), timeout=0.05)  # Full bucket: no wait
+        for _ in range(3):
+            await bucket.acquire()  # Requests bring it down to the reserve
+        started = time.monotonic()
+        await bucket.wait_for_spare(3)
+        return time.monotonic() - started
+
+    waited = asyncio.run(scenario())
+    assert 0.05 < waited < 0.5
@@ -0,0 +1,41 @@
+"""The event loop keeps serving requests while a search waits on Gemini"""
+import asyncio
+import time
+
+import httpx
+
+import main
+from testkit import make_job
+
+HEALTH_LATENCY_LIMIT = 0.25  # Seconds; a blocked loop would stall /health for the whole LLM call
+
+def test_health_stays_fast_during_slow_search(monkeypatch, stub_gemini):
+    stub_gemini.latency = 1.5
+
+    async def fake_source(criteria, page=0):
+        return [make_job(i, apply_link=f"https://jobs.example.com/loop/{i}") for i in range(6)]
+
+    monkeypatch.setattr(main, "JOB_SOURCES", {"Indeed": fake_source})
+    body = dict(position="Python Developer", experience="2 years", salary="150,000", jobNature="Remote",
+                location="Lahore, Pakistan", skills="python, django", scorer="llm", max_pages=1)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            search = asyncio.create_task(client.post("/search-jobs", json=body))
+            await asyncio.sleep(0.3)
+            latencies = []
+            while not search.done():
+                started = time.perf_counter()
+                health = await client.get("/health")
+                latencies.append(time.perf_counter() - started)
+                assert health.status_code == 200
+                await asyncio.sleep(0.05)
+            return await search, latencies
+
+    response, latencies = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    assert stub_gemini.calls > 0
+    assert len(latencies) >= 5
+    assert max(latencies) < HEALTH_LATENCY_LIMIT
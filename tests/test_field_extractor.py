@@ -0,0 +1,33 @@
+"""Deterministic field extraction against the recorded description corpus"""
+import json
+import os
+
+import pytest
+
+from enrichment import resolve_fields
+from field_extractor import extract_job_fields
+from testkit import make_job
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "field_extraction.jsonl")
+
+def load_corpus():
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+CORPUS = load_corpus()
+
+@pytest.mark.parametrize("case", CORPUS, ids=[f"case{i}" for i in range(len(CORPUS))])
+def test_extracts_expected_fields(case):
+    assert extract_job_fields(case["job"]) == case["expected"]
+
+def test_only_unresolved_fields_are_left_for_the_llm():
+    job = make_job(1, description="3+ years of Python. Hybrid, Lahore.", experience="Not specified",
+                   jobNature="", salary="Not specified")
+    extracted, missing = resolve_fields(job)
+    assert extracted == {"experience": "3+ years", "jobNature": "Hybrid"}
+    assert missing == ["salary"]
+
+def test_placeholders_are_missing_in_any_case():
+    job = make_job(1, description="", experience="NONE", jobNature="nan", salary="N/A", location=float("nan"),
+                   company=None)
+    assert resolve_fields(job) == ({}, ["company", "experience", "jobNature", "location", "salary"])
@@ -0,0 +1,42 @@
+"""Column-wise conversion of jobspy results into job records"""
+import numpy as np
+import pandas as pd
+
+from field_extractor import extract_experience
+from job_sources.indeed import INDEED_FIELDS, JobSearchCriteria
+from job_sources.jobspy_normalizer import normalize_jobs
+
+def _criteria():
+    return JobSearchCriteria(position="Python Developer", experience="2 years", salary="100,000 PKR",
+                             jobNature="Remote", location="Lahore, Pakistan", skills="python")
+
+def _frame():
+    return pd.DataFrame({
+        "title": ["Python Developer", "Data Engineer", None],
+        "company": ["Acme", "Delta", "Nimbus"],
+        "location": ["Lahore, PK", None, "Karachi, PK"],
+        "job_url": ["https://example.com/1", "https://example.com/2", "https://example.com/3"],
+        "description": ["3-5 years of Django.", "At least two years of SQL.", np.nan],
+        "job_type": ["fulltime", None, ""],
+        "min_amount": [60000.0, 50000.0, np.nan],
+        "max_amount": [90000.0, 50000.0, 70000.0],
+        "currency": ["USD", None, "USD"],
+        "interval": ["yearly", "monthly", "yearly"],
+    })
+
+def test_job_nature_is_title_cased_and_not_specified_where_missing():
+    jobs = normalize_jobs(_frame(), "Indeed", _criteria(), INDEED_FIELDS)
+    # Not the searched job nature: a missing job type says nothing about the posting
+    assert [job["jobNature"] for job in jobs] == ["Fulltime", "Not specified", "Not specified"]
+
+def test_fields_match_the_per_job_rules():
+    frame = _frame()
+    jobs = normalize_jobs(frame, "Indeed", _criteria(), INDEED_FIELDS)
+
+    assert [job["salary"] for job in jobs] == [
+        "USD 60,000 - 90,000 per yearly", "USD 50,000 per monthly", "Not specified",
+    ]
+    assert [job["experience"] for job in jobs] == [extract_experience(text) for text in frame["description"]]
+    assert jobs[1]["location"] == "Lahore, Pakistan"  # The searched location
+    assert jobs[2]["job_title"] == "Unknown Title"
+    assert jobs[0]["company_reviews"] == ""  # Column absent from the frame
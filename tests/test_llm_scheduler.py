@@ -0,0 +1,75 @@
+"""Concurrent Gemini calls share one token bucket and retry quota errors"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import llm_scheduler
+
+class StubClient:
+    """Stands in for _generate_blocking: per-prompt latency, start times, scripted quota errors"""
+
+    def __init__(self, latencies=None, errors=()):
+        self.latencies = latencies or {}
+        self.errors = list(errors)
+        self.starts = []
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.starts.append(time.monotonic())
+            error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+        time.sleep(self.latencies.get(prompt, 0.0))
+        return f"answer to {prompt}"
+
+def _run_all(prompts):
+    async def scenario():
+        return await asyncio.gather(*(llm_scheduler.generate_content(prompt) for prompt in prompts))
+    started = time.monotonic()
+    results = asyncio.run(scenario())
+    return results, started, time.monotonic() - started
+
+def test_concurrent_calls_take_about_the_slowest_call(monkeypatch):
+    latencies = {f"prompt {i}": 0.1 + 0.05 * i for i in range(6)}  # 0.1s to 0.35s, 1.35s in total
+    client = StubClient(latencies)
+    monkeypatch.setattr(llm_scheduler, "_generate_blocking", client)
+    monkeypatch.setattr(llm_scheduler, "rate_limiter", llm_scheduler.TokenBucket(10 ** 6))
+
+    results, _, elapsed = _run_all(list(latencies))
+
+    assert results == [f"answer to {prompt}" for prompt in latencies]
+    assert max(latencies.values()) <= elapsed < max(latencies.values()) + 0.25
+
+def test_concurrent_calls_stay_within_the_bucket_rate(monkeypatch):
+    client = StubClient()
+    monkeypatch.setattr(llm_scheduler, "_generate_blocking", client)
+    monkeypatch.setattr(llm_scheduler, "rate_limiter", llm_scheduler.TokenBucket(600, capacity=2))  # 10 per second
+
+    _, started, elapsed = _run_all([f"prompt {i}" for i in range(6)])
+
+    # Two calls from the burst capacity, then one every 0.1s
+    for k, start in enumerate(sorted(client.starts)):
+        assert start - started >= max(0, k - 1) * 0.1 - 0.02
+    assert elapsed >= 0.38
+
+def test_quota_error_pauses_the_bucket_and_retries(monkeypatch):
+    client = StubClient(errors=[Exception("429 Resource has been exhausted. Please retry in 0.3s")])
+    monkeypatch.setattr(llm_scheduler, "_generate_blocking", client)
+    monkeypatch.setattr(llm_scheduler, "rate_limiter", llm_scheduler.TokenBucket(10 ** 6))
+
+    results, _, _ = _run_all(["prompt"])
+
+    assert results == ["answer to prompt"]
+    first, retry = client.starts
+    assert retry - first >= 0.3
+
+def test_quota_errors_fail_after_the_last_retry(monkeypatch):
+    errors = [Exception("429 quota exceeded, retry in 0s")] * (llm_scheduler.LLM_MAX_RETRIES + 1)
+    monkeypatch.setattr(llm_scheduler, "_generate_blocking", StubClient(errors=errors))
+    monkeypatch.setattr(llm_scheduler, "rate_limiter", llm_scheduler.TokenBucket(10 ** 6))
+
+    with pytest.raises(llm_scheduler.QuotaExceededError):
+        _run_all(["prompt"])
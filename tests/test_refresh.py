@@ -0,0 +1,119 @@
+"""Stale-while-revalidate: stale results within grace, deduplicated jittered refreshes, stale-if-error"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import main
+from bounded_cache import BoundedCache
+from refresh_scheduler import RefreshScheduler
+from singleflight import SingleFlight
+from testkit import make_job
+
+BODY = dict(position="Python Developer", experience="2 years", salary="150,000", jobNature="Remote",
+            location="Lahore, Pakistan", skills="python, django", scorer="local", max_pages=1)
+
+def _cached_response(title):
+    listing = main.JobListing(**{key: value for key, value in make_job(1, job_title=title).items()
+                                 if key != "description"}, relevance_score=0.8)
+    return main.JobSearchResponse(relevant_jobs=[listing], total_jobs_found=1, search_timestamp="2026-01-01T00:00:00")
+
+@pytest.fixture
+def stale_app(monkeypatch):
+    """An expired cached response for BODY, a fresh refresher and a source that can be made to fail"""
+    calls = []
+    state = {"fail": False}
+
+    async def source(criteria, page=0):
+        calls.append(page)
+        await asyncio.sleep(0.05)
+        if state["fail"]:
+            raise RuntimeError("blocked")
+        return [make_job(i, apply_link=f"https://jobs.example.com/refresh/{i}") for i in range(3)]
+
+    cache = BoundedCache("job", 60, 100, 1 << 20, grace=3600, model=main.JobSearchResponse)
+    cache.set(main.search_key(main.JobSearchCriteria(**BODY)), _cached_response("Cached Developer"), ttl=-100)
+    monkeypatch.setattr(main, "JOB_SOURCES", {"Indeed": source})
+    monkeypatch.setattr(main, "job_cache", cache)
+    monkeypatch.setattr(main, "source_cache", BoundedCache("source", 60, 100, 1 << 20))
+    monkeypatch.setattr(main, "search_flight", SingleFlight())
+    monkeypatch.setattr(main, "refresher", RefreshScheduler(workers=2, jitter=0.0, max_queue=10))
+    return calls, state
+
+def _search(count=1, settle=0.0):
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            responses = await asyncio.gather(*(client.post("/search-jobs", json=BODY) for _ in range(count)))
+        await asyncio.sleep(settle)  # Lets queued refreshes run
+        return [response.json() for response in responses]
+    return asyncio.run(scenario())
+
+def test_stale_entry_within_grace_is_served_and_refreshed(stale_app):
+    calls, _ = stale_app
+
+    stale, = _search(settle=0.3)
+
+    assert stale["stale"] is True
+    assert stale["relevant_jobs"][0]["job_title"] == "Cached Developer"
+    assert main.refresher.stats()["completed"] == 1
+    fresh, = _search()
+    assert fresh["stale"] is False and fresh["relevant_jobs"][0]["job_title"] == "Python Developer"
+    assert calls == [0]
+
+def test_concurrent_stale_hits_refresh_once(stale_app):
+    calls, _ = stale_app
+
+    responses = _search(count=4, settle=0.3)
+
+    assert all(response["stale"] for response in responses)
+    stats = main.refresher.stats()
+    assert (stats["scheduled"], stats["deduplicated"], stats["completed"]) == (1, 3, 1)
+    assert calls == [0]
+
+def test_entry_past_grace_is_served_when_the_search_fails(stale_app, monkeypatch):
+    calls, state = stale_app
+    state["fail"] = True
+    monkeypatch.setattr(main, "CACHE_STALE_GRACE", 10)  # The entry expired 100s ago
+
+    response, = _search()
+
+    assert calls == [0]  # A live search was tried first
+    assert response["stale"] is True
+    assert response["relevant_jobs"][0]["job_title"] == "Cached Developer"
+    assert main.refresher.stats()["scheduled"] == 0
+
+def test_refreshes_start_within_the_jitter():
+    scheduler = RefreshScheduler(workers=8, jitter=0.2, max_queue=10)
+    delays = []
+
+    async def scenario():
+        for key in range(8):
+            queued_at = time.monotonic()
+
+            async def refresh(queued_at=queued_at):
+                delays.append(time.monotonic() - queued_at)
+
+            scheduler.schedule(key, refresh)
+        await asyncio.sleep(0.4)
+
+    asyncio.run(scenario())
+
+    assert len(delays) == 8
+    assert all(0 <= delay <= 0.2 + 0.05 for delay in delays)
+    assert max(delays) - min(delays) > 0  # Spread out, not all at once
+
+def test_failed_refresh_releases_its_key():
+    scheduler = RefreshScheduler(workers=1, jitter=0.0, max_queue=10)
+
+    async def failing():
+        raise RuntimeError("blocked")
+
+    async def scenario():
+        scheduler.schedule("key", failing)
+        await asyncio.sleep(0.05)
+        return scheduler.schedule("key", failing)
+
+    assert asyncio.run(scenario()) is True
+    assert scheduler.stats()["failed"] >= 1
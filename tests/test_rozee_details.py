@@ -0,0 +1,107 @@
+"""Rozee.pk detail pages loaded in parallel browser tabs"""
+import os
+
+from selenium.common.exceptions import NoSuchElementException, NoSuchWindowException
+
+from job_sources import rozee
+from job_sources.rozee_parser import card_fields
+from testkit import FIXTURES
+
+class _Element:
+    def is_displayed(self):
+        return True
+
+class StubTabDriver:
+    """
+    The window handling of a WebDriver: after close() the driver stays on
+    the closed window and every command but switching windows fails
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.handles = ["main"]
+        self.urls = {"main": "about:blank"}
+        self.current = "main"
+        self.opened = 0
+        self.switch_to = self
+
+    def _check(self):
+        if self.current not in self.handles:
+            raise NoSuchWindowException("no such window: target window already closed")
+
+    def new_window(self, kind):
+        self._check()
+        self.opened += 1
+        self.current = f"tab{self.opened}"
+        self.handles.append(self.current)
+
+    def window(self, handle):
+        if handle not in self.handles:
+            raise NoSuchWindowException(f"no such window: {handle}")
+        self.current = handle
+
+    @property
+    def current_window_handle(self):
+        self._check()
+        return self.current
+
+    @property
+    def window_handles(self):
+        return list(self.handles)
+
+    def execute_script(self, script, *args):
+        self._check()
+        self.urls[self.current] = args[0]
+
+    def execute_cdp_cmd(self, cmd, params):
+        self._check()
+
+    def find_element(self, by, value):
+        self._check()
+        if self.urls[self.current] not in self.pages:
+            raise NoSuchElementException(value)
+        return _Element()
+
+    @property
+    def page_source(self):
+        self._check()
+        return self.pages[self.urls[self.current]]
+
+    def close(self):
+        self._check()
+        self.handles.remove(self.current)
+
+def _cards(count):
+    cards, pages = [], {}
+    for i in range(count):
+        url = f"https://www.rozee.pk/job-{i}-jobs-1001.php"
+        with open(os.path.join(FIXTURES, "rozee", "job-1001.html"), encoding="utf-8") as f:
+            pages[url] = f.read()
+        cards.append({**card_fields({}), "job_title": f"Python Developer {i}", "salary": "Not Specified",
+                      "apply_link": url})
+    return cards, pages
+
+def test_details_load_across_several_batches_of_tabs(monkeypatch):
+    monkeypatch.setattr(rozee, "ROZEE_EXTRACTION", "snapshot")
+    monkeypatch.setattr(rozee, "ROZEE_DETAIL_CONCURRENCY", 3)
+    cards, pages = _cards(8)  # Three batches
+    driver = StubTabDriver(pages)
+
+    jobs = rozee._load_details(driver, cards)
+
+    assert [job["job_title"] for job in jobs] == [card["job_title"] for card in cards]
+    assert all(job["experience"] == "2 Years" for job in jobs)
+    assert driver.opened == 8
+    assert driver.window_handles == ["main"]
+    assert driver.current_window_handle == "main"
+
+def test_tab_that_does_not_load_only_loses_its_own_details(monkeypatch):
+    monkeypatch.setattr(rozee, "ROZEE_EXTRACTION", "snapshot")
+    monkeypatch.setattr(rozee, "ROZEE_DETAIL_CONCURRENCY", 2)
+    monkeypatch.setattr(rozee, "ROZEE_DETAIL_TIMEOUT", 0.2)
+    cards, pages = _cards(4)
+    del pages[cards[1]["apply_link"]]
+
+    jobs = rozee._load_details(StubTabDriver(pages), cards)
+
+    assert [job is not None for job in jobs] == [True, False, True, True]
@@ -0,0 +1,89 @@
+"""Browserless Rozee.pk scraper against recorded pages served locally"""
+import asyncio
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from job_sources import rozee_http
+from job_sources.rozee_parser import RozeeParseError, card_fields
+
+def _criteria(location="Lahore, Pakistan"):
+    return SimpleNamespace(position="Python Developer", location=location)
+
+def _run(coroutine):
+    async def scenario():
+        try:
+            return await coroutine
+        finally:
+            await rozee_http.close_client()
+    return asyncio.run(scenario())
+
+def test_listing_and_details_parse_from_recorded_pages(rozee_site, monkeypatch):
+    monkeypatch.setattr(rozee_http, "LAZY_DETAILS", False)
+    jobs = _run(rozee_http.fetch_rozee_jobs_http(_criteria()))
+
+    assert [job["job_title"] for job in jobs] == [
+        "Python Developer", "Django Developer", "Python Intern", "Data Engineer (Python)", "Machine Learning Engineer",
+    ]
+    developer, django, intern, data_engineer, _ = jobs
+    assert developer["company"] == "Acme Technologies"
+    assert developer["location"].startswith("Lahore")
+    assert developer["salary"] == "PKR 150,000 - 250,000/Month"
+    assert developer["apply_link"] == rozee_site.url + "/acme-technologies-python-developer-jobs-1001.php"
+    assert developer["full_details"].startswith("Job Description:\nAcme is hiring")
+    assert "Job Skills:\nPython Django PostgreSQL" in developer["full_details"]
+    assert developer["experience"] == "2 Years"
+    assert developer["jobNature"] == "Hybrid"  # From the description, ahead of the Job Type label
+    assert developer["apply_button_present"] is True
+    assert django["jobNature"] == "Contract"
+    assert intern["salary"] == "PKR 40,000/Month"  # From the detail header; the card has none
+    assert data_engineer["location"].startswith("Lahore")  # From the second listing page
+    assert data_engineer["experience"] == "3 Years"
+
+def test_lazy_listing_is_completed_by_detail_fetch(rozee_site, monkeypatch):
+    monkeypatch.setattr(rozee_http, "LAZY_DETAILS", True)
+    jobs = _run(rozee_http.fetch_rozee_jobs_http(_criteria("Karachi")))
+
+    assert [job["job_title"] for job in jobs] == ["Senior Python Engineer", "Python Backend Developer"]
+    assert jobs[0]["details_pending"] is True
+    assert not any(path.endswith(".php") for path in rozee_site.requests)
+
+    details = _run(rozee_http.fetch_rozee_details_http([card_fields(job) for job in jobs]))
+    assert details[0]["experience"] == "5 Years"
+
+def test_pages_read_further_listing_pages_in_the_searched_city(rozee_site, monkeypatch):
+    monkeypatch.setattr(rozee_http, "LAZY_DETAILS", True)
+    first = _run(rozee_http.fetch_rozee_jobs_http(_criteria(), page=0))
+    second = _run(rozee_http.fetch_rozee_jobs_http(_criteria(), page=1))
+
+    assert len(first) == 5
+    assert all(job["location"].startswith("Lahore") for job in first)
+    assert second == []  # The listing ended after /fpn/20
+    listing = "/job/jsearch/q/Python%20Developer"
+    assert rozee_site.requests == [listing, listing + "/fpn/20", listing + "/fpn/40"]  # Each parsed once
+
+def test_city_without_jobs_gives_an_empty_page(rozee_site, monkeypatch):
+    monkeypatch.setattr(rozee_http, "LAZY_DETAILS", True)
+    assert _run(rozee_http.fetch_rozee_jobs_http(_criteria("Quetta, Pakistan"))) == []
+
+def test_missing_detail_page_only_loses_its_own_details(rozee_site):
+    cards = [
+        {**card_fields({}), "job_title": "Python Developer", "salary": "Not Specified",
+         "apply_link": rozee_site.url + "/acme-technologies-python-developer-jobs-1001.php"},
+        {**card_fields({}), "job_title": "Backend Developer", "salary": "Not Specified",
+         "apply_link": rozee_site.url + "/nimbus-soft-backend-developer-python-jobs-1004.php"},
+    ]
+    first, second = _run(rozee_http.fetch_rozee_details_http(cards))
+    assert first["experience"] == "2 Years"
+    assert second is None
+
+def test_unexpected_listing_markup_raises_parse_error(rozee_site):
+    rozee_site.routes.insert(0, (re.compile(r"/job/jsearch/q/[^/]+"), "rozee/job-1001.html"))
+    with pytest.raises(RozeeParseError):
+        _run(rozee_http.fetch_rozee_jobs_http(_criteria()))
+
+def test_browser_pool_stays_empty_with_the_http_scraper():
+    from job_sources.rozee import ROZEE_SCRAPER, driver_pool
+    assert ROZEE_SCRAPER == "http"
+    assert driver_pool.min_size == 0
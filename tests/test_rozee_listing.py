@@ -0,0 +1,75 @@
+"""Rozee.pk Selenium search pages: listing pages read in order, within the searched city"""
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from job_sources import rozee
+from job_sources.rozee_parser import HTML_PARSER
+
+class _Node:
+    def __init__(self, node):
+        self.node = node
+        self.tag_name = node.name
+
+    def get_dom_attribute(self, name):
+        return self.node.get(name)
+
+    def find_elements(self, by, value):
+        return []  # Selecting a city option finds nothing; the scraper goes on without it
+
+class StubListingDriver:
+    """Listing pages of the fixture site, looked up with CSS selectors as a WebDriver would"""
+
+    def __init__(self, site):
+        self.site = site
+        self.visited = []
+        self.current_url = "about:blank"
+        self.soup = BeautifulSoup("", HTML_PARSER)
+
+    def get(self, url):
+        self.visited.append(urlsplit(url).path)
+        self.current_url = url
+        self.soup = BeautifulSoup(self.site.page(urlsplit(url).path) or b"", HTML_PARSER)
+
+    def get_log(self, kind):
+        return []
+
+    def find_elements(self, by, value):
+        return [_Node(node) for node in self.soup.select(value)]
+
+    def find_element(self, by, value):
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(value)
+        return found[0]
+
+    @property
+    def page_source(self):
+        return str(self.soup)
+
+def _scrape(driver, location, page):
+    return rozee._scrape_rozee(driver, SimpleNamespace(position="Python Developer", location=location), page)
+
+def test_pages_read_further_listing_pages_in_the_searched_city(rozee_site, monkeypatch):
+    monkeypatch.setattr(rozee, "LAZY_DETAILS", True)
+    monkeypatch.setattr(rozee, "ROZEE_EXTRACTION", "snapshot")
+    monkeypatch.setattr(rozee, "WebDriverWait", lambda driver, timeout: WebDriverWait(driver, 0.2))
+    driver = StubListingDriver(rozee_site)
+
+    first = _scrape(driver, "Lahore, Pakistan", 0)
+    second = _scrape(driver, "Lahore, Pakistan", 1)
+
+    assert [job["job_title"] for job in first] == [
+        "Python Developer", "Django Developer", "Python Intern", "Data Engineer (Python)", "Machine Learning Engineer",
+    ]
+    assert second == []  # The listing ended after /fpn/20
+    listing = "/job/jsearch/q/Python%20Developer"
+    assert driver.visited == [listing, listing + "/fpn/20", listing + "/fpn/40"]  # Each loaded once
+
+def test_city_without_jobs_gives_an_empty_page(rozee_site, monkeypatch):
+    monkeypatch.setattr(rozee, "LAZY_DETAILS", True)
+    monkeypatch.setattr(rozee, "WebDriverWait", lambda driver, timeout: WebDriverWait(driver, 0.2))
+    assert _scrape(StubListingDriver(rozee_site), "Quetta, Pakistan", 0) == []
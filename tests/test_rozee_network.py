@@ -0,0 +1,61 @@
+"""Rozee.pk browser network setup: blocked resource patterns, the domain allow-list and CDP metrics"""
+import json
+
+from selenium.common.exceptions import WebDriverException
+
+from job_sources import rozee
+
+def _event(method, **params):
+    """A performance log entry as ChromeDriver returns it"""
+    message = {"message": {"method": method, "params": params}, "webview": "page"}
+    return {"level": "INFO", "message": json.dumps(message), "timestamp": 0}
+
+class StubLogDriver:
+    def __init__(self, entries=None, error=None):
+        self.entries = entries or []
+        self.error = error
+
+    def get_log(self, kind):
+        assert kind == "performance"
+        if self.error:
+            raise self.error
+        return self.entries
+
+def test_blocked_patterns_cover_the_types_not_allowed():
+    patterns = rozee._blocked_url_patterns(["document", "script", "stylesheet"])
+
+    assert "*.png" in patterns and "*.woff2" in patterns and "*.mp4" in patterns
+    assert "*.css" not in patterns
+    assert rozee._blocked_url_patterns(list(rozee.RESOURCE_TYPE_PATTERNS)) == []
+
+def test_host_resolver_rules_leave_only_the_allowed_domains():
+    rules = rozee._host_resolver_rules(["rozee.pk", "cdn.example.com"])
+
+    assert rules == ("MAP * ~NOTFOUND, EXCLUDE rozee.pk, EXCLUDE *.rozee.pk, "
+                     "EXCLUDE cdn.example.com, EXCLUDE *.cdn.example.com, EXCLUDE localhost")
+    assert rozee._host_resolver_rules([]) is None
+
+def test_network_metrics_summarize_the_performance_log(caplog):
+    driver = StubLogDriver([
+        _event("Network.requestWillBeSent", requestId="1"),
+        _event("Network.requestWillBeSent", requestId="2"),
+        _event("Network.requestWillBeSent", requestId="3"),
+        _event("Network.loadingFinished", requestId="1", encodedDataLength=3072),
+        _event("Network.loadingFinished", requestId="2", encodedDataLength=1024),
+        _event("Network.loadingFailed", requestId="3", blockedReason="inspector"),
+        _event("Network.loadingFailed", requestId="4", errorText="net::ERR_NAME_NOT_RESOLVED"),
+        _event("Page.loadEventFired"),
+        {"level": "INFO", "message": "not json", "timestamp": 0},
+    ])
+
+    with caplog.at_level("INFO", logger="rozee"):
+        rozee._log_network_metrics(driver, 1.234)
+
+    assert "3 requests, 1 blocked, 4.0 KB transferred; job list ready in 1.23s" in caplog.text
+
+def test_network_metrics_are_skipped_without_a_performance_log(caplog):
+    with caplog.at_level("INFO", logger="rozee"):
+        rozee._log_network_metrics(StubLogDriver(error=WebDriverException("log type 'performance' not found")), 1.0)
+
+    assert "Could not read CDP network events" in caplog.text
+    assert "requests" not in caplog.text
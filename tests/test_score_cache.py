@@ -0,0 +1,65 @@
+"""Persistent LLM score cache: expiry, LRU eviction, counters and the backend variant"""
+import time
+
+from bounded_cache import BoundedCache
+from score_cache import BackendScoreCache, ScoreCache
+
+def _cache(tmp_path, ttl=60, max_entries=100):
+    return ScoreCache(str(tmp_path / "scores.sqlite3"), ttl, max_entries)
+
+def test_scores_round_trip_and_count_hits_and_misses(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put_many({("job-1", "criteria"): 0.8, ("job-2", "criteria"): 0.4})
+
+    assert cache.get_many([("job-1", "criteria"), ("job-2", "criteria"), ("job-3", "criteria")]) == {
+        ("job-1", "criteria"): 0.8, ("job-2", "criteria"): 0.4,
+    }
+    assert cache.get("job-1", "other criteria") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 2, 2)
+    assert stats["hit_ratio"] == 0.5
+
+def test_scores_expire_after_the_ttl(tmp_path):
+    cache = _cache(tmp_path, ttl=0.1)
+    cache.put("job-1", "criteria", 0.8)
+    assert cache.get("job-1", "criteria") == 0.8
+
+    time.sleep(0.15)
+    assert cache.get("job-1", "criteria") is None
+
+def test_least_recently_used_scores_are_evicted(tmp_path):
+    cache = _cache(tmp_path, max_entries=3)
+    for i in range(3):
+        cache.put(f"job-{i}", "criteria", 0.5)
+        time.sleep(0.01)
+    cache.get("job-0", "criteria")  # Now the most recently used
+    time.sleep(0.01)
+    cache.put("job-3", "criteria", 0.5)
+
+    remaining = cache.get_many([(f"job-{i}", "criteria") for i in range(4)])
+    assert sorted(job for job, _ in remaining) == ["job-0", "job-2", "job-3"]
+    assert cache.stats()["evictions"] == 1
+
+def test_writes_below_the_bound_do_not_count_the_table(tmp_path):
+    cache = _cache(tmp_path, max_entries=1000)
+    cache.put("job-0", "criteria", 0.5)  # First write counts the table once
+    statements = []
+    cache._connection().set_trace_callback(statements.append)
+
+    for i in range(1, 20):
+        cache.put(f"job-{i}", "criteria", 0.5)
+
+    assert not [statement for statement in statements if "COUNT(*)" in statement]
+
+def test_scores_persist_across_instances(tmp_path):
+    _cache(tmp_path).put("job-1", "criteria", 0.9)
+    assert _cache(tmp_path).get("job-1", "criteria") == 0.9
+
+def test_backend_score_cache_has_the_same_interface():
+    cache = BackendScoreCache(BoundedCache("llm_scores", 60, 100, 1 << 20))
+    cache.put_many({("job-1", "criteria"): 0.8})
+
+    assert cache.get_many([("job-1", "criteria"), ("job-2", "criteria")]) == {("job-1", "criteria"): 0.8}
+    assert cache.get("job-1", "criteria") == 0.8
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
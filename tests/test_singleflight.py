@@ -0,0 +1,70 @@
+"""Coalesced work survives cancelled waiters and shares its failures"""
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(3)))
+
+    results = asyncio.run(scenario())
+
+    assert results == [("result", False), ("result", True), ("result", True)]
+    assert len(runs) == 1
+    assert flight.stats() == {"in_flight": 0, "executions": 1, "coalesced_requests": 2, "failures": 0}
+
+def test_cancelled_waiter_leaves_the_work_running_for_the_others():
+    flight = SingleFlight()
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.1)
+        finished.append(1)
+        return "result"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("key", work))
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        result = await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return result
+
+    assert asyncio.run(scenario()) == ("result", True)
+    assert finished == [1]
+
+def test_failure_reaches_every_waiter_and_clears_the_key():
+    flight = SingleFlight()
+    runs = []
+
+    async def failing():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        raise ValueError("source down")
+
+    async def working():
+        return "recovered"
+
+    async def scenario():
+        outcomes = await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+        return outcomes, await flight.do("key", working)
+
+    outcomes, retry = asyncio.run(scenario())
+
+    assert len(runs) == 1
+    assert all(isinstance(outcome, ValueError) and str(outcome) == "source down" for outcome in outcomes)
+    assert retry == ("recovered", False)  # A new execution, not the failed one
+    assert flight.stats()["failures"] == 1
+    assert flight.stats()["in_flight"] == 0
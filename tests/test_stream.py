@@ -0,0 +1,109 @@
+"""Streaming search: event order, NDJSON and SSE framing, and coalescing with identical searches"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import main
+from bounded_cache import BoundedCache
+from relevance_analyzer import job_id
+from singleflight import SingleFlight
+from testkit import make_job
+
+STRONG = [make_job(i, apply_link=f"https://jobs.example.com/stream/{i}") for i in range(3)]
+# Relevant-looking on its title alone; the LLM disagrees
+WEAK = make_job(9, apply_link="https://jobs.example.com/stream/9", location="Karachi", jobNature="Onsite",
+                experience="Not specified", description="python")
+
+BODY = dict(position="Python Developer", experience="2 years", salary="150,000", jobNature="Remote",
+            location="Lahore, Pakistan", skills="python, django", scorer="llm", max_pages=1)
+
+@pytest.fixture
+def search_app(monkeypatch, stub_gemini):
+    """Fresh caches and one source that returns STRONG and WEAK, one that fails"""
+    stub_gemini.scores = {job_id(WEAK): 0.0}
+    calls = []
+
+    async def jobs_source(criteria, page=0):
+        calls.append(page)
+        await asyncio.sleep(0.2)
+        return [dict(job) for job in STRONG + [WEAK]]
+
+    async def failing_source(criteria, page=0):
+        raise RuntimeError("blocked")
+
+    monkeypatch.setattr(main, "JOB_SOURCES", {"Indeed": jobs_source, "LinkedIn": failing_source})
+    monkeypatch.setattr(main, "job_cache", BoundedCache("job", 60, 100, 1 << 20, model=main.JobSearchResponse))
+    monkeypatch.setattr(main, "source_cache", BoundedCache("source", 60, 100, 1 << 20))
+    monkeypatch.setattr(main, "search_flight", SingleFlight())
+    return calls
+
+def _post_all(*requests):
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            return await asyncio.gather(*(client.post(url, json=BODY) for url in requests))
+    return asyncio.run(scenario())
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_events_arrive_in_order(search_app):
+    response, = _post_all("/search-jobs/stream")
+    events = _ndjson(response)
+    names = [event["event"] for event in events]
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert names.index("source_error") < names.index("update")
+    assert names[-1] == "summary"
+    # Provisional jobs, then the final listings, then what was dropped
+    last_job = max(n for n, name in enumerate(names) if name == "job")
+    first_update = names.index("update")
+    assert last_job < first_update < names.index("remove")
+    provisional = {event["data"]["job_id"] for event in events if event["event"] == "job"}
+    final = [event["data"]["job_id"] for event in events if event["event"] == "update"]
+    assert provisional == {job_id(job) for job in STRONG + [WEAK]}
+    assert set(final) == {job_id(job) for job in STRONG}
+    assert [event["data"] for event in events if event["event"] == "remove"] == [{"job_id": job_id(WEAK)}]
+    summary = events[-1]["data"]
+    assert [job_id(listing) for listing in summary["relevant_jobs"]] == final
+
+def test_sse_frames_each_event(search_app):
+    response, = _post_all("/search-jobs/stream?format=sse")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.endswith("\n\n")
+    frames = response.text[:-2].split("\n\n")
+    for frame in frames:
+        event, data = frame.split("\n")
+        assert event.startswith("event: ") and data.startswith("data: ")
+        json.loads(data[len("data: "):])
+    assert frames[-1].startswith("event: summary\n")
+
+def test_identical_streams_and_searches_share_one_search(search_app):
+    first, second, plain = _post_all("/search-jobs/stream", "/search-jobs/stream", "/search-jobs")
+
+    assert search_app == [0]  # One fetch of the one page
+    assert main.search_flight.stats()["coalesced_requests"] == 2
+    streams = [_ndjson(first), _ndjson(second)]
+    joined = next(events for events in streams if not any(event["event"] == "job" for event in events))
+    assert [event["event"] for event in joined][-1] == "summary"
+    assert joined[-1]["data"]["llm_calls_used"] == 0
+    assert len(plain.json()["relevant_jobs"]) == len(STRONG)
+
+def test_cached_results_are_replayed_as_final_events(search_app):
+    _post_all("/search-jobs")
+    response, = _post_all("/search-jobs/stream")
+
+    names = [event["event"] for event in _ndjson(response)]
+    assert names == ["update"] * len(STRONG) + ["summary"]
+    assert search_app == [0]
+
+def test_no_jobs_ends_the_stream_with_an_error(search_app, monkeypatch):
+    async def empty_source(criteria, page=0):
+        return []
+
+    monkeypatch.setattr(main, "JOB_SOURCES", {"Indeed": empty_source})
+    response, = _post_all("/search-jobs/stream")
+    assert _ndjson(response) == [{"event": "error", "data": {"detail": "No jobs found matching your criteria"}}]